@@ -44,9 +44,21 @@ List of parameters handled by acme cli:
 
   (gencsv|-g)       {date_input}
   (gencsv|-g)       {date_input}      {module_options}
+  (gencsv|-g)       {date_input}      {module_options}  (--jobs|-j) N
+  (gencsv|-g)       {date_input}      {module_options}  (--format|-f) (parquet|feather|sqlite)
+
+
+  sql               "<query>"
+
+
+  watch             {module_options}  (--poll)
+
+
+  daemon            (start|stop|status|run)
 
 
   (utility|util)    (arg1)   (arg2)   (arg3)   etc..
+  (utility|util)    startup-profile   ["<command>"]
   (utility|util)    (help|-h)
   (utility|util)    (man)
 
@@ -60,18 +72,11 @@ from __init__ import __version__
 
 import os
 import sys
-import pydoc
 
 from types import SimpleNamespace
 
-from acme.cli  import cmd
 from acme.cli  import docs
 
-from acme.core import utils
-from acme.core import macros
-from acme.core import process
-from acme.core import validate
-
 from acme.core.settings import Settings
 
 settings = Settings.settings
@@ -84,37 +89,98 @@ devPort     = settings('web.devPort')
 prodPort    = settings('web.prodPort')
 
 
-def cli_main(params, callname, meta):
-  """Cli options: main"""
-  output = []
+# -- command registry -- #
+# Subcommands & their handlers (params, callname, meta). The modules a command needs are imported by
+# its handler, i.e. only when the command runs (e.g. 'acme stats' doesn't import the timesheets modules).
 
-  # -- default: no parameters -> run 'stats' -- #
+def run_stats(params, callname, meta):
+  from acme.core import validate
+  validate.validate_files(meta.logs_dir, gen_dir=meta.gen_dir)
 
-  if len(params) == 0:
-    return validate.validate_files(meta.logs_dir)
+def run_list_files(params, callname, meta):
+  from acme.core import validate
+  validate.validate_files(meta.logs_dir, True, gen_dir=meta.gen_dir)
 
-  arg1 = params[0]
+def run_date_input(params, callname, meta):
+  from acme.core import macros
+  from acme.core import process
+  return process.handle_date_input(parsed=macros.parse_date_input(params[0]), meta=meta)
+
+def run_gencsv(params, callname, meta):
+  from acme.core import process
+  return process.handle_timesheets(params, callname, meta)
+
+def run_sql(params, callname, meta):
+  from acme.core import process
+  return process.handle_sql(params, meta)
+
+def run_utils(params, callname, meta):
+  cli_utils(params[1:], params[0], meta)
 
-  # -- stats & utils -- #
+def run_watch(params, callname, meta):
+  from acme.core import watch
+  watch.watch(params, meta)
 
-  if arg1 in ('stats','-s'):
-    validate.validate_files(meta.logs_dir)
+def run_daemon(params, callname, meta):
+  from acme.cli import daemon
+  daemon.daemon_options(params[1:], meta)
 
-  elif arg1 in ('list-files','-l'):
-    validate.validate_files(meta.logs_dir, True)
 
-  elif arg1 in ('utility','util','-u'):
-    cli_utils(params[1:], arg1, meta)
+commands = {
+  'stats'       : run_stats,
+  '-s'          : run_stats,
+  'list-files'  : run_list_files,
+  '-l'          : run_list_files,
+  'utility'     : run_utils,
+  'util'        : run_utils,
+  '-u'          : run_utils,
+  'gencsv'      : run_gencsv,
+  '-g'          : run_gencsv,
+  'sql'         : run_sql,
+  'watch'       : run_watch,
+  'daemon'      : run_daemon,
+}
 
-  # -- acme {date_input} -- #
+# commands that run in the acme daemon of the workspace when it's running (see daemon.py)
+daemon_commands = (run_stats, run_date_input, run_gencsv, run_sql)
 
-  elif macros.is_date_input(arg1):
-    output += process.handle_date_input(parsed=macros.parse_date_input(arg1), meta=meta)
 
-  # -- acme gencsv {date_input}: timesheets module <- csv generate -- #
+def find_command(arg1):
+  """Returns the handler of a subcommand (None if invalid). {date_input} is checked after the registered commands."""
+  if arg1 in commands:
+    return commands[arg1]
 
-  elif arg1 in ('gencsv','-g'):
-    output += process.handle_timesheets(params, callname, meta)
+  from acme.core import macros
+  if macros.is_date_input(arg1):
+    return run_date_input
+
+
+def forward_to_daemon(params, meta):
+  """Runs the command in the acme daemon of the workspace if it's running. Returns its exit code (None if not forwarded)."""
+  from acme.cli import daemon
+  if not os.path.exists(daemon.socket_file(meta.workspace_dir)):
+    return None
+  if params and find_command(params[0]) not in daemon_commands:
+    return None
+  return daemon.forward(sys.argv[1:], meta.workspace_dir)
+
+
+def cli_main(params, callname, meta):
+  """Cli options: main"""
+  output = []
+
+  # -- default: no parameters -> run 'stats' -- #
+
+  if len(params) == 0:
+    return run_stats(params, callname, meta)
+
+  arg1 = params[0]
+  command = find_command(arg1)
+
+  # -- stats & utils, acme {date_input}, acme gencsv {date_input}, acme sql "<query>" -- #
+
+  if command:
+    output += command(params, callname, meta) or []
 
   # -- invalid command default message -- #
 
@@ -143,17 +209,25 @@ def cli_utils(params, callname, meta):
   applyf     = params[2] if len(params) >= 3 else ''
 
   if com == 'makefiles':
+    from acme.core import utils
     utils.make_files(directory, applyf)
 
   elif com == 'makedirs':
+    from acme.core import utils
     utils.make_dirs(directory, applyf)
 
   elif com == 'settings':
+    from acme.core import utils
     print(utils.settings_json())
 
   elif com == 'cleangen':
+    from acme.core import utils
     utils.cleangen(meta)
 
+  elif com == 'startup-profile':
+    from acme.cli import startup
+    startup.startup_profile(params, meta)
+
   elif com == 'http':
     from acme.integrations import http
     http.http_options(params, callname, meta)
@@ -170,6 +244,7 @@ def cli_utils(params, callname, meta):
     print(f'{docs.__utils__.strip()}\n\n')
 
   elif com == 'man':
+    import pydoc
     pydoc.pager(f'{docs.__utils__.strip()}\n\n')
 
   elif com in ('--version', '-v'):
@@ -216,6 +291,7 @@ def cli_dash(params, callname, meta):
     print(f'Action: {action}. Running acme dash via gunicorn/runapp at port {prodPort}.')
     # the prod option currently uses the gunicorn wrapper runapp
     # from: https://github.com/ryt/runapp (requires version 1.4+)
+    from acme.cli import cmd
     cmd.runapp(
       action,
       configDir,
@@ -226,6 +302,7 @@ def cli_dash(params, callname, meta):
     print(use_help)
 
   elif type == 'man':
+    import pydoc
     pydoc.pager(f'\n{use_help}\n\n')
 
   elif type in ('--version', '-v'):
@@ -260,6 +337,7 @@ def main():
   # page help manual docs instead of printing
 
   elif arg1 == 'man':
+    import pydoc
     output = docs.__manual__.strip() + '\n\n'
     return pydoc.pager(output)
 
@@ -283,6 +361,13 @@ def main():
   # Allows /path/to/workspace to be specified explicitly in the first argument of 'acme'.
   # If /path/to/workspace is set, acme will look for a 'logs' directory inside of it or in one of it's parents.
 
+  from acme.core import utils
+
+  # read for each call (the acme daemon runs main() for each command)
+  logsDirName = settings('workspace.logsDirName')
+  genDirName  = settings('workspace.genDirName')
+  appsDirName = settings('workspace.appsDirName')
+
   if len(sys.argv) > 1 and sys.argv[1].endswith('/'):
     params = sys.argv[2:]
     specified_path = sys.argv[1]
@@ -297,21 +382,24 @@ def main():
     gen_dir       = f'{workspace_dir}{genDirName}/'
     apps_dir      = f'{workspace_dir}{appsDirName}/'
 
-    cli_main(
-      params,
-      callname,
-      meta=SimpleNamespace(
-        version=__version__,
-        copyright=docs.__copyright__,
-        manual=docs.__manual__,
-        acme_dir=acme_dir,
-        workspace_dir=workspace_dir,
-        logs_dir=logs_dir,
-        gen_dir=gen_dir,
-        apps_dir=apps_dir,
-      )
+    meta = SimpleNamespace(
+      version=__version__,
+      copyright=docs.__copyright__,
+      manual=docs.__manual__,
+      acme_dir=acme_dir,
+      workspace_dir=workspace_dir,
+      logs_dir=logs_dir,
+      gen_dir=gen_dir,
+      apps_dir=apps_dir,
     )
 
+    # forward to the acme daemon of the workspace (if it's running), otherwise run in-process
+    code = forward_to_daemon(params, meta)
+    if code is not None:
+      return sys.exit(code) if code else None
+
+    cli_main(params, callname, meta)
+
   else:
 
     print('\n'.join((
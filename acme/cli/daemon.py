@@ -0,0 +1,342 @@
+"""
+Acme Daemon
+-----------
+Optional background process that keeps a workspace warm in memory (imports, settings, the compiled
+glossary, the parse cache) & runs acme commands sent to it over a local Unix socket.
+
+Usage:
+  acme daemon start     # starts the daemon of the workspace in the background
+  acme daemon stop
+  acme daemon status
+  acme daemon run       # runs the daemon in the foreground (e.g. from a service manager)
+
+While the daemon of a workspace is running, acme forwards the commands that only print output
+(stats, {date_input}, gencsv, sql) to it & prints the output of the daemon. If the daemon isn't running
+or can't be reached, the commands run in-process as usual (ACME_NO_DAEMON=1 always runs them in-process).
+
+The daemon stops itself when the acme source files or the config files (defaults, acme config & workspace
+config) change, the next command runs in-process. Settings that are read once when the modules are imported
+(e.g. modules.timesheets_categorize.glossaryFile, web.devPort) are read again once it stopped.
+
+The socket is stored in $XDG_RUNTIME_DIR/acme/ (default: the settings cache dir ~/.cache/acme/)
+& the log of the daemon in {workspace}/gen/.cache/daemon.log.
+"""
+
+import os
+import sys
+import time
+import zlib
+import importlib
+
+from types import SimpleNamespace
+
+from acme.core.settings import cache_dir
+
+CONNECT_TIMEOUT = 1  # seconds
+START_TIMEOUT   = 10 # seconds
+
+# modules of the forwarded commands, imported when the daemon starts
+WARM_MODULES = ('acme.core.process', 'acme.core.validate')
+
+# True in the daemon process (commands are never forwarded by the daemon itself)
+serving = False
+
+state = SimpleNamespace(started=0, requests=0, stopping=False, workspace_dir='', sources={})
+
+
+def socket_file(workspace_dir):
+  """Path of the Unix socket of the daemon of a workspace."""
+  runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+  directory = os.path.join(runtime_dir, 'acme') if runtime_dir else cache_dir
+  key = zlib.crc32(os.path.realpath(workspace_dir).encode('utf-8'))
+  return os.path.join(directory, f'daemon-{key:08x}.sock')
+
+
+def send(file, request, timeout=None):
+  """Sends a request (dict) to the daemon listening on file. Returns its response or None if it can't be reached."""
+  import json
+  import socket
+
+  try:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+      sock.settimeout(CONNECT_TIMEOUT)
+      sock.connect(file)
+      sock.settimeout(timeout)
+      sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+      with sock.makefile('rb') as f:
+        line = f.readline()
+    return json.loads(line) if line else None
+  except (OSError, ValueError):
+    return None
+
+
+def forward(argv, workspace_dir):
+  """
+  Runs a command (argv without the program name) in the daemon of the workspace & prints its output.
+  Returns the exit code of the command or None if the daemon didn't run it (not running, unreachable or stale).
+  """
+  from __init__ import __version__
+
+  file = socket_file(workspace_dir)
+  if serving or os.environ.get('ACME_NO_DAEMON') or not os.path.exists(file):
+    return None
+
+  response = send(file, { 'action' : 'run', 'version' : __version__, 'argv' : argv, 'cwd' : os.getcwd() })
+  if not response or 'code' not in response:
+    return None
+
+  sys.stdout.write(response['stdout'])
+  sys.stderr.write(response['stderr'])
+  return response['code']
+
+
+# -- daemon -- #
+
+def file_mtime(file):
+  try:
+    return os.stat(file).st_mtime_ns
+  except OSError:
+    return None
+
+
+def source_signatures():
+  """
+  { file : mtime } of the loaded acme modules & of the config files of the current settings (to detect changes).
+  Config files that don't exist have the mtime None (creating them is a change).
+  """
+  from acme.core import settings
+
+  acme_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+  sources = {}
+  for module in list(sys.modules.values()):
+    file = getattr(module, '__file__', None)
+    if file and file.startswith(acme_dir):
+      mtime = file_mtime(file)
+      if mtime is not None:
+        sources[file] = mtime
+
+  config_files = (settings.defaults_file, settings.acme_config_file)
+  if settings.Settings.current:
+    config_files += (f'{settings.Settings.current.workspace_dir}/{settings.workspace_config_name}',)
+  for file in config_files:
+    sources[file] = file_mtime(file)
+
+  return sources
+
+
+def sources_changed():
+  return any(file_mtime(file) != mtime for file, mtime in state.sources.items())
+
+
+def warm(meta):
+  """Imports the modules of the forwarded commands & loads the glossary & parse cache of the workspace."""
+  for name in WARM_MODULES:
+    importlib.import_module(name)
+
+  from acme.modules import timesheets_cache
+  from acme.modules import timesheets_categorize
+
+  try:
+    timesheets_categorize.load_glossary()
+  except Exception as e:
+    print(f'Notice: the glossary could not be loaded ({e}).')
+
+  timesheets_cache.open_cache(meta.gen_dir)
+
+
+def run_command(argv, cwd):
+  """Runs an acme command in this process (like the acme entry point in cwd) & returns its output & exit code."""
+  import io
+  import traceback
+
+  from contextlib import redirect_stdout, redirect_stderr
+
+  from acme.cli import cli
+  from acme.core.settings import Settings, select_workspace_dir
+
+  stdout, stderr = io.StringIO(), io.StringIO()
+  previous = (os.getcwd(), sys.argv)
+  code = 0
+
+  try:
+    os.chdir(cwd)
+    sys.argv = [previous[1][0], *argv]
+    Settings.setWorkspaceDir(os.path.abspath(select_workspace_dir(sys.argv)))
+
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+      try:
+        cli.main()
+      except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+          code = e.code or 0
+        else:
+          print(e.code, file=sys.stderr)
+          code = 1
+      except Exception:
+        traceback.print_exc()
+        code = 1
+
+  finally:
+    os.chdir(previous[0])
+    sys.argv = previous[1]
+
+  return { 'stdout' : stdout.getvalue(), 'stderr' : stderr.getvalue(), 'code' : code }
+
+
+def respond(request):
+  """Returns the response (dict) to a request of a client."""
+  from __init__ import __version__
+
+  action = request.get('action')
+
+  if action == 'ping':
+    return {
+      'pid'       : os.getpid(),
+      'version'   : __version__,
+      'workspace' : state.workspace_dir,
+      'uptime'    : time.time() - state.started,
+      'requests'  : state.requests,
+    }
+
+  if action == 'stop':
+    state.stopping = True
+    return { 'pid' : os.getpid(), 'stopped' : True }
+
+  if action == 'run':
+    # stale daemon: stop & let the client run the command in-process (with the current source)
+    if request.get('version') != __version__ or sources_changed():
+      print('Notice: the acme source or config changed, stopping the daemon.')
+      state.stopping = True
+      return { 'stale' : True }
+
+    state.requests += 1
+    response = run_command(request.get('argv') or [], request.get('cwd') or state.workspace_dir)
+
+    # modules imported & config files read by the command
+    for file, mtime in source_signatures().items():
+      state.sources.setdefault(file, mtime)
+
+    return response
+
+  return { 'error' : f'Invalid action: {action}' }
+
+
+def run(meta):
+  """Runs the daemon of a workspace in the foreground until it's stopped."""
+  import json
+  import signal
+  import socketserver
+
+  global serving
+  serving = True
+
+  file = socket_file(meta.workspace_dir)
+  running = send(file, { 'action' : 'ping' })
+  if running:
+    print(f"The acme daemon is already running (pid {running['pid']}).")
+    return
+
+  os.makedirs(os.path.dirname(file), mode=0o700, exist_ok=True)
+  if os.path.exists(file): # left by a daemon that didn't stop cleanly
+    os.remove(file)
+
+  state.started       = time.time()
+  state.workspace_dir = meta.workspace_dir
+
+  warm(meta)
+  state.sources = source_signatures()
+
+  class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+      try:
+        request = json.loads(self.rfile.readline() or b'{}')
+      except ValueError:
+        request = {}
+      self.wfile.write(json.dumps(respond(request)).encode('utf-8') + b'\n')
+
+  # SIGTERM -> exit through the finally block below (removes the socket)
+  signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+  server = socketserver.UnixStreamServer(file, Handler)
+  os.chmod(file, 0o600)
+  print(f'acme daemon (pid {os.getpid()}) serving workspace {meta.workspace_dir} on {file}', flush=True)
+
+  try:
+    # requests are handled one at a time (commands change the current dir & settings of the process)
+    while not state.stopping:
+      server.handle_request()
+  finally:
+    server.server_close()
+    try:
+      os.remove(file)
+    except OSError:
+      pass
+    print(f'acme daemon (pid {os.getpid()}) stopped after {state.requests} request(s)', flush=True)
+
+
+def start(meta):
+  """Starts the daemon of a workspace in the background."""
+  import subprocess
+
+  file = socket_file(meta.workspace_dir)
+  running = send(file, { 'action' : 'ping' })
+  if running:
+    print(f"The acme daemon is already running (pid {running['pid']}).")
+    return
+
+  log_file = os.path.join(meta.gen_dir, '.cache', 'daemon.log')
+  os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+  script = f'{os.path.dirname(os.path.dirname(meta.acme_dir))}/acme.py'
+  with open(log_file, 'ab') as log:
+    subprocess.Popen(
+      [sys.executable, script, meta.workspace_dir, 'daemon', 'run'],
+      cwd=meta.workspace_dir, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+    )
+
+  deadline = time.time() + START_TIMEOUT
+  while time.time() < deadline:
+    running = send(file, { 'action' : 'ping' })
+    if running:
+      print(f"Started the acme daemon (pid {running['pid']}) for workspace {meta.workspace_dir}")
+      return
+    time.sleep(0.05)
+
+  print(f'Notice: the acme daemon could not be started, see {log_file}')
+
+
+def stop(meta):
+  stopped = send(socket_file(meta.workspace_dir), { 'action' : 'stop' })
+  print(f"Stopped the acme daemon (pid {stopped['pid']})." if stopped else 'The acme daemon is not running.')
+
+
+def status(meta):
+  file = socket_file(meta.workspace_dir)
+  running = send(file, { 'action' : 'ping' })
+  if not running:
+    print('The acme daemon is not running.')
+    return
+
+  print('\n'.join((
+    f"acme daemon (pid {running['pid']}, version {running['version']})",
+    f"  workspace : {running['workspace']}",
+    f"  socket    : {file}",
+    f"  uptime    : {running['uptime']:.0f} s",
+    f"  requests  : {running['requests']}",
+  )))
+
+
+def daemon_options(params, meta):
+  """Cli options: daemon (start|stop|status|run)"""
+  action = params[0] if params else 'status'
+
+  if action == 'start':
+    start(meta)
+  elif action == 'stop':
+    stop(meta)
+  elif action == 'status':
+    status(meta)
+  elif action == 'run':
+    run(meta)
+  else:
+    print("Use 'acme daemon (start|stop|status|run)'.")
@@ -40,6 +40,49 @@ Usage:
   acme      (gencsv|-g)       {date_input}
   acme      (gencsv|-g)       {date_input}       {module_options}
 
+  Intervals ({from},{to} or {from},{to},{separator}) generate a collection of all days from {from} to {to}.
+  e.g. acme gencsv 2024-01-15,01-30   acme gencsv 12/20/2023,1/5,-to-   acme gencsv 2024-02,2024-03
+
+  Collections also write rollups next to the CSV (e.g. gen/2024.rollups.csv): hours & entry counts per
+  day, ISO week & month for C1, C1/C2 & C1/C2/C3, used by the dashboard for summaries & totals.
+  Collection CSVs that were generated before are patched: only the rows of days whose log files changed are rewritten.
+
+  Month, year & interval collections can be parsed in parallel with N worker processes (optional).
+  acme      (gencsv|-g)       {date_input}       {module_options}      (--jobs|-j) N
+
+  Also write a columnar copy of the CSV with typed columns, read by the dashboard (optional, requires pyarrow),
+  and/or update the entries of the SQLite entry store (gen/acme.sqlite). Formats can be comma separated.
+  acme      (gencsv|-g)       {date_input}       {module_options}      (--format|-f) (parquet|feather|sqlite)
+
+
+  Query the entry store. Table: entries (date, position, hours, description, splits, C1..C10).
+  ---------------------------------------------------------------------------------------------
+  Run       SQL               Query
+  ----------------------------------------------
+  acme      sql               "<query>"
+  acme      sql               "SELECT C2, sum(hours) FROM entries WHERE date BETWEEN '2024-07-01' AND '2024-09-30' GROUP BY C2"
+
+
+  Watch: regenerate the day, month & year outputs of log files as they're saved (see 'acme gencsv' above).
+  Only outputs that were generated before are regenerated. Changes are debounced & coalesced,
+  gencsv options can be added. Uses inotify (--poll: poll for changes).
+  ---------------------------------------------------------------------------------------------------------
+  Run       Watch             Module Options        Options
+  ----------------------------------------------------------------------------
+  acme      watch
+  acme      watch             {module_options}
+  acme      watch             {module_options}      (--format|-f) sqlite
+  acme      watch             {module_options}      --poll
+
+
+  Daemon: keep the workspace warm in memory. While it's running, stats, {date_input}, gencsv & sql are run by
+  the daemon (and in-process if it isn't running). Set ACME_NO_DAEMON=1 to always run commands in-process.
+  ---------------------------------------------------------------------------------------------------------------
+  Run       Daemon            Action
+  ----------------------------------------------
+  acme      daemon            (start|stop|status)
+  acme      daemon            run                   (foreground)
+
 
   Interface for the utility script. For list of commands, use 'acme util help'!
   -----------------------------------------------------------------------------
@@ -131,5 +174,13 @@ Usage:
 
   acme    (utility|util)   garmin      merge-gencsv    {year}
 
+
+  Startup Profile: cold start time & per-import cost of acme commands (budget: 50 ms per command).
+  -----------------------------------------------------------------------------------------------
+  <acme>  <Utility>        <Command>          <Command To Profile>
+
+  acme    (utility|util)   startup-profile
+                           startup-profile    "gencsv today"
+
 """
 
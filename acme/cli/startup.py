@@ -0,0 +1,89 @@
+"""
+Startup Profile
+---------------
+Measures the cold start of acme commands: each command is run in a fresh python process with
+'-X importtime', its wall time is compared to the startup budget & the cost of each import is reported.
+
+Usage:
+  acme util startup-profile                 # profiles 'acme --version' & 'acme stats'
+  acme util startup-profile "gencsv today"  # profiles a specific command
+"""
+
+import os
+import sys
+import time
+import subprocess
+
+# cold start budget of a command (interpreter startup included)
+BUDGET_MS = 50
+
+DEFAULT_COMMANDS = ('--version', 'stats')
+
+# number of imports listed per command
+TOP_IMPORTS = 15
+
+
+def parse_importtime(stderr):
+  """Returns [(name, self ms, cumulative ms, depth), ...] from the '-X importtime' output (stderr)."""
+  imports = []
+  for line in stderr.splitlines():
+    if not line.startswith('import time:') or 'self [us]' in line:
+      continue
+    own, cumulative, name = line[len('import time:'):].split('|', 2)
+    depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+    imports.append((name.strip(), int(own) / 1000, int(cumulative) / 1000, depth))
+  return imports
+
+
+def run_profiled(args, cwd):
+  """Runs python with args & '-X importtime'. Returns (wall ms, imports)."""
+  start = time.perf_counter()
+  process = subprocess.run(
+    [sys.executable, '-X', 'importtime', *args],
+    cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL, text=True,
+  )
+  wall_ms = (time.perf_counter() - start) * 1000
+  return wall_ms, parse_importtime(process.stderr)
+
+
+def startup_profile(params, meta):
+  """Prints the cold start profile of acme commands (params: startup-profile ["<command>"])."""
+  script   = f'{os.path.dirname(os.path.dirname(meta.acme_dir))}/acme.py'
+  commands = [params[1]] if len(params) >= 2 else DEFAULT_COMMANDS
+
+  # interpreter startup without acme (the part of the budget acme can't reduce)
+  base_ms = min(run_profiled(['-c', 'pass'], meta.workspace_dir)[0] for _ in range(3))
+
+  output = [
+    f'Startup budget: {BUDGET_MS} ms per command (python startup: {base_ms:.1f} ms)',
+    '',
+  ]
+
+  for command in commands:
+    args = [script, *command.split()]
+
+    # first run warms the os file cache & the settings startup cache
+    run_profiled(args, meta.workspace_dir)
+    wall_ms, imports = run_profiled(args, meta.workspace_dir)
+
+    top = [i for i in imports if i[3] == 0]
+    status = 'ok' if wall_ms <= BUDGET_MS else 'over budget'
+
+    output += [
+      f'acme {command}',
+      '-' * (len(command) + 5),
+      f'  total: {wall_ms:.1f} ms ({status}), imports: {sum(i[2] for i in top):.1f} ms in {len(imports)} modules',
+      '',
+      f'  {"cumulative":>10}  {"self":>8}  module',
+    ]
+    for name, own_ms, cumulative_ms, depth in sorted(top, key=lambda i: i[2], reverse=True)[:TOP_IMPORTS]:
+      output += [f'  {cumulative_ms:>7.2f} ms  {own_ms:>5.2f} ms  {name}']
+
+    # slowest modules (self time) at any depth, i.e. what to import lazily
+    output += ['', '  slowest modules (self time):']
+    for name, own_ms, cumulative_ms, depth in sorted(imports, key=lambda i: i[1], reverse=True)[:5]:
+      output += [f'  {own_ms:>7.2f} ms  {name}']
+
+    output += ['']
+
+  print('\n'.join(output).rstrip())
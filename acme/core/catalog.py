@@ -0,0 +1,218 @@
+"""
+Log Catalog
+-----------
+Persistent catalog (SQLite) of the files in the logs directory, used by stats, list-files & collections.
+
+Each file is stored with the analysis of its name (valid, date, custom text, Y-m-d format),
+its size, mtime & number of timesheet entries.
+
+The catalog is refreshed incrementally: only directories whose mtime changed since the last
+refresh are listed again (adding, removing or renaming a file changes the mtime of its directory).
+Files that are modified in place don't change their directory's mtime, their size, mtime & entry
+count are updated when their directory changes or when a collection parses them (update_files).
+
+The catalog is stored in {workspace}/gen/.cache/ and can be safely deleted at any time.
+"""
+
+import os
+import sqlite3
+
+from datetime import date
+
+from acme.core import discover
+from acme.modules import timesheets
+
+# bump when the schema or the file name analysis changes
+CATALOG_VERSION = 1
+
+CATALOG_DIR_NAME  = '.cache'
+CATALOG_FILE_NAME = 'catalog.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+  path      TEXT PRIMARY KEY,
+  parent    TEXT,
+  mtime_ns  INTEGER
+);
+CREATE TABLE IF NOT EXISTS files (
+  path        TEXT PRIMARY KEY,
+  dir         TEXT,
+  valid       INTEGER,
+  date        TEXT,
+  custom_text TEXT,
+  ymd         INTEGER,
+  size        INTEGER,
+  mtime_ns    INTEGER,
+  entries     INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_date ON files (date);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+
+class Catalog:
+
+  def __init__(self, logs_dir, gen_dir=None):
+    """Opens the catalog of logs_dir (stored in gen_dir, or in memory if gen_dir is None)."""
+    self.logs_dir = logs_dir
+    self.file     = os.path.join(gen_dir, CATALOG_DIR_NAME, CATALOG_FILE_NAME) if gen_dir else ':memory:'
+
+    try:
+      if self.file != ':memory:':
+        os.makedirs(os.path.dirname(self.file), exist_ok=True)
+      self.db = self.connect(self.file)
+    except (OSError, sqlite3.Error) as e:
+      print(f'Notice: the log catalog could not be opened ({e}), using a temporary catalog.')
+      self.file = ':memory:'
+      self.db = self.connect(self.file)
+
+  def connect(self, file):
+    db = sqlite3.connect(file)
+    if db.execute('PRAGMA user_version').fetchone()[0] != CATALOG_VERSION:
+      db.executescript('DROP TABLE IF EXISTS dirs; DROP TABLE IF EXISTS files;')
+      db.execute(f'PRAGMA user_version = {CATALOG_VERSION}')
+    db.executescript(SCHEMA)
+    return db
+
+  def close(self):
+    self.db.close()
+
+  # -- refresh -- #
+
+  def refresh(self):
+    """Lists the directories that changed since the last refresh & updates their files. Returns self."""
+    known = { path : (parent, mtime_ns) for path, parent, mtime_ns in self.db.execute('SELECT path, parent, mtime_ns FROM dirs') }
+    children = {}
+    for path, (parent, _) in known.items():
+      children.setdefault(parent, []).append(path)
+
+    seen  = set()
+    stack = ['']
+
+    with self.db:
+      while stack:
+        rel = stack.pop()
+        try:
+          mtime_ns = os.stat(os.path.join(self.logs_dir, rel)).st_mtime_ns
+        except OSError:
+          continue
+        seen.add(rel)
+
+        if rel in known and known[rel][1] == mtime_ns:
+          stack += children.get(rel, [])
+          continue
+
+        stack += self.scan_dir(rel)
+        self.db.execute(
+          'INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)',
+          (rel, os.path.dirname(rel) if rel else None, mtime_ns)
+        )
+
+      # directories that were removed
+      for rel in known.keys() - seen:
+        self.db.execute('DELETE FROM dirs WHERE path = ?', (rel,))
+        self.db.execute('DELETE FROM files WHERE dir = ?', (rel,))
+
+    return self
+
+  def scan_dir(self, rel):
+    """Updates the files of directory (rel) and returns its subdirectories."""
+    subdirs = []
+    found   = {}
+
+    with os.scandir(os.path.join(self.logs_dir, rel)) as entries:
+      for entry in entries:
+        path = f'{rel}/{entry.name}' if rel else entry.name
+        if entry.is_dir(follow_symlinks=False):
+          subdirs.append(path)
+        elif entry.is_dir() or entry.name.startswith('.'):
+          continue # symlinked directories aren't followed (like os.walk)
+        else:
+          try:
+            found[path] = entry.stat()
+          except OSError: # e.g. a broken symlink (still listed, like os.walk)
+            found[path] = entry.stat(follow_symlinks=False)
+
+    cataloged = { path : (size, mtime_ns) for path, size, mtime_ns in self.db.execute(
+      'SELECT path, size, mtime_ns FROM files WHERE dir = ?', (rel,)
+    ) }
+
+    for path in cataloged.keys() - found.keys():
+      self.db.execute('DELETE FROM files WHERE path = ?', (path,))
+
+    for path, stat in found.items():
+      if cataloged.get(path) != (stat.st_size, stat.st_mtime_ns):
+        self.update_file(path, rel, stat)
+
+    return subdirs
+
+  def update_file(self, path, rel, stat, entries=None):
+    log_file = discover.classify(path)
+    if log_file and entries is None:
+      entries = count_entries(os.path.join(self.logs_dir, path))
+    self.db.execute(
+      'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+      (
+        path,
+        rel,
+        log_file is not None,
+        log_file.date.isoformat() if log_file else None,
+        log_file.custom_text if log_file else '',
+        log_file.ymd if log_file else False,
+        stat.st_size,
+        stat.st_mtime_ns,
+        entries or 0,
+      )
+    )
+
+  def update_files(self, entry_counts):
+    """Updates the stat & entry count of parsed log files whose count changed: { path (relative to logs_dir) : entry count }"""
+    cataloged = dict(self.db.execute('SELECT path, entries FROM files'))
+    with self.db:
+      for path, entries in entry_counts.items():
+        if cataloged.get(path) == entries:
+          continue
+        try:
+          stat = os.stat(os.path.join(self.logs_dir, path))
+        except FileNotFoundError:
+          continue
+        self.update_file(path, os.path.dirname(path), stat, entries)
+
+  # -- queries -- #
+
+  def files(self):
+    """Returns all files as dicts (path, valid, date, custom_text, ymd, size, mtime_ns, entries) sorted by path."""
+    cursor = self.db.execute('SELECT path, valid, date, custom_text, ymd, size, mtime_ns, entries FROM files ORDER BY path')
+    names  = [c[0] for c in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+  def find_logs(self, date_from, date_to):
+    """Returns { date : [LogFile, ...] } for all days from date_from to date_to (inclusive), in date order (see discover.sort_key)."""
+    days = {}
+    rows = self.db.execute(
+      'SELECT path, date, custom_text, ymd FROM files WHERE valid AND date BETWEEN ? AND ?',
+      (date_from.isoformat(), date_to.isoformat())
+    )
+    log_files = [discover.LogFile(path, date.fromisoformat(day), custom_text, bool(ymd)) for path, day, custom_text, ymd in rows]
+    for log_file in sorted(log_files, key=discover.sort_key):
+      days.setdefault(log_file.date, []).append(log_file)
+    return days
+
+  def spans(self):
+    """Returns { year : { month : (days, entries) } } for all valid log files."""
+    spans = {}
+    rows = self.db.execute(
+      'SELECT substr(date, 1, 4), substr(date, 6, 2), count(DISTINCT date), sum(entries) '
+      'FROM files WHERE valid GROUP BY 1, 2 ORDER BY 1, 2'
+    )
+    for year, month, days, entries in rows:
+      spans.setdefault(year, {})[month] = (days, entries)
+    return spans
+
+
+def count_entries(filename):
+  """Returns the number of timesheet entries in a log file (0 if it can't be read)."""
+  try:
+    return sum(1 for _ in timesheets.iter_entries(timesheets.read_log(filename)))
+  except (OSError, UnicodeDecodeError):
+    return 0
@@ -0,0 +1,60 @@
+"""
+Log File Discovery
+------------------
+Analysis of daily log file names (used by the log catalog & watch mode).
+
+Valid log file names (ISO 8601), relative to the logs directory:
+  yyyy/mm/dd.txt                  e.g. 2024/01/01.txt
+  yyyy/mm/dd<custom>.txt          e.g. 2024/01/01abc.txt
+  yyyy/mm/yyyy-mm-dd<custom>.txt  e.g. 2024/01/2024-01-01abc.txt
+  yyyy/yyyy-mm-dd<custom>.txt     e.g. 2024/2024-01-01abc.txt
+
+Notes:
+  - custom text is optional, can't start with a digit and can't contain a slash
+  - the year & month in Y-m-d names must match the directories they're in
+  - impossible dates (e.g. 2024/02/31.txt) are not valid
+"""
+
+import os
+import re
+
+from collections import namedtuple
+from datetime import date
+
+# -- valid log file names (groups: Y, M, D, custom text) -- #
+
+LOG_FILE_PATTERNS = (
+  # e.g. 2024/01/2024-01-01abc.txt
+  ('ymd', re.compile(r'^(\d{4})/(\d{2})/\1-\2-(\d{2})(\D[^/]*)?\.txt$')),
+  # e.g. 2024/2024-01-01abc.txt
+  ('ymd', re.compile(r'^(\d{4})/\1-(\d{2})-(\d{2})(\D[^/]*)?\.txt$')),
+  # e.g. 2024/01/01abc.txt & 2024/01/01.txt
+  ('day', re.compile(r'^(\d{4})/(\d{2})/(\d{2})(\D[^/]*)?\.txt$')),
+)
+
+# path : relative to the logs directory (e.g. 2024/01/01abc.txt)
+# date : datetime.date of the entries
+# custom_text : custom part of the name (e.g. abc) or ''
+# ymd : True if the name is in Y-m-d format
+LogFile = namedtuple('LogFile', ('path', 'date', 'custom_text', 'ymd'))
+
+
+def classify(path):
+  """Returns a LogFile for a valid log file path (relative to the logs directory) or None if the name is invalid."""
+  path = path.replace(os.sep, '/')
+  for kind, pattern in LOG_FILE_PATTERNS:
+    match = pattern.match(path)
+    if match is None:
+      continue
+    y, m, d, custom_text = match.groups()
+    try:
+      day = date(int(y), int(m), int(d))
+    except ValueError:
+      return None
+    return LogFile(path, day, custom_text or '', kind == 'ymd')
+  return None
+
+
+def sort_key(log_file):
+  """Files of the same day: dd.txt first, then all others by name."""
+  return (log_file.date, log_file.custom_text != '' or log_file.ymd, log_file.path)
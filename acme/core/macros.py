@@ -6,8 +6,11 @@ note: text conversion functions originally written as apps script macros for goo
 """
 
 import re
+import calendar
 
 from functools import reduce
+from functools import lru_cache
+from datetime import date
 from datetime import datetime
 from datetime import timedelta
 from types import SimpleNamespace
@@ -112,6 +115,7 @@ def convert_to_hours(inp):
   return round(float(num), 4)
 
 
+@lru_cache(maxsize=4096)
 def hours_to_human(inp, minimize=False):
   """Hours to human converter."""
   """Returns e.g: [8 hrs 45 min] or [8h 45m] <- minimize"""
@@ -139,37 +143,25 @@ def hours_to_human(inp, minimize=False):
   return hrs_str + mins_str
 
 
-def raw_time_to_excel_sum(inp):
-  """Receives a raw time string & returns a tuple: (list of hour splits, calculation in hours)"""
-  sumfunc = ''
-  calchrs = ''
-  timestp = ''
+@lru_cache(maxsize=4096)
+def raw_time_to_hours(inp):
+  """Receives a raw time string & returns a tuple: (tuple of hour splits, total hours) as floats"""
   inp = inp.strip()
 
   # inp: 1m|2.5s|1:30h|1.234h etc...
-  
-  if inp:
-    rwtm = inp
 
-    if rwtm:
-      rwtm = rwtm.strip(';,')
-      rwtm = rwtm.replace(' ', ',')
-      rwtm = re.sub(r',{2,}', ',', rwtm)
+  if not inp:
+    return ((), 0.0)
 
-      # split & parse each time unit
-      rwtm = rwtm.split(',')
+  rwtm = inp.strip(';,')
+  rwtm = rwtm.replace(' ', ',')
+  rwtm = re.sub(r',{2,}', ',', rwtm)
 
-      # convert each unit into hours
-      cvtm = [round(convert_to_hours(u), 4) for u in rwtm]
+  # split & parse each time unit, convert each unit into hours
+  cvtm = tuple(round(convert_to_hours(u), 4) for u in rwtm.split(','))
 
-      # create a new list with the converted units
-      rwtm = ' '.join(str(u) for u in cvtm)
-      sumfunc = rwtm
-
-      # apply the sum function to the new list -> str()
-      calchrs = str(round(reduce(lambda a, b: a + b, cvtm, 0), 4))
-
-  return (sumfunc, calchrs)
+  # apply the sum function to the converted units
+  return (cvtm, round(reduce(lambda a, b: a + b, cvtm, 0), 4))
 
 
 def is_date_input(inp):
@@ -210,22 +202,61 @@ def check_is_valid_interval(inp):
       printx(invalid_interval_text, invalid_interval_code)
       return False
 
-    parsed_interval_from = macros.parse_date_input(interval_from)
-    parsed_interval_to   = macros.parse_date_input(interval_to)
+    parsed_interval_from = parse_date_input(interval_from)
+    parsed_interval_to   = parse_date_input(interval_to)
+
+    if not parsed_interval_from.ymd_dash or not parsed_interval_to.ymd_dash:
+      printx(invalid_interval_text, invalid_interval_code)
+      return False
 
-    if not parsed_interval_from.res_ymd_dash or not parsed_interval_to.res_ymd_dash:
+    # first day of {from} & last day of {to} (months & years include all of their days)
+    # a {to} without a year (e.g. 2024-01-15,01-30) is in the year of {from}, or the next one if it would end before {from}
+    try:
+      date_from = date_input_bounds(parsed_interval_from)[0]
+      if 'Y' not in parsed_interval_to.input_format and parsed_interval_to.input_format != 'keyword':
+        parsed_interval_to.each['Y'] = str(date_from.year)
+        date_to = date_input_bounds(parsed_interval_to)[1]
+        if date_to < date_from:
+          parsed_interval_to.each['Y'] = str(date_from.year + 1)
+          date_to = date_input_bounds(parsed_interval_to)[1]
+      else:
+        date_to = date_input_bounds(parsed_interval_to)[1]
+    except ValueError:
       printx(invalid_interval_text, invalid_interval_code)
       return False
 
+    if date_to < date_from:
+      printx(f'The interval {{to}} date ({date_to}) is before the {{from}} date ({date_from}).', invalid_interval_code)
+      return False
+
     return SimpleNamespace(
       parsed_interval_from=parsed_interval_from,
       parsed_interval_to=parsed_interval_to,
       interval_seperator=interval_seperator,
+      date_from=date_from,
+      date_to=date_to,
     )
 
   return False
 
 
+def date_input_bounds(parsed):
+  """
+  Returns the first & last day (datetime.date) of a parsed date input (see parse_date_input).
+  Dates return themselves, months & years their first & last days. Raises ValueError for invalid dates.
+  """
+  y = int(parsed.each['Y'])
+  m = int(parsed.each['M']) if parsed.each['M'] else 0
+  d = int(parsed.each['D']) if parsed.each['D'] else 0
+
+  if d:
+    day = date(y, m, d)
+    return day, day
+  if m:
+    return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+  return date(y, 1, 1), date(y, 12, 31)
+
+
 def parse_date_input(inp):
   """Receives a date input string of many date types and returns a dict with details & conversions"""
   inp = inp.strip()
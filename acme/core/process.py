@@ -2,14 +2,22 @@
 
 import os
 import re
+import sqlite3
 import itertools
 
+from types import SimpleNamespace
+
 from tabulate import tabulate
 
 from acme.core import utils
 from acme.core import macros
+from acme.core import catalog
 
 from acme.modules import timesheets
+from acme.modules import timesheets_cache
+from acme.modules import timesheets_collection
+from acme.modules import timesheets_columnar
+from acme.modules import timesheets_store
 from acme.core.settings import Settings
 
 settings = Settings.settings
@@ -29,19 +37,18 @@ def handle_date_input(parsed, meta):
   max_col = 30
   for show_file in show_files_list:
     if os.path.isfile(show_file):
-      with open(show_file, 'r') as file:
-        show_file_csv = timesheets.convert_to_csv(file.read(), parsed.ymd_dash)
-        trimmed_csv = [
-          [
-            (s[:max_col] + '...' if len(s) > max_col else s) for s in sublist
-          ] for sublist in show_file_csv
-        ]
-        table_csv = tabulate(
-          trimmed_csv,
-          tablefmt='simple',
-          maxcolwidths=max_col+3
-        )
-        output += [table_csv]
+      show_file_csv = timesheets.convert_to_csv(timesheets.read_log(show_file), parsed.ymd_dash)
+      trimmed_csv = [
+        [
+          (s[:max_col] + '...' if len(s) > max_col else s) for s in sublist
+        ] for sublist in show_file_csv
+      ]
+      table_csv = tabulate(
+        trimmed_csv,
+        tablefmt='simple',
+        maxcolwidths=max_col+3
+      )
+      output += [table_csv]
 
   return output
 
@@ -50,6 +57,28 @@ def handle_timesheets(params, callname, meta):
   """Handle gencsv/timesheets inputs: acme (gencsv|-g) {date_input}"""
   output = []
 
+  # optional: --jobs N (or -j N) parses collection log files with N worker processes
+  # optional: --format parquet|feather|sqlite (or -f, comma separated) also writes a columnar copy of the csv
+  #           and/or updates the entry store (gen/acme.sqlite)
+  params, jobs          = pop_option(params, ('--jobs', '-j'))
+  params, output_format = pop_option(params, ('--format', '-f'))
+
+  if jobs is not None and not (jobs.isdigit() and int(jobs) > 0):
+    output += [f'Please specify a valid number of jobs (e.g. --jobs 4).']
+    return output
+
+  output_formats = tuple(f for f in (output_format or 'csv').split(',') if f)
+  valid_formats  = ('csv', *timesheets_columnar.FORMATS, 'sqlite')
+
+  if not output_formats or any(f not in valid_formats for f in output_formats):
+    output += [f"Please specify a valid output format: {', '.join(valid_formats)}."]
+    return output
+
+  options = SimpleNamespace(
+    jobs=int(jobs) if jobs else 1,
+    output_formats=output_formats,
+  )
+
   if len(params) < 2:
     output += [f'Please specify a valid date (Y-m-d), month (Y-m), or year (Y).']
     return output
@@ -77,20 +106,27 @@ def handle_timesheets(params, callname, meta):
   # - ensure {date_input} is not an interval #
   if os.path.exists(filename) and not valid_interval_input:
 
-    # convert individual log txt file
-    with open(filename, 'r') as file:
-      entries = file.read()
-
-    entries = macros.csvtext(timesheets.convert_to_csv(
-      entries,
-      ymd_date=parsed.ymd_dash,
-      customize=customize
-    ))
+    # convert individual log txt file (from the parse cache, lines appended since the last run are parsed)
+    parse_cache = timesheets_cache.open_cache(meta.gen_dir)
+    entries = parse_cache.parse(filename, parsed.ymd_dash, customize)
 
     # generate individual log csv file
     genfile = f'{meta.gen_dir}{parsed.ymd_dash}.csv'
-    utils.write_to_file(genfile, entries)
-    output += [f'Generated CSV file {genfile} successfully.']
+    for file in write_gen_file(genfile, timesheets.iter_csv_rows(entries, customize=customize), options.output_formats):
+      output += [f'Generated {file_type(file)} file {file} successfully.']
+
+    if 'sqlite' in options.output_formats:
+      # the store always has the entries of all log files of the day (e.g. 01.txt & 01abc.txt),
+      # as parsed for collections (e.g. with $shortcuts expanded)
+      day = macros.date_input_bounds(parsed)[0]
+      log_catalog = catalog.Catalog(meta.logs_dir, meta.gen_dir).refresh()
+      days = [(f'{meta.logs_dir}{log_file.path}', parsed.ymd_dash) for log_file in log_catalog.find_logs(day, day).get(day, [])]
+      log_catalog.close()
+
+      entries = [e for day_entries in parse_cache.parse_days(days, collection_customize()) for e in day_entries]
+      output += update_entry_store(meta, day, day, entries)
+
+    parse_cache.save()
 
 
   # -- case 2: look for collections of log files (month, year) -- #
@@ -100,11 +136,11 @@ def handle_timesheets(params, callname, meta):
 
     # year collections
     if lenfn == 4:
-      output += generate_collections('year', meta, parsed, customize)
+      output += generate_collections('year', meta, parsed, customize, options)
 
     # month collections
     elif lenfn == 7:
-      output += generate_collections('month', meta, parsed, customize)
+      output += generate_collections('month', meta, parsed, customize, options)
 
 
   # -- case 3: process intervals (e.g. acme gencsv 2025-01-05,2025-01-10 etc.) -- #
@@ -119,27 +155,16 @@ def handle_timesheets(params, callname, meta):
     #
     #   If commas are detected, the interval parameters will be parsed before everything else.
 
-    pif = valid_interval_input.parsed_interval_from
-    pit = valid_interval_input.parsed_interval_to
-
-    pif_ymd_dash = pif.ymd_dash
-    pit_ymd_dash = pit.ymd_dash
-
-    pif_Y = pif.each['Y']
-    pit_Y = pit.each['Y']
-    pit_M = pit.each['M']
-    pit_D = pit.each['D']
-
-    to_format = f'{pit_M}-{pit_D}' if pif_Y == pit_Y else pit_ymd_dash # option for: _01-01 instead of _2024-01-01
-    genfile   = f'{pif_ymd_dash}{valid_interval_input.interval_seperator}{to_format}.csv'
+    date_from = valid_interval_input.date_from
+    date_to   = valid_interval_input.date_to
 
-    output += [f'Creating a collection for intervals from {pif_ymd_dash} to {pit_ymd_dash}:']
-    output += ['...']
-    
-    # todo: parse interval logs
-    # todo: generate interval collection csv {genfile}
+    to_format = date_to.strftime('%m-%d') if date_from.year == date_to.year else date_to.isoformat() # option for: _01-01 instead of _2024-01-01
+    genfile   = f'{meta.gen_dir}{date_from.isoformat()}{valid_interval_input.interval_seperator}{to_format}.csv'
 
-    output += [f'Mock-generated CSV file {genfile} successfully.']
+    output += [f'Creating a collection for intervals from {date_from.isoformat()} to {date_to.isoformat()}:']
+    output += generate_collection(
+      'interval', f'{date_from.isoformat()} to {date_to.isoformat()}', date_from, date_to, genfile, meta, customize, options
+    )
 
 
   # -- case 4: no valid log file -- #
@@ -152,63 +177,183 @@ def handle_timesheets(params, callname, meta):
 
 
 
-def generate_collections(period='year', meta=None, parsed=None, customize=None):
-  """Generate collection csvs for periods: year, month."""
+def handle_sql(params, meta):
+  """Handle entry store queries: acme sql "<query>" """
   output = []
 
-  if not meta.logs_dir or not parsed.ymd_slash or not parsed.ymd_dash:
-    output += ['One of the following values is invalid: logs_dir, parsed.ymd_slash, parsed.ymd_dash.']
+  if len(params) < 2 or not params[1].strip():
+    output += ['Please specify a query, e.g. acme sql "SELECT C1, sum(hours) FROM entries GROUP BY C1".']
     return output
 
-  preCustomize = timesheets.Customize(
+  if not os.path.isfile(timesheets_store.store_file(meta.gen_dir)):
+    output += ['The entry store does not exist yet. Create it with: acme gencsv {date_input} --format sqlite']
+    return output
+
+  try:
+    headers, rows = timesheets_store.query(meta.gen_dir, ' '.join(params[1:]))
+  except sqlite3.Error as e:
+    output += [f'Query error: {e}']
+    return output
+
+  output += [tabulate(rows, headers=headers, tablefmt='simple')]
+  output += [f'({len(rows)} row{"" if len(rows) == 1 else "s"})']
+
+  return output
+
+
+def pop_option(params, names):
+  """
+  Removes an option from params: (name) value or (name)=value for each name in names.
+  Returns (params, value). value is None if the option isn't set.
+  """
+  params = list(params)
+  for i, param in enumerate(params):
+    for name in names:
+      if param.startswith(f'{name}='):
+        del params[i]
+        return params, param[len(name)+1:]
+      if param == name:
+        value = params[i+1] if len(params) > i + 1 else ''
+        del params[i:i+2]
+        return params, value
+  return params, None
+
+
+def write_gen_file(genfile, rows, output_formats=('csv',)):
+  """
+  Writes csv rows to genfile and, for each columnar format (parquet, feather) in output_formats, a copy next to it.
+  Returns the files that were written.
+  """
+  columnar_formats = [f for f in output_formats if f in timesheets_columnar.FORMATS]
+
+  if not columnar_formats:
+    utils.write_csv(genfile, rows)
+    return [genfile]
+
+  rows = list(rows) # used by all writers
+  utils.write_csv(genfile, rows)
+  written = [genfile]
+  df = timesheets_columnar.frame_from_rows(rows)
+  for fmt in columnar_formats:
+    columnar = timesheets_columnar.write_frame(df, genfile, fmt)
+    written += [columnar] if columnar else []
+  return written
+
+
+def update_entry_store(meta, date_from, date_to, entries):
+  """Updates the days from date_from to date_to in the entry store (gen/acme.sqlite)."""
+  store = timesheets_store.EntryStore(meta.gen_dir)
+  try:
+    changed, unchanged = store.update(date_from, date_to, entries)
+  finally:
+    store.close()
+  return [f'Updated entry store {store.file}: {changed} changed day(s), {unchanged} unchanged.']
+
+
+def file_type(file):
+  return os.path.splitext(file)[1].lstrip('.').upper()
+
+
+def collection_customize():
+  """Customize options for the entries of each log file in collections."""
+  return timesheets.Customize(
     apply_to_each_entry=('categorize','capitalize'),
     add_header=False,
     add_footer=False,
   )
-  postCustomize = customize
 
-  is_month = True if period == 'month' else False
 
-  period_collection = []
-  collcount = 0
-  range_end = 2 if is_month else 13 # <- for month collections: range(1,2) <- ends at 2 instead of 13
+def generate_collections(period='year', meta=None, parsed=None, customize=None, options=None):
+  """Generate collection csvs for periods: year, month."""
+  output = []
+
+  if not meta.logs_dir or not parsed.ymd_slash or not parsed.ymd_dash:
+    output += ['One of the following values is invalid: logs_dir, parsed.ymd_slash, parsed.ymd_dash.']
+    return output
+
+  try:
+    date_from, date_to = macros.date_input_bounds(parsed)
+  except ValueError:
+    output += [f'The {period} ({parsed.ymd_dash}) is not valid.']
+    return output
+
+  genfile = f'{meta.gen_dir}{parsed.ymd_dash}.csv'
+
+  return generate_collection(period, parsed.ymd_slash, date_from, date_to, genfile, meta, customize, options)
 
-  for m in range(1, range_end):
-    m = str(m).zfill(2)
-    for dateNum in range(1,32):
-      dateNum = str(dateNum).zfill(2)
 
-      if is_month:
-        filename  = f'{meta.logs_dir}{parsed.ymd_slash}/{dateNum}.txt'
-        entry_ymd = f'{parsed.ymd_dash}-{dateNum}'
-      else:
-        filename  = f'{meta.logs_dir}{parsed.ymd_slash}/{m}/{dateNum}.txt'
-        entry_ymd = f'{parsed.ymd_dash}-{m}-{dateNum}'
+def generate_collection(period, span, date_from, date_to, genfile, meta, customize, options=None):
+  """
+  Generate a collection csv (genfile) & its rollups from the log files of all days from date_from to date_to (inclusive).
+  period & span are only used in the output messages (e.g. 'year', '2024').
+  options: jobs (number of processes that parse log files), output_formats (csv, parquet, feather, sqlite)
+  """
+  output = []
+  options = options or SimpleNamespace(jobs=1, output_formats=('csv',))
 
-      if not os.path.exists(filename):
-        continue
+  preCustomize = collection_customize()
+  postCustomize = customize
+
+  parse_cache = timesheets_cache.open_cache(meta.gen_dir)
+
+  # find the log files of the days in [date_from, date_to] (from the log catalog)
+  log_catalog = catalog.Catalog(meta.logs_dir, meta.gen_dir).refresh()
+  log_files = [
+    (log_file.path, day.isoformat())
+      for day, day_files in log_catalog.find_logs(date_from, date_to).items()
+        for log_file in day_files
+  ]
+  days = [(f'{meta.logs_dir}{path}', ymd) for path, ymd in log_files]
 
-      with open(filename, 'r') as file:
-        entries = file.read()
+  # parse each individual log txt file (unchanged files are loaded from the parse cache)
+  period_collection = parse_cache.parse_days(days, preCustomize, options.jobs, span=(date_from, date_to))
+  collcount = len(days)
 
-      # convert each individual log txt file
-      entries = timesheets.convert_to_csv(entries, entry_ymd, customize=preCustomize)
-      period_collection.append(entries)
-      collcount += 1
+  parse_cache.save()
 
-  output += [f'Found {collcount} daily log file(s) for ({parsed.ymd_slash}) {period} collection.']
+  # keep the entry counts of the catalog up to date
+  log_catalog.update_files({ path : len(entries) for (path, _), entries in zip(log_files, period_collection) })
+  log_catalog.close()
+
+  output += [f'Found {collcount} daily log file(s) for ({span}) {period} collection.']
+
+  # group the entries by day: [(date ordinal, day key, entries), ...], the key of a day changes with its log files
+  collection_days = []
+  day_keys = zip(days, parse_cache.keys(days, preCustomize))
+  for ymd, day_files in itertools.groupby(zip(day_keys, period_collection), key=lambda day: day[0][0][1]):
+    day_files = list(day_files)
+    collection_days.append((
+      timesheets.date_ordinal(ymd),
+      tuple((filename, parse_cache.content_digest(key)) for ((filename, _), key), _ in day_files),
+      [e for _, entries in day_files for e in entries],
+    ))
 
   # combine all the lists into one list
-  period_collection = list(itertools.chain(*period_collection))
+  period_collection = [e for _, _, entries in collection_days for e in entries]
 
-  # add modifications: header & footer calculations, categorize
-  period_collection = timesheets.modify_csv(period_collection, customize=postCustomize)
+  if any(f in timesheets_columnar.FORMATS for f in options.output_formats):
+    # write collection csv file & columnar copies, rows are written as they're produced
+    # add modifications: header & footer calculations, categorize
+    rows = timesheets.iter_csv_rows(period_collection, customize=postCustomize)
 
-  # write collection csv file
-  genfile = f'{meta.gen_dir}{parsed.ymd_dash}.csv'
-  utils.write_to_file(genfile, macros.csvtext(period_collection))
+    for file in write_gen_file(genfile, rows, options.output_formats):
+      output += [f'Generated {period} collection {file_type(file)} file {file} successfully.']
+
+  else:
+    # write collection csv file, patched by day if it was written before (only the rows of changed days are formatted)
+    formatted, patched = timesheets_collection.write_collection(
+      meta.gen_dir, genfile, collection_days, postCustomize, parse_cache.options_key(None, preCustomize)[1:]
+    )
+    patched = f' (patched {formatted} changed day(s))' if patched else ''
+    output += [f'Generated {period} collection {file_type(genfile)} file {genfile} successfully{patched}.']
+
+  # hours & entry counts per day, week & month x C1, C1/C2, C1/C2/C3 (only changed days are rolled up again)
+  from acme.modules import timesheets_rollups # imported here: numpy is only needed by collections
+  rollups, changed, unchanged = timesheets_rollups.update_rollups(meta.gen_dir, genfile, period_collection)
+  output += [f'Generated {period} collection rollups file {rollups} ({changed} changed day(s), {unchanged} unchanged).']
 
-  output += [f'Generated {period} collection CSV file {genfile} successfully.']
+  if 'sqlite' in options.output_formats:
+    output += update_entry_store(meta, date_from, date_to, period_collection)
 
   return output
 
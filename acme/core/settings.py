@@ -2,26 +2,141 @@
 
 import os
 import sys
-import yaml
+import copy
+import pickle
+import threading
 
-from pathlib import Path
-from functools import reduce
+from types import MappingProxyType
 
 
 def merge_dicts_nested(*dicts):
-  """Utility func to merge dicts and handle nesting."""
+  """Utility func to merge dicts and handle nesting. The dicts are not modified (nested values are copied)."""
   result = {}
   def merge(source, destination):
     for key, value in source.items():
-      if isinstance(value, dict) and key in destination:
+      if isinstance(value, dict):
+        if not isinstance(destination.get(key), dict):
+          destination[key] = {}
         merge(value, destination[key])  # recursive call for nested dict
       else:
-        destination[key] = value  # override or set the value
+        destination[key] = copy.deepcopy(value)  # override or set the value
   for d in dicts:
-    merge(d, result)
+    merge(d or {}, result)
   return result
 
 
+def freeze(value):
+  """Read only copy of a settings value: dicts -> mappingproxy, lists -> tuples."""
+  if isinstance(value, dict):
+    return MappingProxyType({ k : freeze(v) for k, v in value.items() })
+  if isinstance(value, (list, tuple)):
+    return tuple(freeze(v) for v in value)
+  return value
+
+
+def thaw(value):
+  """Plain (mutable) copy of a frozen settings value."""
+  if isinstance(value, MappingProxyType):
+    return { k : thaw(v) for k, v in value.items() }
+  if isinstance(value, tuple):
+    return [thaw(v) for v in value]
+  return value
+
+
+class StartupCache:
+  """
+  Parsed yaml config files cached by path & signature (mtime & size) in a pickle file, so starting acme
+  doesn't import & run the yaml parser unless a config file changed. The cache is stored in
+  $XDG_CACHE_HOME/acme/ (default: ~/.cache/acme/) and can be safely deleted at any time.
+  """
+
+  # bump when the cached data changes
+  version = 1
+
+  def __init__(self, file):
+    self.file   = file
+    self.files  = {} # { path : (signature, parsed data) }
+    self.dirty  = False
+
+    try:
+      with open(self.file, 'rb') as f:
+        version, files = pickle.load(f)
+      if version == StartupCache.version:
+        self.files = files
+    except Exception: # missing or unreadable cache -> start empty
+      pass
+
+  def load(self, path):
+    """Returns the parsed yaml file at path (None if it doesn't exist). Raises yaml errors of invalid files."""
+    try:
+      stat = os.stat(path)
+      signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+      signature = None
+
+    cached = self.files.get(path)
+    if cached and cached[0] == signature:
+      return copy.deepcopy(cached[1])
+
+    data = None
+    if signature:
+      import yaml
+      with open(path, 'r') as file:
+        data = yaml.safe_load(file)
+
+    self.files[path] = (signature, copy.deepcopy(data))
+    self.dirty = True
+    return data
+
+  def save(self):
+    """Writes the cache if a file was (re)parsed (atomically, errors are ignored: the cache is optional)."""
+    if not self.dirty:
+      return
+    temp = f'{self.file}.{os.getpid()}.tmp'
+    try:
+      os.makedirs(os.path.dirname(self.file), exist_ok=True)
+      with open(temp, 'wb') as f:
+        pickle.dump((StartupCache.version, self.files), f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(temp, self.file)
+      self.dirty = False
+    except Exception:
+      try:
+        os.remove(temp)
+      except OSError:
+        pass
+
+
+class SettingsSnapshot:
+  """
+  Immutable merged settings (defaults, acme config & workspace config) of a workspace.
+  All dotted keys are precomputed, so lookups (snapshot.get('web.addNavLinks')) are a single dict access.
+  """
+
+  __slots__ = ('workspace_dir', 'data', 'values')
+
+  def __init__(self, data, workspace_dir):
+    self.workspace_dir  = workspace_dir
+    self.data           = freeze(data)
+    self.values         = {}
+
+    stack = [('', self.data)]
+    while stack:
+      prefix, mapping = stack.pop()
+      for key, value in mapping.items():
+        dotted = f'{prefix}{key}'
+        self.values[dotted] = value
+        if isinstance(value, MappingProxyType):
+          stack.append((f'{dotted}.', value))
+
+  def get(self, key, default=False):
+    """Usage: snapshot.get('acme.configDir') ... (default: False, same as Settings.settings)"""
+    return self.values.get(key, default)
+
+  def to_dict(self):
+    """Plain (mutable) copy of all settings."""
+    return thaw(self.data)
+
+
 class Settings:
 
   defaults          = {}
@@ -29,73 +144,108 @@ class Settings:
   workspace_config  = {}
   merged_settings   = {}
 
-  def setWorkspaceDir(dir):
-    """Manually set workspace dir"""
+  current           = None  # SettingsSnapshot of the current workspace (used by settings())
+  snapshots         = {}    # { workspace dir : (config file signature, SettingsSnapshot) }
+  cache             = None  # StartupCache of the parsed config files
+  lock              = threading.Lock()
+
+  def snapshot(dir):
+    """
+    Returns the settings snapshot of a workspace dir. Snapshots are cached per workspace and only rebuilt
+    when its config file changes (mtime & size), so repeated lookups don't parse any yaml.
+    """
+    config_file = f"{dir}/{Settings.defaults['workspace']['configFileName']}"
     try:
-      with open(f"{dir}/{Settings.defaults['workspace']['configFileName']}", 'r') as file:
-        Settings.workspace_config = yaml.safe_load(file)
-    except:
-      pass
-    Settings.defaults['workspace']['currentWorkspaceDir'] = dir
-    Settings.merged_settings = merge_dicts_nested(
-      Settings.defaults, 
-      Settings.acme_config, 
-      Settings.workspace_config
+      stat = os.stat(config_file)
+      signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+      signature = None
+
+    cached = Settings.snapshots.get(dir)
+    if cached and cached[0] == signature:
+      return cached[1]
+
+    workspace_config = {}
+    if signature:
+      try:
+        with Settings.lock:
+          workspace_config = Settings.cache.load(config_file) or {}
+          Settings.cache.save()
+      except:
+        pass
+
+    snapshot = SettingsSnapshot(
+      merge_dicts_nested(
+        Settings.defaults,
+        { 'workspace' : { 'currentWorkspaceDir' : dir } },
+        Settings.acme_config,
+        workspace_config,
+      ),
+      dir,
     )
-  
+
+    with Settings.lock:
+      Settings.snapshots[dir] = (signature, snapshot)
+
+    return snapshot
+
+  def setWorkspaceDir(dir):
+    """Manually set workspace dir (the cached snapshot of the workspace becomes the current settings)"""
+    Settings.use(Settings.snapshot(dir))
+
+  def use(snapshot):
+    """Make a snapshot the current settings"""
+    Settings.current          = snapshot
+    Settings.merged_settings  = snapshot.data
+
   def settings(key):
     """Usage: settings('acme.configDir') ... """
-    try:
-      return reduce(lambda c, k: c[k], key.split('.'), Settings.merged_settings)
-    except:
-      return False
+    return Settings.current.get(key) if Settings.current else False
 
 
-acme_main = Path(__file__).resolve().parent.parent
-tests_dir = f'{acme_main.parent}/tests'
+acme_main = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+tests_dir = f'{os.path.dirname(acme_main)}/tests'
 
-# load all available config files
+cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'acme')
+
+# load all available config files (parsed files come from the startup cache unless they changed)
+
+Settings.cache = StartupCache(f'{cache_dir}/settings_cache.pickle')
 
 # -- load: defaults -- #
 defaults_file  = f'{acme_main}/conf/defaults.yaml'
-with open(defaults_file, 'r') as file:
-  Settings.defaults = yaml.safe_load(file)
-  # modify: expand to full paths
-  Settings.defaults['acme']['configDir'] = os.path.expanduser(Settings.defaults['acme']['configDir'])
+Settings.defaults = Settings.cache.load(defaults_file)
+# modify: expand to full paths
+Settings.defaults['acme']['configDir'] = os.path.expanduser(Settings.defaults['acme']['configDir'])
 
 
 # -- load: acme config -- #
 acme_config_file = f"{Settings.defaults['acme']['configDir']}/{Settings.defaults['acme']['configFileName']}"
 try:
-  with open(acme_config_file, 'r') as file:
-    Settings.acme_config = yaml.safe_load(file)
+  Settings.acme_config = Settings.cache.load(acme_config_file) or {}
 except:
   pass
 
+# written here too, workspaces without a workspace config don't save the cache in snapshot()
+Settings.cache.save()
+
 
 # -- load: workspace config -- #
 workspace_config_name = Settings.defaults['workspace']['configFileName']
 workspace_tests_dir = f'{tests_dir}/workspace'
 workspace_current_dir = '.'
-if os.path.isfile(f'{workspace_current_dir}/{workspace_config_name}'):
-  workspace_selected_dir = workspace_current_dir
-elif len(sys.argv) > 1 and os.path.isdir(sys.argv[1]):
-  workspace_selected_dir = sys.argv[1]
-else:
-  workspace_selected_dir = workspace_tests_dir
-try:
-  with open(f'{workspace_selected_dir}/{workspace_config_name}', 'r') as file:
-    Settings.workspace_config = yaml.safe_load(file)
-except:
-  pass
 
+def select_workspace_dir(argv):
+  """The workspace dir of the settings: the current dir (if it has a workspace config), argv[1] (if it's a dir) or the tests workspace."""
+  if os.path.isfile(f'{workspace_current_dir}/{workspace_config_name}'):
+    return workspace_current_dir
+  elif len(argv) > 1 and os.path.isdir(argv[1]):
+    return argv[1]
+  return workspace_tests_dir
+
+workspace_selected_dir = select_workspace_dir(sys.argv)
 
-Settings.defaults['workspace']['currentWorkspaceDir'] = workspace_selected_dir
-Settings.merged_settings = merge_dicts_nested(
-  Settings.defaults,
-  Settings.acme_config,
-  Settings.workspace_config
-)
+Settings.setWorkspaceDir(workspace_selected_dir)
 
 # Settings.setWorkspaceDir('hello-world')
 # print(Settings.settings('workspace.currentWorkspaceDir'))
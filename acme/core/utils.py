@@ -4,8 +4,10 @@ Utils
 
 import os
 import re
+import csv
 import json
 
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
 
@@ -13,8 +15,8 @@ from acme.core.settings import Settings
 
 def settings_json():
   """Returns all available merged settings as formatted json."""
-  merged_settings = Settings.merged_settings
-  merged_settings['web']['secret_key'] = '*****'
+  merged_settings = Settings.current.to_dict() # copy (the secret key is hidden in the output only)
+  merged_settings.setdefault('web', {})['secret_key'] = '*****'
   indented_json = json.dumps(merged_settings, indent=2)
   compact_json  = re.sub(
     r'\[\s*([^\[\]]+?)\s*\]',
@@ -50,9 +52,27 @@ def get_all_files(dir):
   return flist
 
 
-def write_to_file(file, contents):
-  with open(file, 'w') as f:
-    f.write(contents)
+def write_csv(file, rows):
+  """Writes csv rows to file as they're produced (quoting is handled by the csv module)."""
+  with atomic_write(file, newline='') as f:
+    csv.writer(f, lineterminator='\n').writerows(rows)
+
+
+@contextmanager
+def atomic_write(file, mode='w', **kwargs):
+  """
+  Opens a temp file next to file for writing & replaces file with it once all contents are written,
+  so readers never see a partially written file. The temp file is removed if writing fails.
+  """
+  tmp = f'{file}.{os.getpid()}.tmp'
+  try:
+    with open(tmp, mode, **kwargs) as f:
+      yield f
+    os.replace(tmp, file)
+  except BaseException:
+    if os.path.exists(tmp):
+      os.remove(tmp)
+    raise
 
 
 def make_files(directory, applyf):
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
-import re
-import pydoc
+from acme.core import catalog
 
-from acme.core import utils
-
-def validate_files(logs_dir, list_files=False):
-  """Finds all log files in logs directory (logs_dir) & performs analysis of validity of their names & location"""
+def validate_files(logs_dir, list_files=False, gen_dir=None):
+  """
+  Finds all log files in logs directory (logs_dir) & performs analysis of validity of their names & location.
+  The log catalog is stored in gen_dir (in memory if not set).
+  """
   output = []
 
   head_text = f'Analyzing logs from directory {logs_dir}:'
@@ -15,57 +15,26 @@ def validate_files(logs_dir, list_files=False):
   output += ['----'] # [0:first_line_len]]
   output += [f'{head_text}']
 
-  all_files = utils.get_all_files(logs_dir)
+  # all files in the logs directory, from the log catalog (refreshed incrementally)
+  log_catalog = catalog.Catalog(logs_dir, gen_dir).refresh()
+  all_files = log_catalog.files()
 
   if all_files:
 
     flist = []
     for file in all_files:
 
-      # Acceptable date formats (ISO 8601)
+      # Acceptable date formats (ISO 8601), see discover.LOG_FILE_PATTERNS
       # yyyy/mm/dd<custom>.txt
       # yyyy-mm-dd<custom>.txt
-
-      valid = False
-      custom = False
-      custom_text = ''
-      ymd = False
-
-      # e.g. 2024/01/01abc.txt
-      match = re.match(r'^\d{4}/\d{2}/\d{2}(.+)\.txt$', file)
-      if match is not None:
-        valid = True
-        custom = True
-        custom_text = match.group(1)
-      # e.g. 2024/01/01.txt
-      elif re.match(r'^\d{4}/\d{2}/\d{2}\.txt$', file) is not None:
-        valid = True
-      else:
-        # e.g. 2024/01/2024-01-01abc.txt
-        match = re.match(r'^\d{4}/\d{2}/\d{4}-\d{2}-\d{2}(.+)\.txt$', file)
-        if match is not None:
-          valid = True
-          ymd = True
-          custom = True
-          custom_text = match.group(1)
-        # 2024/2024-01-01abc.txt
-        else:
-          match = re.match(r'^\d{4}/\d{4}-\d{2}-\d{2}(.+)\.txt$', file)
-          if match is not None:
-            valid = True
-            ymd = True
-            custom = True
-            custom_text = match.group(1)
-          else:
-            valid = False
-        # todo: ../logs/2024-01-01.txt
+      # todo: ../logs/2024-01-01.txt
 
       flist.append({
-        'file'        : file,
-        'valid'       : valid,
-        'custom'      : custom,
-        'custom_text' : custom_text,
-        'ymd'         : ymd
+        'file'        : file['path'],
+        'valid'       : bool(file['valid']),
+        'custom'      : bool(file['custom_text']),
+        'custom_text' : file['custom_text'],
+        'ymd'         : bool(file['ymd'])
       })
 
     #for fd in flist:
@@ -101,24 +70,16 @@ def validate_files(logs_dir, list_files=False):
       output += [f'\n{invalid_count} files with invalid log file names. These will be ignored:' if invalid_count else '']
       output += ['- ' + f'\n- '.join([d['file'] for d in invalid_files if 'file' in d]) if invalid_count else '']
 
-    """
-    years = [fname[:4] for fname in all_files]
-    months = [fname[:7] for fname in all_files]
-
-    unique_years = set(years)
-    unique_months = set(months)
-
-    output += [f'- {str(len(all_files))} total files found.']
-    output += [f'Data spans {str(len(all_files))} total days across {str(len(unique_years))} years for a total of {str(len(unique_months))} months:']
-
-    year_month_dict = {}
-    for date in unique_months:
-      year, month = date.split('/')
-      year_month_dict.setdefault(year, []).append(month)
+    # data span summary (per year & month)
+    spans = log_catalog.spans()
+    span_days    = sum(days for months in spans.values() for days, _ in months.values())
+    span_months  = sum(len(months) for months in spans.values())
+    span_entries = sum(entries for months in spans.values() for _, entries in months.values())
 
-    for year, months in sorted(year_month_dict.items()):
-      output += [f'- {year}: ' + ', '.join(sorted(months))]
-    """
+    if spans:
+      output += [f'\nData spans {span_days} total days across {len(spans)} years for a total of {span_months} months ({span_entries} entries):']
+      for year, months in spans.items():
+        output += [f'- {year}: ' + ', '.join(months)]
 
   # add last hr
   # last_line_len = len(output[-1])
@@ -130,6 +91,7 @@ def validate_files(logs_dir, list_files=False):
   output = '\n'.join(output)
 
   if list_files:
+    import pydoc
     pydoc.pager(output) if output else None
     return
 
@@ -0,0 +1,267 @@
+"""
+Log Watcher
+-----------
+acme watch: regenerates the gen outputs of the log files that change, as they're saved.
+
+  acme  watch                           # same outputs as 'acme gencsv {date_input}'
+  acme  watch  cat                      # same outputs as 'acme gencsv {date_input} cat'
+  acme  watch  cat  --format sqlite     # gencsv options are passed on
+  acme  watch  cat  --poll              # poll the logs directory instead of using inotify
+
+The logs directory is watched with inotify (linux) or, where it isn't available, polled for changes.
+Bursts of changes (e.g. an editor writing a file several times per save) are debounced & coalesced:
+once the logs directory is quiet for DEBOUNCE seconds, each affected output is regenerated once.
+
+Affected outputs of a changed log file (e.g. 2024/03/05.txt), each only if it was generated before:
+  - day   : gen/2024-03-05.csv (only for yyyy/mm/dd.txt files, like 'acme gencsv 2024-03-05')
+  - month : gen/2024-03.csv
+  - year  : gen/2024.csv
+
+Nothing is regenerated while the logs directory doesn't exist (e.g. it's being moved or unmounted),
+the outputs keep their contents instead of being replaced by empty collections.
+
+Collections are regenerated from the parse cache & rollup cache, so only the changed files are parsed again.
+"""
+
+import os
+import re
+import time
+
+from acme.core import discover
+from acme.core import process
+
+DEBOUNCE      = 0.25  # seconds without changes before regenerating
+MAX_DELAY     = 2     # seconds, regenerate even if changes keep coming
+POLL_INTERVAL = 0.5   # seconds between scans of the polling watcher
+
+YEAR_DIR_PATTERN = re.compile(r'^\d{4}$')
+
+
+def relative_path(logs_dir, path):
+  return os.path.relpath(path, logs_dir).replace(os.sep, '/')
+
+
+def walk_files(logs_dir):
+  """Yields the paths (relative to logs_dir) of all files in logs_dir, hidden files & dirs are skipped."""
+  for root, dirs, files in os.walk(logs_dir):
+    dirs[:] = [d for d in dirs if not d.startswith('.')]
+    for name in files:
+      if not name.startswith('.'):
+        yield relative_path(logs_dir, os.path.join(root, name))
+
+
+class PollingWatcher:
+  """Finds changed files by comparing the size & mtime of all files in the logs directory every POLL_INTERVAL."""
+
+  name = 'polling'
+
+  def __init__(self, logs_dir):
+    self.logs_dir = logs_dir
+    self.files    = self.scan()
+
+  def scan(self):
+    files = {}
+    for path in walk_files(self.logs_dir):
+      try:
+        stat = os.stat(os.path.join(self.logs_dir, path))
+        files[path] = (stat.st_size, stat.st_mtime_ns)
+      except OSError:
+        pass
+    return files
+
+  def read(self, timeout=None):
+    """Returns the set of changed paths (relative to the logs directory), waits up to timeout seconds (None: until a change)."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+      files = self.scan()
+      changed = { path for path in files.keys() | self.files.keys() if files.get(path) != self.files.get(path) }
+      self.files = files
+      if changed:
+        return changed
+      if deadline is not None and time.monotonic() >= deadline:
+        return set()
+      time.sleep(POLL_INTERVAL if deadline is None else max(0, min(POLL_INTERVAL, deadline - time.monotonic())))
+
+  def close(self):
+    pass
+
+
+class InotifyWatcher:
+  """Watches the logs directory & its subdirectories with inotify (linux, via libc)."""
+
+  name = 'inotify'
+
+  IN_MODIFY       = 0x00000002
+  IN_CLOSE_WRITE  = 0x00000008
+  IN_MOVED_FROM   = 0x00000040
+  IN_MOVED_TO     = 0x00000080
+  IN_CREATE       = 0x00000100
+  IN_DELETE       = 0x00000200
+  IN_DELETE_SELF  = 0x00000400
+  IN_MOVE_SELF    = 0x00000800
+  IN_Q_OVERFLOW   = 0x00004000
+  IN_IGNORED      = 0x00008000
+  IN_ISDIR        = 0x40000000
+
+  MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+  def __init__(self, logs_dir):
+    import ctypes
+    import ctypes.util
+
+    self.logs_dir = logs_dir
+    self.libc     = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    self.dirs     = {} # { watch descriptor : dir path relative to the logs directory ('' for the logs directory) }
+
+    self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if self.fd < 0:
+      raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    self.add_dir('')
+
+  def add_dir(self, rel):
+    """Watches a directory & its subdirectories. Returns the files in them (they may have been added before the watch)."""
+    import ctypes
+
+    found = set()
+    top = os.path.join(self.logs_dir, rel)
+    for root, dirs, files in os.walk(top):
+      dirs[:] = [d for d in dirs if not d.startswith('.')]
+      wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), self.MASK)
+      if wd < 0:
+        if root == top and rel == '':
+          raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {root}')
+        continue
+      dir_rel = relative_path(self.logs_dir, root)
+      self.dirs[wd] = '' if dir_rel == '.' else dir_rel
+      found.update(relative_path(self.logs_dir, os.path.join(root, name)) for name in files if not name.startswith('.'))
+    return found
+
+  def read(self, timeout=None):
+    """Returns the set of changed paths (relative to the logs directory), waits up to timeout seconds (None: until a change)."""
+    import select
+    import struct
+
+    readable, _, _ = select.select([self.fd], [], [], timeout)
+    if not readable:
+      return set()
+
+    try:
+      data = os.read(self.fd, 65536)
+    except BlockingIOError:
+      return set()
+
+    changed = set()
+    offset = 0
+    while offset + 16 <= len(data):
+      wd, mask, cookie, length = struct.unpack_from('iIII', data, offset)
+      name = data[offset + 16 : offset + 16 + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+      offset += 16 + length
+
+      if mask & self.IN_Q_OVERFLOW:
+        # events were dropped: treat every year directory as changed
+        changed.update(f'{entry.name}/' for entry in os.scandir(self.logs_dir) if YEAR_DIR_PATTERN.match(entry.name))
+        continue
+
+      if mask & self.IN_IGNORED:
+        self.dirs.pop(wd, None)
+        continue
+
+      parent = self.dirs.get(wd)
+      if parent is None or not name or name.startswith('.'):
+        continue
+
+      path = f'{parent}/{name}' if parent else name
+      if mask & self.IN_ISDIR:
+        if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+          changed.update(self.add_dir(path))
+        # removed or renamed directory: its log files are gone from the year
+        changed.add(f'{path}/')
+      else:
+        changed.add(path)
+
+    return changed
+
+  def close(self):
+    os.close(self.fd)
+
+
+def open_watcher(logs_dir, polling=False):
+  """Returns an InotifyWatcher for logs_dir, or a PollingWatcher if polling is set or inotify isn't available."""
+  if not polling:
+    try:
+      return InotifyWatcher(logs_dir)
+    except (OSError, AttributeError):
+      pass
+  return PollingWatcher(logs_dir)
+
+
+def affected_outputs(paths, meta):
+  """
+  Returns the date inputs of the gen outputs to regenerate for changed paths: days, months & years (each once).
+  Only outputs that were generated before are regenerated, none if the logs directory doesn't exist.
+  """
+  days, months, years = set(), set(), set()
+
+  if not os.path.isdir(meta.logs_dir):
+    return []
+
+  for path in paths:
+    log_file = discover.classify(path)
+    if log_file:
+      day = log_file.date
+      if not log_file.custom_text and not log_file.ymd and os.path.isfile(f'{meta.logs_dir}{path}'):
+        days.add(day.isoformat())
+      months.add(f'{day:%Y-%m}')
+      years.add(f'{day:%Y}')
+    elif path.endswith('/'):
+      # changed directory (e.g. a month directory was renamed): regenerate its year
+      year = re.match(r'^(\d{4})/', path)
+      if year:
+        years.add(year.group(1))
+
+  outputs = sorted(days) + sorted(months) + sorted(years)
+  return [date_input for date_input in outputs if os.path.isfile(f'{meta.gen_dir}{date_input}.csv')]
+
+
+def wait_for_changes(watcher):
+  """Blocks until files change, then collects further changes until the logs directory is quiet (debounce)."""
+  changed = watcher.read()
+  deadline = time.monotonic() + MAX_DELAY
+  while time.monotonic() < deadline:
+    more = watcher.read(min(DEBOUNCE, max(0, deadline - time.monotonic())))
+    if not more:
+      break
+    changed |= more
+  return changed
+
+
+def watch(params, meta):
+  """Cli options: watch [module_options] [gencsv options] [--poll]"""
+  polling = '--poll' in params
+  options = [p for p in params[1:] if p != '--poll']
+
+  watcher = open_watcher(meta.logs_dir, polling)
+  print(f'Watching {meta.logs_dir} for changes ({watcher.name}). Press Ctrl+C to stop.', flush=True)
+
+  try:
+    while True:
+      changed = wait_for_changes(watcher)
+      outputs = affected_outputs(changed, meta)
+      if not outputs:
+        continue
+
+      start = time.perf_counter()
+      output = []
+      for date_input in outputs:
+        output += process.handle_timesheets(['gencsv', date_input, *options], 'watch', meta)
+
+      elapsed_ms = (time.perf_counter() - start) * 1000
+      output += [f'Regenerated {len(outputs)} output(s) for {len(changed)} changed file(s) in {elapsed_ms:.0f} ms.', '']
+      print('\n'.join(output), flush=True)
+
+  except KeyboardInterrupt:
+    print('Stopped watching.')
+
+  finally:
+    watcher.close()
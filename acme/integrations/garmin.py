@@ -8,6 +8,8 @@ from datetime import datetime
 from datetime import timedelta
 
 from acme.core import macros
+from acme.modules import timesheets_columnar
+from acme.modules.timesheets_categorize import CATEGORY_NAMES
 
 def garmin_options(args, callname, meta):
 
@@ -29,22 +31,34 @@ def garmin_options(args, callname, meta):
         print(f'Validated: {gen_csv_garmin}')
     except Exception as e:
       return print(f"Invalid: '{gen_csv_garmin}' could not be processed or found.")
+    # metrics: prefer the columnar copy of the csv (if it's up to date)
+    metrics_columnar = timesheets_columnar.find_columnar(gen_csv_metrics)
     try:
-      with open(gen_csv_metrics, 'r', encoding='utf-8') as g:
-        valid_metrics_csv = g.read()
-        print(f'Validated: {gen_csv_metrics}')
-        if not valid_metrics_csv:
-          print(f"Notice: the file '{gen_csv_metrics}' is empty.")
+      if metrics_columnar:
+        df = timesheets_columnar.read_gen_frame(gen_csv_metrics) # get metrics as dataframe
+        valid_metrics_csv = not df.empty
+        print(f'Validated: {metrics_columnar}')
+      else:
+        with open(gen_csv_metrics, 'r', encoding='utf-8') as g:
+          valid_metrics_csv = g.read()
+          print(f'Validated: {gen_csv_metrics}')
+      if not valid_metrics_csv:
+        print(f"Notice: the file '{gen_csv_metrics}' is empty.")
     except Exception as e:
       return print(f"Invalid: '{gen_csv_metrics}' could not be processed or found.")
 
-    if f and g and valid_metrics_csv:
+    if f and valid_metrics_csv:
       # -- prevent duplication: check if existing garmin data -- #
-      if f',{cat_name},' in valid_metrics_csv:
+      if metrics_columnar:
+        category_columns = [c for c in df.columns if c in CATEGORY_NAMES]
+        has_garmin_data = bool((df[category_columns] == cat_name).any().any()) if category_columns else False
+      else:
+        has_garmin_data = f',{cat_name},' in valid_metrics_csv
+        df = pd.read_csv(StringIO(valid_metrics_csv)) # get metrics as dataframe
+
+      if has_garmin_data:
         return print(f'Existing Garmin data found in csv. Re-try after running acme gencsv year command again.')
 
-      df = pd.read_csv(StringIO(valid_metrics_csv)) # get metrics as dataframe
-
       converted_garmin_data = []
       gf = pd.read_csv(StringIO(valid_garmin_csv))
       gf = gf.fillna('') # empty: NaN -> ''
@@ -93,6 +107,11 @@ def garmin_options(args, callname, meta):
 
       df.to_csv(gen_csv_metrics, index=False)
 
+      # keep the columnar copy up to date
+      if metrics_columnar:
+        fmt = os.path.splitext(metrics_columnar)[1].lstrip('.')
+        timesheets_columnar.write_frame(timesheets_columnar.typed_frame(df), gen_csv_metrics, fmt)
+
       # -- additional day csv mergers (today, yesterday) for current year -- #
       if str(year) == str(now.year):
         ymd_tod = (now.strftime('%Y-%m-%d'), now.strftime('%m/%d/%Y'))
@@ -3,19 +3,142 @@ Timesheets Module
 Parses and converts formatted timesheets to csv.
 """
 
+import os
 import re
+import mmap
 
+from functools import lru_cache
+from datetime import date
 from datetime import datetime
 
 from acme.core import macros
 from acme.modules import timesheets_categorize
 
+# line boundaries recognized by str.splitlines() (\n is handled separately because of .. continuations)
+LINE_BREAKS = r'\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+
+# whitespace (\s) that isn't a line boundary
+LINE_SPACES = r'\t\x1f \xa0\u1680\u2000-\u200a\u202f\u205f\u3000'
+
+# parse individual entries from the whole log text in a single pass
+# group 1: time intervals (e.g. 7a|7am|7:30a|3.21s|5m|1.5h|30m|1:30h etc...)
+# group 2: description text
+
+# regex101 (ryt) v2: https://regex101.com/r/lrm5IQ/2
+# feature update 1/21/25: dots (.) can be used to start entries along with hyphens (-)
+# feature update 4/30/26: double dots (..) can be used for multi line timesheet entries
+#   - a line ending with (..) continues on the next line, so entries only start at the beginning of
+#     the text or after a line break that isn't preceded by (..)
+#   - whitespace in the time intervals never crosses a line break
+#   - the separators after each time interval ([\s\,]*[\s\;]* in v2) are written as [\s\,]*(?:\;[\s\;]*)?,
+#     which matches the same text without backtracking between the two classes
+
+ENTRY_PATTERN = re.compile(
+  rf'[-\.](?:(?<=^[-\.])|(?<=[{LINE_BREAKS}][-\.])|(?<=\n[-\.])(?<!\.\.\n[-\.]))'
+  rf'([{LINE_SPACES}]*(?:[\d\:\.]+[mhs][{LINE_SPACES}\,]*(?:\;[{LINE_SPACES}\;]*)?)+)'
+  rf'([^\n{LINE_BREAKS}]*(?:(?<=\.\.)\n[^\n{LINE_BREAKS}]*)*)'
+)
+
+
+def iter_entries(entries: str):
+  """Yields (rawtime, rawdesc) for each entry found in the log text, joining (..) continuations."""
+  for rawtime, rawdesc in ENTRY_PATTERN.findall(entries):
+    if '\n' in rawdesc:
+      rawdesc = rawdesc.replace('..\n', '.. ')
+    yield rawtime, rawdesc
+
+
+def resume_offset(data) -> int:
+  """
+  Returns the byte offset in the (utf-8) bytes of a log after which text can be parsed on its own:
+  the end of the last line that ends with a line break & isn't continued with (..), 0 if there's none.
+  Entries before the offset can't be changed by text after it (e.g. by lines appended to the log), so
+  parse_entries(text) == parse_entries(text before the offset) + parse_entries(text after the offset).
+  """
+  end = len(data)
+  while True:
+    i = data.rfind(b'\n', 0, end)
+    if i < 0:
+      return 0
+    line_end = i - 1 if i and data[i-1:i] == b'\r' else i
+    if data[max(0, line_end-2):line_end] != b'..':
+      return i + 1
+    end = i
+
+
+def decode_log(data) -> str:
+  """Decodes the utf-8 bytes of a log (same text as open(filename, 'r').read())."""
+  text = str(data, 'utf-8')
+
+  # universal newlines (text mode reads)
+  if '\r' in text:
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+  return text
+
+
+def read_log(filename) -> str:
+  """Reads a log file through a read-only memory map (same text as open(filename, 'r').read())."""
+  with open(filename, 'rb') as file:
+    if not os.fstat(file.fileno()).st_size:
+      return ''
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+      return decode_log(buf)
+
+
+class Entry:
+  """A parsed timesheet entry. Quoting & human readable formatting are only applied by entries_to_csv()."""
+
+  __slots__ = ('date', 'hours', 'splits', 'description', 'categories')
+
+  def __init__(self, date, hours, splits, description, categories=()):
+    self.date         = date          # date ordinal (0 if the entry has no date)
+    self.hours        = hours         # total hours (float)
+    self.splits       = splits        # hour splits (tuple of floats)
+    self.description  = description   # description text
+    self.categories   = categories    # categories C1..C10 (tuple, set by categorize -> add_columns)
+
+  def __repr__(self):
+    return f'Entry({format_date(self.date)!r}, {self.hours!r}, {self.splits!r}, {self.description!r}, {self.categories!r})'
+
+
+@lru_cache(maxsize=1024)
+def format_date(ordinal):
+  """Formats a date ordinal as m/d/Y for the csv Date column."""
+  return date.fromordinal(ordinal).strftime('%m/%d/%Y') if ordinal else ''
+
+
+@lru_cache(maxsize=4096)
+def format_splits(splits):
+  """Formats hour splits for the csv Splits column."""
+  return ' '.join(map(str, splits))
+
+
+def date_ordinal(ymd_date):
+  """Converts a Y-m-d date string to a date ordinal (0 if empty)."""
+  if not ymd_date:
+    return 0
+  try:
+    return date.fromisoformat(ymd_date).toordinal() # fast path for padded Y-m-d dates
+  except ValueError:
+    return datetime.strptime(ymd_date, '%Y-%m-%d').toordinal()
+
+
 class Customize:
 
   func_list = {
     'categorize':   timesheets_categorize.initialize,
     'capitalize':   macros.cap_description,
-    'add_columns':  timesheets_categorize.finalize,
+  }
+
+  # loaders of per entry functions that load their state once per parse (see parse_entries)
+  func_loaders = {
+    'categorize':   timesheets_categorize.load_initialize,
+  }
+
+  # final functions for lists of parsed Entry records (see entries_to_csv)
+  entry_func_list = {
+    'add_columns':  timesheets_categorize.finalize_entries,
   }
 
   def __init__(
@@ -34,96 +157,126 @@ class Customize:
     self.add_header = add_header
     self.add_footer = add_footer
 
+  def each_entry_funcs(self):
+    """The functions applied to each entry of one parse (in apply_to_each_entry order)."""
+    return [
+      self.func_loaders[each_func]() if each_func in self.func_loaders else self.func_list[each_func]
+        for each_func in self.apply_to_each_entry
+    ]
 
 
 def convert_to_csv(entries: str, ymd_date=None, customize: Customize=Customize()) -> list:
   """Receives formatted timesheet entries with optional date and converts them to a csv list."""
+  return entries_to_csv(parse_entries(entries, ymd_date, customize), customize)
 
-  if not ymd_date:
-    datefrm = ''
-  else:
-    dateobj = datetime.strptime(ymd_date, '%Y-%m-%d')
-    datefrm = dateobj.strftime('%m/%d/%Y')
 
-  # feature update 4/30/26: double dots (..) can be used for multi line timesheet entries
-  entries = entries.replace('..\n', '.. ')
+def parse_entries(entries: str, ymd_date=None, customize: Customize=Customize()) -> list:
+  """Receives formatted timesheet entries with optional date and parses them into a list of Entry records."""
 
-  lines = entries.splitlines()
-  parsed_lines = []
+  ordinal = date_ordinal(ymd_date)
+  parsed_entries = []
+  entry_funcs = customize.each_entry_funcs()
 
-  for line in lines:
+  for rawtime, rawdesc in iter_entries(entries):
 
-    # parse individual entries
-    # group 1: time intervals (e.g. 7a|7am|7:30a|3.21s|5m|1.5h|30m|1:30h etc...)
-    # group 2: description text
+    newdesc = rawdesc
 
-    # regex101 (ryt) v2: https://regex101.com/r/lrm5IQ/2
-    # feature update 1/21/25: dots (.) can be used to start entries along with hyphens (-)
+    # -- 1. apply module functions & macros to description
 
-    pattern = r'^[-\.](\s*(?:[\d\:\.]+(?:m|h|s)[\s\,]*[\s\;]*)+)(.*)$'
-    match = re.search(pattern, line)
-    newline = []
+    for each_func in entry_funcs:
+      newdesc = each_func(newdesc)
 
-    if match:
+    # -- 2. apply default macros
 
-      rawtime = match.group(1)
-      rawdesc = match.group(2)
+    splits, hours = macros.raw_time_to_hours(rawtime)
 
-      newtime = rawtime
-      newdesc = rawdesc
+    parsed_entries.append(Entry(ordinal, hours, splits, newdesc))
 
-      # -- 1. apply module functions & macros to description
+  return parsed_entries
 
-      if customize.apply_to_each_entry:
-        for each_func in customize.apply_to_each_entry:
-          # newdesc = apply_modules[name]['module'].initialize(newdesc, apply_modules[name]['settings'])
-          newdesc = customize.func_list[each_func](newdesc)
 
-      # -- 2. apply default macros
+def entries_to_csv(entries: list, customize: Customize=Customize()) -> list:
+  """Converts Entry records (list or EntryTable) to a csv list, adding headers, footers, & columns"""
+  return list(iter_csv_rows(entries, customize, quote=macros.escape_for_csv))
 
-      newtime = macros.raw_time_to_excel_sum(newtime)
-      # newdesc = macros.cap_description(newdesc)
-                                        
-      newline = [
-        datefrm,                                  # 0: Date 
-        macros.hours_to_human(newtime[1], True),  # 1: Duration 
-        macros.escape_for_csv(newdesc),           # 2: Description  
-        newtime[1],                               # 3: Hours 
-        macros.escape_for_csv(newtime[0])         # 4: Splits
-      ]
-    
-    if newline:
 
-      parsed_lines.append(newline)
-  
-  # endfor
+def iter_csv_rows(entries, customize: Customize=Customize(), quote=str):
+  """
+  Yields the csv rows (header, entries, footer) for Entry records (list or EntryTable).
+  Values are not escaped for csv (e.g. for csv.writer), unless a quote function is given for the text columns.
+  """
 
-  parsed_lines = modify_csv(parsed_lines, customize)
+  if not isinstance(entries, list):
+    entries = list(entries)
 
-  return parsed_lines
+  # module NICKNAME : if a NICKNAME var is set on a module, it can also be used to call the module
 
+  for each_func in customize.apply_to_final_csv:
+    entries = customize.entry_func_list[each_func](entries)
 
-def modify_csv(csv_list, customize: Customize=Customize()):
-  """Modifies csv content by adding headers, footers, & columns"""
+  # category columns (the description column is always quoted once columns are added)
 
-  # headers & footers
+  add_columns = 'add_columns' in customize.apply_to_final_csv
+  max_cat = max((len(e.categories) for e in entries), default=0) if add_columns else 0
+  quote_text = quote if add_columns else str
 
   if customize.add_header:
-    #                     0        1         2             3        4
-    csv_list.insert(0, ['Date','Duration','Description', 'Hours', 'Splits'])
+    yield csv_header_row(max_cat, quote_text)
 
-  if customize.add_footer:
-    total_hours = round(sum(macros.try_float(col[3], 0) for col in csv_list), 2)
-    #                 0   1                                   2                     3                 4
-    csv_list.append(['', macros.hours_to_human(total_hours, True), 'Total Logged Hours', str(total_hours), ''])
-
-  # module NICKNAME : if a NICKNAME var is set on a module, it can also be used to call the module
+  yield from csv_entry_rows(entries, max_cat, quote)
 
-  if customize.apply_to_final_csv:
-    for each_func in customize.apply_to_final_csv:
-      csv_list = customize.func_list[each_func](csv_list)
-
-  return csv_list
+  if customize.add_footer:
+    yield csv_footer_row(sum_hours(entries), max_cat, quote_text)
+
+
+def csv_header_row(max_cat, quote_text=str):
+  """The csv header row with max_cat category columns."""
+  category_names = timesheets_categorize.CATEGORY_NAMES
+  return [
+    'Date',
+    'Duration',
+    *[category_names[i] for i in range(0, max_cat)],
+    quote_text('Description'),
+    'Hours',
+    'Splits',
+  ]
+
+
+def csv_entry_rows(entries, max_cat, quote=str):
+  """Yields the csv rows of Entry records with max_cat category columns."""
+  padding = ('',) * max_cat
+
+  for e in entries:
+    row = [format_date(e.date), macros.hours_to_human(e.hours, True)]     # Date, Duration
+    if max_cat:
+      row += e.categories + padding[len(e.categories):]                   # C1..Cn
+    row += [
+      quote(e.description),                                               # Description
+      str(e.hours),                                                       # Hours
+      quote(format_splits(e.splits)),                                     # Splits
+    ]
+    yield row
+
+
+def csv_footer_row(total_hours, max_cat, quote_text=str):
+  """The csv footer row (total hours) with max_cat category columns."""
+  total_hours = round(total_hours, 2)
+  return [
+    '',
+    macros.hours_to_human(total_hours, True),
+    *[''] * max_cat,
+    quote_text('Total Logged Hours'),
+    str(total_hours),
+    '',
+  ]
+
+
+def sum_hours(entries):
+  """Total hours of Entry records, added in order (the footer total doesn't depend on how entries are grouped)."""
+  total_hours = 0
+  for e in entries:
+    total_hours += e.hours
+  return total_hours
 
 
 if __name__ == '__main__':
@@ -0,0 +1,259 @@
+"""
+Timesheets Module: Parse Cache
+------------------------------
+Persistent per-day cache of parsed log files, used by gencsv (single days & collections).
+
+A cached day is reused when all of the following match:
+  - log file path, size & mtime (or, if only the stat changed, the content hash)
+  - date of the entries
+  - per entry Customize options (e.g. categorize, capitalize)
+  - glossary version (if categorize is applied to each entry)
+
+Logs that only grew (e.g. lines appended to today's log) are parsed from their resume offset: the end of the
+last complete line when they were parsed (see timesheets.resume_offset). If the bytes before the offset are
+unchanged, the entries before it are reused & only the bytes after it are parsed, otherwise the whole log is parsed.
+
+The cache is stored in {workspace}/gen/.cache/ and can be safely deleted at any time.
+"""
+
+import os
+import pickle
+import hashlib
+
+from concurrent.futures import ProcessPoolExecutor
+
+from acme.modules import timesheets
+from acme.modules import timesheets_categorize
+
+# bump when the parser or the cached record format changes
+CACHE_VERSION = 3
+
+CACHE_DIR_NAME  = '.cache'
+CACHE_FILE_NAME = 'timesheets_parse.pickle'
+
+
+class ParseCache:
+
+  def __init__(self, gen_dir):
+    self.file   = os.path.join(gen_dir, CACHE_DIR_NAME, CACHE_FILE_NAME)
+    self.days   = {}  # { (log path, options key) : (size, mtime_ns, content hash, entry tuples, resume) }
+    self.dirty  = False
+    self.hits   = 0
+    self.misses = 0
+
+    self.signature = file_signature(self.file)
+
+    try:
+      with open(self.file, 'rb') as f:
+        version, days = pickle.load(f)
+      if version == CACHE_VERSION:
+        self.days = days
+    except Exception: # missing or unreadable cache -> start empty
+      pass
+
+  def options_key(self, ymd_date, customize):
+    """Everything besides the log file itself that changes the parsed entries."""
+    glossary_version = ''
+    if 'categorize' in customize.apply_to_each_entry:
+      glossary_version = timesheets_categorize.load_glossary().version
+    return (ymd_date, customize.apply_to_each_entry, glossary_version)
+
+  def key(self, filename, ymd_date, customize):
+    """The cache key of a log file parsed with (ymd_date, customize)."""
+    return (filename, self.options_key(ymd_date, customize))
+
+  def keys(self, days, customize):
+    """The cache keys of each (log path, ymd date) in days (the glossary is only checked once)."""
+    options = self.options_key(None, customize)[1:]
+    return [(filename, (ymd_date, *options)) for filename, ymd_date in days]
+
+  def get(self, key):
+    """Returns the cached Entry records of a cache key or None if the log file changed (or was never parsed)."""
+    cached = self.days.get(key)
+    if not cached:
+      return None
+
+    stat = os.stat(key[0])
+    if cached[0] != stat.st_size or cached[1] != stat.st_mtime_ns:
+      if cached[0] != stat.st_size or cached[2] != content_hash(read_bytes(key[0])):
+        return None
+      # touched but not modified
+      self.days[key] = (stat.st_size, stat.st_mtime_ns, *cached[2:])
+      self.dirty = True
+
+    self.hits += 1
+    return [timesheets.Entry(*e) for e in cached[3]]
+
+  def previous(self, key):
+    """Returns (resume, entry tuples) of the last parse of a cache key (None if there's none)."""
+    cached = self.days.get(key)
+    return (cached[4], cached[3]) if cached else None
+
+  def content_digest(self, key):
+    """Content hash of the log file of a cache key when it was last parsed (None if it isn't cached)."""
+    cached = self.days.get(key)
+    return cached[2] if cached else None
+
+  def put(self, key, parsed):
+    """Stores a parsed log file: parsed = (size, mtime_ns, content hash, entry tuples, resume) from parse_log_file()."""
+    self.days[key] = parsed
+    self.dirty  = True
+    self.misses += 1
+    return [timesheets.Entry(*e) for e in parsed[3]]
+
+  def parse(self, filename, ymd_date, customize, key=None):
+    """Returns the parsed Entry records for a log file, from the cache if the file & options are unchanged."""
+    key = key or self.key(filename, ymd_date, customize)
+    entries = self.get(key)
+    if entries is None:
+      entries = self.put(key, parse_log_file(filename, ymd_date, customize, self.previous(key)))
+    return entries
+
+  def prune(self, date_from, date_to, filenames):
+    """Drops the cached log files of days from date_from to date_to (Y-m-d) that aren't in filenames (deleted or renamed logs)."""
+    stale = [
+      key for key in self.days
+        if date_from <= key[1][0] <= date_to and key[0] not in filenames
+    ]
+    for key in stale:
+      del self.days[key]
+    self.dirty = self.dirty or bool(stale)
+
+  def parse_days(self, days, customize, jobs=1, span=None):
+    """
+    Returns the parsed Entry records for each (log path, ymd date) in days, in the same order.
+    With jobs > 1, days that aren't cached are parsed by a pool of (jobs) worker processes.
+    span: (date_from, date_to) that days are all the log files of, other cached log files in the span are dropped.
+    """
+    if span:
+      self.prune(*(day.isoformat() for day in span), { filename for filename, _ in days })
+
+    keys = self.keys(days, customize)
+
+    if jobs <= 1:
+      return [self.parse(*day, customize, key) for day, key in zip(days, keys)]
+
+    results = [self.get(key) for key in keys]
+    misses  = [i for i, entries in enumerate(results) if entries is None]
+
+    if len(misses) < 2:
+      for i in misses:
+        results[i] = self.parse(*days[i], customize, keys[i])
+      return results
+
+    # ship the compiled glossary to each worker once (instead of compiling it in every worker)
+    initializer, initargs = None, ()
+    if 'categorize' in customize.apply_to_each_entry:
+      name = timesheets_categorize.GLOSSARYFILE
+      timesheets_categorize.load_glossary(name)
+      initializer = timesheets_categorize.install_glossary
+      initargs    = (name, *timesheets_categorize.glossary_cache[name])
+
+    jobs = min(jobs, len(misses))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as pool:
+      parsed = pool.map(
+        parse_log_file,
+        [days[i][0] for i in misses],
+        [days[i][1] for i in misses],
+        [customize] * len(misses),
+        [self.previous(keys[i]) for i in misses],
+        chunksize=max(1, len(misses) // (jobs * 4)),
+      )
+      # map() returns results in submission order -> entries stay in date order
+      for i, result in zip(misses, parsed):
+        results[i] = self.put(keys[i], result)
+
+    return results
+
+  def save(self):
+    """Writes the cache to disk (atomically) if anything changed."""
+    if not self.dirty:
+      return
+    try:
+      os.makedirs(os.path.dirname(self.file), exist_ok=True)
+      tmp = f'{self.file}.{os.getpid()}.tmp'
+      with open(tmp, 'wb') as f:
+        pickle.dump((CACHE_VERSION, self.days), f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(tmp, self.file)
+      self.dirty = False
+      self.signature = file_signature(self.file)
+    except OSError as e:
+      print(f'Notice: the parse cache could not be saved ({e}).')
+
+
+# parse caches kept in memory by long running processes (e.g. acme daemon): { cache file : ParseCache }
+open_caches = {}
+
+
+def file_signature(file):
+  try:
+    stat = os.stat(file)
+    return (stat.st_mtime_ns, stat.st_size)
+  except OSError:
+    return None
+
+
+def open_cache(gen_dir):
+  """
+  Returns the ParseCache of gen_dir, reusing the one loaded by an earlier call of this process
+  unless its file was written by another process since (then the cache is loaded again).
+  """
+  file   = os.path.join(gen_dir, CACHE_DIR_NAME, CACHE_FILE_NAME)
+  cached = open_caches.get(file)
+  if cached and cached.signature == file_signature(file):
+    cached.hits = cached.misses = 0
+    return cached
+
+  open_caches[file] = ParseCache(gen_dir)
+  return open_caches[file]
+
+
+def content_hash(data):
+  return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def read_bytes(filename):
+  with open(filename, 'rb') as f:
+    return f.read()
+
+
+def parse_bytes(data, ymd_date, customize):
+  """Parses the bytes of (a part of) a log file into entry tuples."""
+  if not data:
+    return ()
+  entries = timesheets.parse_entries(timesheets.decode_log(data), ymd_date, customize=customize)
+  return tuple((e.date, e.hours, e.splits, e.description, e.categories) for e in entries)
+
+
+def parse_log_file(filename, ymd_date, customize, previous=None):
+  """
+  Parses a log file and returns (size, mtime_ns, content hash, entry tuples, resume).
+  Entries are returned as plain tuples (picklable & safe to cache, Entry objects get modified later on).
+
+  resume: (resume offset, hash of the bytes before it, number of entries before it)
+  previous: (resume, entry tuples) of the last parse with the same options. If the bytes before its resume offset
+            didn't change, its entries before the offset are reused & only the bytes after the offset are parsed.
+  """
+  stat = os.stat(filename)
+  data = read_bytes(filename)
+  view = memoryview(data)
+
+  start, records = 0, ()
+  if previous:
+    (offset, digest, count), previous_records = previous
+    if offset <= len(data) and content_hash(view[:offset]) == digest:
+      start, records = offset, previous_records[:count]
+
+  # the bytes before & after the new resume offset are parsed separately (same entries as parsing them at once)
+  offset   = timesheets.resume_offset(data)
+  records += parse_bytes(view[start:offset], ymd_date, customize)
+  resume   = (offset, content_hash(view[:offset]), len(records))
+  records += parse_bytes(view[offset:], ymd_date, customize)
+
+  return (
+    stat.st_size,
+    stat.st_mtime_ns,
+    content_hash(data),
+    records,
+    resume,
+  )
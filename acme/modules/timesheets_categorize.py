@@ -44,10 +44,14 @@ Glossary Example:
 
 In the above examples, the parser will find the $shortcuts ($zoom & $fit24) and replace them with the appropriate categories.
 The glossary can contain unlimited definitions for $shortcuts.
+The glossary is compiled once (longest $shortcuts first) and recompiled only when the glossary file changes.
+Shortcuts that are defined more than once or used inside another substitution are reported when it compiles.
 """
 
+import os
 import re
 import sys
+import hashlib
 import importlib
 
 from acme.core.settings import Settings
@@ -60,88 +64,53 @@ NAMESPACE = 'acme.modules.timesheets_categorize'
 
 KEEPRAWSHORTCUTS = True  # option to keep raw ($shortcuts) at end of entries
 
+CATEGORY_NAMES = ('C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7', 'C8', 'C9', 'C10')
+
 # the glossary file path can be customized in the workspace copy of workspace_config.yaml
 GLOSSARYFILE = settings('modules.timesheets_categorize.glossaryFile')
 
 def initialize(entry):
-  """Adds workspace to python path, loads glossary, and calls replace_shortcuts."""
-  currentWorkspaceDir = settings('workspace.currentWorkspaceDir')
-  if currentWorkspaceDir:
-    sys.path.append(currentWorkspaceDir)
-    sys.path.append(f'{currentWorkspaceDir}/apps')
-  glossary = importlib.import_module(GLOSSARYFILE)
-  entry = replace_shortcuts(entry, glossary)
+  """Loads the compiled glossary (cached) and calls replace_shortcuts."""
+  entry = replace_shortcuts(entry, load_glossary())
   return entry
 
 
-def finalize(csv_list):
-  """The finalize function runs on the final CSV list if the module is enabled."""
-  csv_list = add_category_columns(csv_list)
-  return csv_list
+def load_initialize():
+  """Returns initialize for the entries of one parse: the glossary is loaded (& its file checked) once."""
+  glossary = load_glossary()
+  return lambda entry: replace_shortcuts(entry, glossary)
 
 
-def add_category_columns(csv_list):
-  """Additional final options for the CSV"""
-  """Adds additional columns for the final CSV using the parenblock categories."""
-  
-  csv_header_row_index     = 0
-  csv_desc_column_index    = 2
-  cat_add_at_column_index  = 2
-
-  prepared_lines = []
-  category_lines = []
-  
-  # -- start: prepare lines -- #
-  for line in csv_list:
-    column_desc = line[csv_desc_column_index].strip('"') # strip double quotes
+def finalize_entries(entries):
+  """The finalize function for parsed Entry records: moves the parenblock categories to entry.categories."""
+  for entry in entries:
+    column_desc = entry.description.strip('"') # strip double quotes
     entry_split = split_entry_at_parenblock(column_desc)
 
     if entry_split:
-      category_lines.append([s.strip() for s in entry_split['parenblock_inside'].split(',')])
-      desc_sans_parenblock = entry_split['rest_of_entry']
+      entry.categories  = tuple(s.strip() for s in entry_split['parenblock_inside'].split(','))
+      entry.description = entry_split['rest_of_entry']
     else:
-      category_lines.append([])
-      desc_sans_parenblock = column_desc
-
-    new_line = line
-    new_line[csv_desc_column_index] = f'"{desc_sans_parenblock}"' # wrap with double quotes
-
-    prepared_lines.append(new_line)
-  
-  # -- end: prepare lines -- #
-
-  max_cat = max(len(l) for l in category_lines)
-
-  category_names    = ['C1', 'C2', 'C3', 'C4', 'C5', 'C6', 'C7', 'C8', 'C9', 'C10']
-  header_additions  = [category_names[i] for i in range(0, max_cat)]
-
-  result_list = []
-
-  # -- start: modify each line -- #
-
-  for i, pl in enumerate(prepared_lines):
-    for j in range(0, max_cat):
-      # add empty spaces for categories
+      entry.description = column_desc
 
-      pl.insert(cat_add_at_column_index + j, '')
-
-      # add headers from category names list
-
-      if header_additions and i == csv_header_row_index:
-        pl[cat_add_at_column_index + j] = header_additions[j]
-
-      # add categories if categories are found and have value
-
-      if category_lines[i]:
-        pl[cat_add_at_column_index + j] = category_lines[i][j] if len(category_lines[i]) > j else ''
+  print('Categories successfully applied to entries.')
 
-    result_list.append(pl)
+  return entries
 
-  # -- end: modify each line -- #
 
-  print('Categories successfully applied to entries.')
-  
-  return result_list
+def entry_categories(entry):
+  """
+  Returns (description, categories) of an Entry record as finalize_entries sets them.
+  Entries that weren't finalized yet are split at their parenblock.
+  """
+  description, categories = entry.description, entry.categories
+  if not categories:
+    description = description.strip('"')
+    entry_split = split_entry_at_parenblock(description)
+    if entry_split:
+      description = entry_split['rest_of_entry']
+      categories  = tuple(s.strip() for s in entry_split['parenblock_inside'].split(','))
+  return description, categories
 
 
 def split_entry_at_parenblock(entry):
@@ -164,7 +133,7 @@ def split_entry_at_parenblock(entry):
 
 def replace_shortcuts(entry, glossary):
   """Receives an entry string and performs substitutions for $shortcuts."""
-  
+
   entry_split = split_entry_at_parenblock(entry)
   modif_entry = ''
 
@@ -174,25 +143,10 @@ def replace_shortcuts(entry, glossary):
     parenblock        = entry_split['parenblock']
     parenblock_inside = entry_split['parenblock_inside']
 
-    shortcut_glossary = glossary.shortcut_glossary
+    if not isinstance(glossary, Glossary): # glossary module
+      glossary = Glossary(glossary.shortcut_glossary)
 
-    # -- expand alias tuples: [ (key,val), ((a,b), c) ... -> [ (key,val), (a,c), (b,c) ... -- #
-    expanded = [
-      (alias, v)
-      for k, v in shortcut_glossary
-      for alias in (k if isinstance(k, tuple) else (k,))
-    ]
-    subs = dict(expanded)
-
-    # -- substitute longest keys first to prevent collision -- #
-    for key in sorted(subs, key=len, reverse=True):
-      val = subs[key]
-      # -- test via: print(f'{key} => {val}') -- #
-      if isinstance(key, tuple):
-        for k in key:
-          parenblock_inside = parenblock_inside.replace(k, val)
-      else:
-        parenblock_inside = parenblock_inside.replace(key, val)
+    parenblock_inside = glossary.substitute(parenblock_inside)
 
     rawcat_parenblock = ''
     if KEEPRAWSHORTCUTS:
@@ -205,3 +159,88 @@ def replace_shortcuts(entry, glossary):
 
   return modif_entry
 
+
+class Glossary:
+  """
+  A $shortcut glossary compiled into a single alternation pattern.
+  Aliases are tried longest first at each position, so a shortcut is never replaced by a shorter one it contains.
+  """
+
+  def __init__(self, shortcut_glossary):
+
+    # -- expand alias tuples: [ (key,val), ((a,b), c) ... -> [ (key,val), (a,c), (b,c) ... -- #
+    self.subs = {}
+    self.collisions = []
+
+    for k, v in shortcut_glossary:
+      for alias in (k if isinstance(k, tuple) else (k,)):
+        if alias in self.subs and self.subs[alias] != v:
+          self.collisions.append(f"{alias} is defined more than once, '{v}' replaces '{self.subs[alias]}'")
+        self.subs[alias] = v
+
+    # substitutions are applied in a single pass, shortcuts inside substituted values are not expanded
+    for alias, v in self.subs.items():
+      for other in self.subs:
+        if other in v:
+          self.collisions.append(f"{alias} substitutes '{v}' which contains the shortcut {other}")
+
+    aliases = sorted(self.subs, key=len, reverse=True)
+    self.pattern = re.compile('|'.join(map(re.escape, aliases))) if aliases else None
+
+    # content hash of the substitutions (e.g. to invalidate cached parses when the glossary changes)
+    self.version = hashlib.sha1(repr(sorted(self.subs.items())).encode('utf-8')).hexdigest()
+
+  def substitute(self, text):
+    """Replaces all $shortcuts in text with their categories."""
+    if not self.pattern:
+      return text
+    return self.pattern.sub(lambda m: self.subs[m.group()], text)
+
+
+# compiled glossaries: { module name : (file mtime, Glossary) }
+glossary_cache = {}
+
+
+def load_glossary(name=None):
+  """
+  Returns the compiled Glossary for the glossary module (name), compiling it only
+  when it hasn't been loaded yet or its file has been modified since.
+  """
+  name = name or GLOSSARYFILE
+
+  # add workspace & apps directories to python path (once)
+  currentWorkspaceDir = settings('workspace.currentWorkspaceDir')
+  if currentWorkspaceDir:
+    for path in (currentWorkspaceDir, f'{currentWorkspaceDir}/apps'):
+      if path not in sys.path:
+        sys.path.append(path)
+
+  module = sys.modules.get(name) or importlib.import_module(name)
+  origin = getattr(module, '__file__', None)
+  try:
+    mtime = os.stat(origin).st_mtime_ns if origin else 0
+  except OSError:
+    mtime = 0
+
+  cached = glossary_cache.get(name)
+  if cached and cached[0] == mtime:
+    return cached[1]
+
+  if cached: # modified since it was compiled
+    module = importlib.reload(module)
+
+  glossary = Glossary(module.shortcut_glossary)
+  for collision in glossary.collisions:
+    print(f'Glossary collision ({name}): {collision}')
+
+  glossary_cache[name] = (mtime, glossary)
+
+  return glossary
+
+
+def install_glossary(name, mtime, glossary):
+  """
+  Adds an already compiled Glossary to the cache (e.g. as a process pool initializer),
+  so worker processes don't recompile the glossary that was loaded by the parent.
+  """
+  glossary_cache[name] = (mtime, glossary)
@@ -0,0 +1,159 @@
+"""
+Timesheets Module: Collection Files
+-----------------------------------
+Writes the csv files of collections (e.g. gen/2024.csv) & patches them by day when only some days changed.
+
+The collection cache in {workspace}/gen/.cache/ (safe to delete at any time) has an index of each written
+collection file: the byte range of the rows of each day, the key of each day (its log files & their content
+hashes), the number of category columns, the options it was written with & the signature of the file.
+
+When a collection is generated again & its file wasn't modified since, the rows of unchanged days are copied
+from the file, only the rows of changed (or new) days are formatted & the footer total is calculated again.
+The file is still replaced atomically (readers never see a partial file). The whole file is formatted when
+there's no valid index, the options changed (e.g. the glossary) or the number of category columns changed.
+"""
+
+import io
+import os
+import csv
+import pickle
+
+from acme.core import utils
+from acme.modules import timesheets
+
+# bump when the written rows or the index change
+INDEX_VERSION = 1
+
+CACHE_DIR_NAME  = '.cache'
+CACHE_FILE_NAME = 'timesheets_collections.pickle'
+
+# number of collections indexed (the least recently written are dropped, e.g. one-off intervals)
+MAX_COLLECTIONS = 32
+
+
+class CollectionIndex:
+
+  def __init__(self, gen_dir):
+    self.gen_dir     = gen_dir
+    self.file        = os.path.join(gen_dir, CACHE_DIR_NAME, CACHE_FILE_NAME)
+    self.collections = {} # { collection file name : index (see write_collection) }
+
+    try:
+      with open(self.file, 'rb') as f:
+        version, collections = pickle.load(f)
+      if version == INDEX_VERSION:
+        self.collections = collections
+    except Exception: # missing or unreadable cache -> start empty
+      pass
+
+  def put(self, name, index):
+    """Stores the index of a collection file & drops the collections whose files were deleted or exceed MAX_COLLECTIONS."""
+    self.collections.pop(name, None)
+    self.collections[name] = index
+    names = [n for n in self.collections if os.path.isfile(os.path.join(self.gen_dir, n))]
+    self.collections = { n : self.collections[n] for n in names[-MAX_COLLECTIONS:] }
+
+  def save(self):
+    try:
+      os.makedirs(os.path.dirname(self.file), exist_ok=True)
+      with utils.atomic_write(self.file, 'wb') as f:
+        pickle.dump((INDEX_VERSION, self.collections), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+      print(f'Notice: the collection index could not be saved ({e}).')
+
+
+def file_signature(file):
+  try:
+    stat = os.stat(file)
+    return (stat.st_mtime_ns, stat.st_size)
+  except OSError:
+    return None
+
+
+def csv_bytes(rows):
+  """Rows as written by utils.write_csv (utf-8)."""
+  buf = io.StringIO()
+  csv.writer(buf, lineterminator='\n').writerows(rows)
+  return buf.getvalue().encode('utf-8')
+
+
+def write_collection(gen_dir, genfile, days, customize, options_key):
+  """
+  Writes a collection csv file. Returns the number of days whose rows were formatted (all days if the file
+  was written in full) & whether the file was patched.
+
+  days        : [(date ordinal, day key, [Entry, ...]), ...] in date order, the day key changes when the
+                entries of the day change (e.g. the log files & their content hashes)
+  customize   : Customize of the final csv (header, footer, apply_to_final_csv functions, which must work per entry)
+  options_key : everything besides the days that changes the rows (e.g. the per entry options & glossary version)
+  """
+  cache = CollectionIndex(gen_dir)
+  name  = os.path.basename(genfile)
+  index = cache.collections.get(name)
+
+  options_key = (options_key, customize.apply_to_final_csv, customize.add_header, customize.add_footer)
+  if not index or index['options'] != options_key or index['signature'] != file_signature(genfile):
+    index = { 'max_cat' : None, 'days' : {} }
+
+  add_columns = 'add_columns' in customize.apply_to_final_csv
+
+  def finalize(day_entries):
+    """Applies the final functions & returns the number of category columns of the day."""
+    entries = [e for day in day_entries for e in day[2]]
+    for each_func in customize.apply_to_final_csv:
+      customize.entry_func_list[each_func](entries)
+    return { day[0] : max((len(e.categories) for e in day[2]), default=0) if add_columns else 0 for day in day_entries }
+
+  reused  = { day[0] for day in days if day[0] in index['days'] and index['days'][day[0]][0] == day[1] }
+  changed = [day for day in days if day[0] not in reused]
+
+  day_cats = { ordinal : index['days'][ordinal][3] for ordinal in reused }
+  day_cats.update(finalize(changed))
+  max_cat = max(day_cats.values(), default=0)
+
+  # a different number of category columns changes every row -> write the whole file
+  if reused and max_cat != index['max_cat']:
+    day_cats.update(finalize([day for day in days if day[0] in reused]))
+    reused, changed = set(), days
+
+  quote_text = str # values are quoted by the csv writer
+  old = b''
+  if reused:
+    with open(genfile, 'rb') as f:
+      old = f.read()
+
+  parts, offset, new_days = [], 0, {}
+
+  def add(data):
+    nonlocal offset
+    parts.append(data)
+    offset += len(data)
+
+  if customize.add_header:
+    add(csv_bytes([timesheets.csv_header_row(max_cat, quote_text)]))
+
+  for ordinal, key, entries in days:
+    start = offset
+    if ordinal in reused:
+      _, old_start, old_end, _ = index['days'][ordinal]
+      add(old[old_start:old_end])
+    else:
+      add(csv_bytes(timesheets.csv_entry_rows(entries, max_cat)))
+    new_days[ordinal] = (key, start, offset, day_cats[ordinal])
+
+  if customize.add_footer:
+    total_hours = timesheets.sum_hours(e for day in days for e in day[2])
+    add(csv_bytes([timesheets.csv_footer_row(total_hours, max_cat, quote_text)]))
+
+  with utils.atomic_write(genfile, 'wb') as f:
+    f.writelines(parts)
+
+  cache.put(name, {
+    'options'   : options_key,
+    'signature' : file_signature(genfile),
+    'max_cat'   : max_cat,
+    'days'      : new_days, # { date ordinal : (day key, start byte, end byte, number of category columns) }
+  })
+  cache.save()
+
+  return len(changed), bool(reused)
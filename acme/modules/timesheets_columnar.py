@@ -0,0 +1,127 @@
+"""
+Timesheets Module: Columnar Outputs
+-----------------------------------
+Parquet & Feather copies of gencsv outputs (e.g. gen/2024.parquet next to gen/2024.csv).
+
+Columns are stored with proper dtypes:
+  - Date      : datetime64 (NaT for the 'Total Logged Hours' footer)
+  - Hours     : float64
+  - C1..C10   : categorical
+  - all other : strings
+
+Readers (dashboard, garmin merge) use find_columnar() to prefer the columnar file when it's
+at least as new as the csv (a csv that was rewritten later, e.g. by the garmin merge, wins).
+
+Requires pandas & pyarrow (pip install pyarrow).
+"""
+
+import os
+
+from acme.modules.timesheets_categorize import CATEGORY_NAMES
+
+FORMATS = {
+  'parquet' : '.parquet',
+  'feather' : '.feather',
+}
+
+
+def columnar_file(csv_file, fmt):
+  """Returns the path of the columnar (fmt) copy of csv_file."""
+  return f'{os.path.splitext(csv_file)[0]}{FORMATS[fmt]}'
+
+
+def find_columnar(csv_file):
+  """Returns the path of an up to date columnar copy of csv_file or None."""
+  try:
+    csv_mtime = os.stat(csv_file).st_mtime_ns
+  except FileNotFoundError:
+    csv_mtime = 0
+
+  for fmt in FORMATS:
+    path = columnar_file(csv_file, fmt)
+    try:
+      if os.stat(path).st_mtime_ns >= csv_mtime:
+        return path
+    except FileNotFoundError:
+      continue
+  return None
+
+
+def frame_from_rows(rows):
+  """Builds a typed DataFrame from csv rows (header first, as yielded by timesheets.iter_csv_rows)."""
+  import pandas as pd
+
+  rows = iter(rows)
+  header = next(rows)
+  df = pd.DataFrame(list(rows), columns=header, dtype=object)
+  return typed_frame(df.where(df != '', None))
+
+
+def typed_frame(df):
+  """Converts the columns of a gencsv DataFrame (e.g. from pd.read_csv) to their columnar dtypes."""
+  import pandas as pd
+
+  df = df.copy()
+  for col in df.columns:
+    if col == 'Date':
+      df[col] = pd.to_datetime(df[col], format='%m/%d/%Y', errors='coerce')
+    elif col == 'Hours':
+      df[col] = pd.to_numeric(df[col], errors='coerce')
+    elif col in CATEGORY_NAMES:
+      df[col] = df[col].astype('category')
+    else:
+      df[col] = df[col].astype('string')
+  return df
+
+
+def write_frame(df, csv_file, fmt):
+  """Writes the columnar (fmt) copy of csv_file (atomically). Returns the path or None if it couldn't be written."""
+  path = columnar_file(csv_file, fmt)
+  tmp  = f'{path}.{os.getpid()}.tmp'
+  try:
+    if fmt == 'parquet':
+      df.to_parquet(tmp, index=False)
+    else:
+      df.reset_index(drop=True).to_feather(tmp)
+    os.replace(tmp, path)
+    return path
+  except ImportError as e:
+    print(f'Notice: {fmt} output requires pyarrow ({e}).')
+  finally:
+    if os.path.exists(tmp):
+      os.remove(tmp)
+  return None
+
+
+def read_frame(path):
+  """Reads a columnar file into a typed DataFrame."""
+  import pandas as pd
+
+  return pd.read_parquet(path) if path.endswith(FORMATS['parquet']) else pd.read_feather(path)
+
+
+def read_gen_frame(csv_file):
+  """
+  Reads a gencsv output as it reads from the csv (Date as m/d/Y strings), from the columnar copy if it's up to date.
+  C1..C10 are categorical in both cases. Returns an empty DataFrame if neither exists.
+  """
+  import pandas as pd
+
+  path = find_columnar(csv_file)
+  if path:
+    df = read_frame(path)
+    if 'Date' in df:
+      df['Date'] = df['Date'].dt.strftime('%m/%d/%Y').astype(object).where(df['Date'].notna())
+    for col in df.columns:
+      if isinstance(df[col].dtype, pd.StringDtype):
+        df[col] = df[col].astype(object).where(df[col].notna())
+    return df
+
+  if not os.path.isfile(csv_file):
+    return pd.DataFrame({})
+
+  df = pd.read_csv(csv_file)
+  for col in df.columns:
+    if col in CATEGORY_NAMES:
+      df[col] = df[col].astype('category')
+  return df
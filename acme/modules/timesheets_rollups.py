@@ -0,0 +1,163 @@
+"""
+Timesheets Module: Rollups
+--------------------------
+Hours & entry counts of a collection per day, ISO week & month, crossed with C1, C1/C2 & C1/C2/C3.
+The rollups are written next to the collection csv by gencsv (e.g. gen/2024.rollups.csv next to gen/2024.csv).
+
+Columns:
+  - Period      : day, week, month
+  - Start       : Y-m-d of the day, the monday of the ISO week or the first day of the month
+  - Level       : 1 (C1), 2 (C1/C2), 3 (C1/C2/C3)
+  - C1, C2, C3  : categories (empty for entries without the category)
+  - Hours       : total hours
+  - Entries     : number of entries
+
+Only the days of the collection are included (e.g. the first week of an interval can be partial).
+
+Rollups are rebuilt incrementally: the day rollups of days whose entries (hours & categories) didn't
+change are reused from the rollup cache in {workspace}/gen/.cache/ (safe to delete at any time),
+week & month rollups are summed from the day rollups.
+"""
+
+import os
+import pickle
+import hashlib
+
+import numpy as np
+
+from datetime import date, timedelta
+
+from acme.core import utils
+from acme.modules import timesheets_categorize
+from acme.modules.timesheets import Entry
+from acme.modules.timesheets_table import EntryTable
+
+# bump when the rollup rows change
+ROLLUPS_VERSION = 1
+
+CACHE_DIR_NAME  = '.cache'
+CACHE_FILE_NAME = 'timesheets_rollups.pickle'
+
+# number of collections cached (the least recently rolled up are dropped, e.g. one-off intervals)
+MAX_COLLECTIONS = 32
+
+ROLLUPS_SUFFIX  = '.rollups.csv'
+
+PERIODS = ('day', 'week', 'month')
+LEVELS  = (1, 2, 3)
+HEADER  = ['Period', 'Start', 'Level', 'C1', 'C2', 'C3', 'Hours', 'Entries']
+
+
+def rollups_file(csv_file):
+  """Returns the path of the rollups of a collection csv (e.g. gen/2024.csv -> gen/2024.rollups.csv)."""
+  return f'{os.path.splitext(csv_file)[0]}{ROLLUPS_SUFFIX}'
+
+
+def period_start(day, period):
+  """Returns the start (date) of the period (day, week, month) that contains day."""
+  if period == 'week':
+    return day - timedelta(days=day.weekday())
+  if period == 'month':
+    return day.replace(day=1)
+  return day
+
+
+def day_rollups(entries):
+  """Returns { date ordinal : [(level, C1, C2, C3, hours, entries), ...] } for Entry records with resolved categories."""
+  table = EntryTable.from_entries(entries)
+  days  = {}
+  if not len(table):
+    return days
+
+  for level in LEVELS:
+    uniq, sums, counts = table.group_sum(np.column_stack((table.dates, table.codes[:, :level])))
+    for key, hours, count in zip(uniq.tolist(), sums.tolist(), counts.tolist()):
+      categories = [table.labels[c] if c >= 0 else '' for c in key[1:]]
+      days.setdefault(key[0], []).append((level, *categories, *('',) * (len(LEVELS) - level), hours, count))
+
+  return days
+
+
+def day_digest(values):
+  return hashlib.blake2b(repr(values).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class RollupCache:
+
+  def __init__(self, gen_dir):
+    self.gen_dir     = gen_dir
+    self.file        = os.path.join(gen_dir, CACHE_DIR_NAME, CACHE_FILE_NAME)
+    self.collections = {} # { collection file name : { date ordinal : (digest, day rollups) } }
+
+    try:
+      with open(self.file, 'rb') as f:
+        version, collections = pickle.load(f)
+      if version == ROLLUPS_VERSION:
+        self.collections = collections
+    except Exception: # missing or unreadable cache -> start empty
+      pass
+
+  def put(self, name, day_rollups):
+    """Stores the day rollups of a collection file & drops the collections whose files were deleted or exceed MAX_COLLECTIONS."""
+    self.collections.pop(name, None)
+    self.collections[name] = day_rollups
+    names = [n for n in self.collections if os.path.isfile(os.path.join(self.gen_dir, n))]
+    self.collections = { n : self.collections[n] for n in names[-MAX_COLLECTIONS:] }
+
+  def save(self):
+    try:
+      os.makedirs(os.path.dirname(self.file), exist_ok=True)
+      with utils.atomic_write(self.file, 'wb') as f:
+        pickle.dump((ROLLUPS_VERSION, self.collections), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+      print(f'Notice: the rollup cache could not be saved ({e}).')
+
+
+def update_rollups(gen_dir, csv_file, entries):
+  """
+  Writes the rollups of a collection (Entry records) next to csv_file.
+  Returns (rollups file, number of changed days, number of unchanged days).
+  """
+  # the rollups only depend on the date, hours & first categories of each entry
+  days = {}
+  for e in entries:
+    if e.date:
+      categories = timesheets_categorize.entry_categories(e)[1][:len(LEVELS)]
+      days.setdefault(e.date, []).append((e.hours, categories))
+
+  cache  = RollupCache(gen_dir)
+  cached = cache.collections.get(os.path.basename(csv_file), {})
+  digests = { day : day_digest(values) for day, values in days.items() }
+
+  rollups = { day : cached[day][1] for day, digest in digests.items() if day in cached and cached[day][0] == digest }
+  changed = [day for day in days if day not in rollups]
+
+  rollups.update(day_rollups(
+    Entry(day, hours, (), '', categories) for day in changed for hours, categories in days[day]
+  ))
+
+  file = rollups_file(csv_file)
+  utils.write_csv(file, [HEADER, *rollup_rows(rollups)])
+
+  cache.put(os.path.basename(csv_file), { day : (digests[day], rollups[day]) for day in days })
+  cache.save()
+
+  return file, len(changed), len(days) - len(changed)
+
+
+def rollup_rows(rollups):
+  """Sums day rollups ({ date ordinal : [(level, C1, C2, C3, hours, entries), ...] }) into the rows of all periods."""
+  totals = {}
+  for ordinal, day_rows in rollups.items():
+    day = date.fromordinal(ordinal)
+    for period in PERIODS:
+      start = period_start(day, period)
+      for level, c1, c2, c3, hours, count in day_rows:
+        key = (PERIODS.index(period), start, level, c1, c2, c3)
+        total = totals.get(key, (0.0, 0))
+        totals[key] = (total[0] + hours, total[1] + count)
+
+  return [
+    [PERIODS[period], start.isoformat(), level, c1, c2, c3, round(hours, 6), count]
+      for (period, start, level, c1, c2, c3), (hours, count) in sorted(totals.items())
+  ]
@@ -0,0 +1,127 @@
+"""
+Timesheets Module: Entry Store
+------------------------------
+SQLite database of parsed timesheet entries ({workspace}/gen/acme.sqlite) for ad-hoc queries.
+
+Tables:
+  entries : date (Y-m-d), position (in the day), hours, description, splits, C1..C10
+  days    : date, entry count & content hash of each stored day
+
+The store is updated per day by gencsv (--format sqlite): days whose entries changed are deleted &
+re-inserted, unchanged days are skipped and days without log files anymore are removed.
+
+Example queries (acme sql "<query>"):
+  SELECT C2, round(sum(hours), 2) AS hours FROM entries WHERE date BETWEEN '2024-07-01' AND '2024-09-30' GROUP BY C2
+  SELECT date, sum(hours) FROM entries WHERE C1 = 'Music' GROUP BY date
+"""
+
+import os
+import sqlite3
+import hashlib
+
+from datetime import date
+
+from acme.modules import timesheets
+from acme.modules import timesheets_categorize
+from acme.modules.timesheets_categorize import CATEGORY_NAMES
+
+STORE_FILE_NAME = 'acme.sqlite'
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS days (
+  date      TEXT PRIMARY KEY,
+  entries   INTEGER,
+  hash      TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+  date        TEXT NOT NULL,
+  position    INTEGER NOT NULL,
+  hours       REAL,
+  description TEXT,
+  splits      TEXT,
+  {', '.join(f'{c} TEXT' for c in CATEGORY_NAMES)},
+  PRIMARY KEY (date, position)
+);
+CREATE INDEX IF NOT EXISTS entries_c1 ON entries (C1, C2, C3);
+CREATE INDEX IF NOT EXISTS entries_c2 ON entries (C2);
+CREATE INDEX IF NOT EXISTS entries_c3 ON entries (C3);
+"""
+
+INSERT_ENTRY = f"INSERT INTO entries VALUES ({', '.join('?' * (5 + len(CATEGORY_NAMES)))})"
+
+
+def store_file(gen_dir):
+  return os.path.join(gen_dir, STORE_FILE_NAME)
+
+
+class EntryStore:
+
+  def __init__(self, gen_dir):
+    self.file = store_file(gen_dir)
+    self.db = sqlite3.connect(self.file)
+    self.db.executescript(SCHEMA)
+
+  def close(self):
+    self.db.close()
+
+  def update(self, date_from, date_to, entries):
+    """
+    Stores the entries (Entry records) of all days from date_from to date_to (datetime.date, inclusive).
+    Only days whose entries changed are re-inserted. Returns the number of (changed, unchanged) days.
+    """
+    days = {}
+    for e in entries:
+      if e.date:
+        days.setdefault(date.fromordinal(e.date).isoformat(), []).append(entry_values(e))
+
+    stored = dict(self.db.execute(
+      'SELECT date, hash FROM days WHERE date BETWEEN ? AND ?', (date_from.isoformat(), date_to.isoformat())
+    ))
+
+    changed = unchanged = 0
+    with self.db:
+      # days that don't have entries anymore
+      for day in stored.keys() - days.keys():
+        self.delete_day(day)
+        changed += 1
+
+      for day, values in days.items():
+        digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=16).hexdigest()
+        if stored.get(day) == digest:
+          unchanged += 1
+          continue
+        self.delete_day(day)
+        self.db.executemany(INSERT_ENTRY, ((day, i, *v) for i, v in enumerate(values)))
+        self.db.execute('INSERT INTO days VALUES (?, ?, ?)', (day, len(values), digest))
+        changed += 1
+
+    return changed, unchanged
+
+  def delete_day(self, day):
+    self.db.execute('DELETE FROM entries WHERE date = ?', (day,))
+    self.db.execute('DELETE FROM days WHERE date = ?', (day,))
+
+
+def entry_values(e):
+  """Returns (hours, description, splits, C1..C10) of an Entry. Entries that weren't categorized are split at their parenblock."""
+  description, categories = timesheets_categorize.entry_categories(e)
+
+  categories = tuple(c or None for c in categories[:len(CATEGORY_NAMES)])
+  return (
+    e.hours,
+    description,
+    timesheets.format_splits(e.splits),
+    *categories,
+    *(None,) * (len(CATEGORY_NAMES) - len(categories)),
+  )
+
+
+def query(gen_dir, sql):
+  """Runs a (read only) query on the entry store. Returns (column names, rows)."""
+  db = sqlite3.connect(f'file:{store_file(gen_dir)}?mode=ro', uri=True)
+  try:
+    cursor = db.execute(sql)
+    headers = [c[0] for c in cursor.description] if cursor.description else []
+    return headers, cursor.fetchall()
+  finally:
+    db.close()
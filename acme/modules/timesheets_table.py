@@ -0,0 +1,116 @@
+"""
+Timesheets Module: Entry Table
+------------------------------
+Columnar storage for parsed timesheet entries (NumPy arrays) with vectorized aggregations.
+
+Columns:
+  - dates         : int32 date ordinals (0 if the entry has no date)
+  - hours         : float64 hours
+  - codes         : int32 (n, 10) categorical codes for C1..C10 (-1 if empty), labels in `labels`
+  - descriptions  : all descriptions joined into one string, sliced with `desc_offsets`
+  - splits        : all hour splits in one float64 array, sliced with `split_offsets`
+
+Usage:
+  table = EntryTable.from_entries(timesheets.parse_entries(...))
+  table.group_sum(table.dates)          # hours & entry counts per day
+  table.group_sum(table.codes[:, :2])   # hours & entry counts per C1/C2
+"""
+
+import numpy as np
+
+from acme.modules.timesheets import Entry
+from acme.modules.timesheets_categorize import CATEGORY_NAMES
+
+
+class EntryTable:
+
+  def __init__(self, dates, hours, codes, labels, descriptions, desc_offsets, splits, split_offsets):
+    self.dates          = dates
+    self.hours          = hours
+    self.codes          = codes
+    self.labels         = labels
+    self.descriptions   = descriptions
+    self.desc_offsets   = desc_offsets
+    self.splits         = splits
+    self.split_offsets  = split_offsets
+
+  @classmethod
+  def from_entries(cls, entries):
+    """Builds a table from Entry records."""
+    entries = list(entries)
+    count   = len(entries)
+
+    codes   = np.full((count, len(CATEGORY_NAMES)), -1, dtype=np.int32)
+    labels  = []
+    lookup  = {}
+
+    for i, e in enumerate(entries):
+      for j, category in enumerate(e.categories):
+        if category:
+          code = lookup.get(category)
+          if code is None:
+            code = lookup[category] = len(labels)
+            labels.append(category)
+          codes[i, j] = code
+
+    return cls(
+      dates         = np.fromiter((e.date for e in entries), dtype=np.int32, count=count),
+      hours         = np.fromiter((e.hours for e in entries), dtype=np.float64, count=count),
+      codes         = codes,
+      labels        = labels,
+      descriptions  = ''.join(e.description for e in entries),
+      desc_offsets  = _offsets(len(e.description) for e in entries),
+      splits        = np.fromiter((s for e in entries for s in e.splits), dtype=np.float64),
+      split_offsets = _offsets(len(e.splits) for e in entries),
+    )
+
+  def __len__(self):
+    return len(self.hours)
+
+  def __iter__(self):
+    """Yields the rows as Entry records (e.g. for timesheets.entries_to_csv)."""
+    for i in range(len(self)):
+      yield self.entry(i)
+
+  def entry(self, i):
+    """Returns row (i) as an Entry record."""
+    return Entry(
+      int(self.dates[i]),
+      float(self.hours[i]),
+      tuple(self.splits[self.split_offsets[i]:self.split_offsets[i+1]].tolist()),
+      self.description(i),
+      self.categories(i),
+    )
+
+  def description(self, i):
+    return self.descriptions[self.desc_offsets[i]:self.desc_offsets[i+1]]
+
+  def categories(self, i):
+    codes = self.codes[i]
+    # trailing empty categories are dropped (as parsed from the parenblock)
+    used  = np.flatnonzero(codes >= 0)
+    return tuple(self.labels[c] if c >= 0 else '' for c in codes[:used[-1] + 1]) if len(used) else ()
+
+  # -- aggregations -- #
+
+  def group_sum(self, keys, rows=None):
+    """
+    Returns (unique keys, hours per key, entry count per key) for row keys (1d or 2d array).
+    An optional boolean mask (rows) limits the rows that are grouped.
+    """
+    hours = self.hours
+    if rows is not None:
+      keys, hours = keys[rows], hours[rows]
+    uniq, inverse = np.unique(keys, return_inverse=True, axis=0 if keys.ndim > 1 else None)
+    inverse = inverse.ravel()
+    sums    = np.bincount(inverse, weights=hours, minlength=len(uniq))
+    counts  = np.bincount(inverse, minlength=len(uniq))
+    return uniq, sums, counts
+
+
+def _offsets(lengths):
+  """Cumulative offsets [0, l0, l0+l1, ...] for slicing joined columns."""
+  lengths = np.fromiter(lengths, dtype=np.int64)
+  offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+  np.cumsum(lengths, out=offsets[1:])
+  return offsets
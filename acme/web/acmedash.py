@@ -5,10 +5,8 @@
 # latest source & documentation at: https://github.com/ryt/activity-metrics.git
 
 import os
-import sys
 import time
 import itertools
-import importlib
 
 from flask import Flask
 from flask import request
@@ -18,6 +16,7 @@ from configparser import ConfigParser
 
 from __init__ import __version__
 from acme.core.settings import Settings
+from acme.web import registry
 
 configDir   = Settings.settings('acme.configDir')
 appsDirName = Settings.settings('workspace.appsDirName')
@@ -69,6 +68,39 @@ def parse_settings(getm):
     exec(f.read(), {}, module)
   return module
 
+def workspace_settings(getm1):
+  """
+  Settings snapshot of the workspace (cached, rebuilt only when its config file changes).
+  The snapshot is passed to the module handlers of the request (the current settings of the process don't change).
+  """
+  return Settings.snapshot(getm1)
+
+def local_modules(runLocalApps):
+  """Local app modules from web.runLocalApps: { url-path : (module_name, module_script) }"""
+  return { r[2] : (r[0], r[1]) for r in runLocalApps or () }
+
+def import_local_module(getm1, module, runLocalApps):
+  """
+  Load a local app module from {workspace}/apps (through the module registry: reloaded only if its file changed).
+  Returns (module_name, module or None if the script doesn't exist, load info in debug mode or None).
+  """
+  module_name, module_script = local_modules(runLocalApps)[module]
+
+  try:
+    module_run, info = registry.load(f'{getm1}/{appsDirName}/{module_script}')
+  except FileNotFoundError:
+    return module_name, None, None
+
+  return module_name, module_run, debug_load_info(module_script, info)
+
+def debug_load_info(module_script, info):
+  """Log the module load time & return the load info for the page (debug mode only, otherwise None)"""
+  if not app.debug:
+    return None
+  state = f'loaded in {info.load_ms:.2f} ms' if info.reloaded else f'cached (last load: {info.load_ms:.2f} ms)'
+  app.logger.debug(f'local app module {module_script}: {state}')
+  return info
+
 # router start
 
 
@@ -103,41 +135,32 @@ def default_modules(module='index'):
     'message': '',
     'output_html': '',
     'add_nav_links': (),
+    'debug': None, # module load info (shown in debug mode)
   }
 
   if getm1 and os.path.isdir(f'{getm1}/logs/'):
 
     # default local app modules import
 
-    Settings.setWorkspaceDir(getm1)
+    config = workspace_settings(getm1)
 
-    addNavLinks   = Settings.settings('web.addNavLinks')
-    runLocalApps  = Settings.settings('web.runLocalApps')
+    addNavLinks   = config.get('web.addNavLinks')
+    runLocalApps  = config.get('web.runLocalApps')
 
     view['add_nav_links'] = addNavLinks
 
-    module_list = {}
-    for r in runLocalApps:
-      module_list[r[2]] = (r[0], r[1])
-
     if module == 'about':
-      sys.path.append(f'{getm1}/')
-      module_local_init = importlib.import_module(f'{appsDirName}.__init__')
-      importlib.reload(module_local_init)
+      module_local_init, info = registry.load(f'{getm1}/{appsDirName}/__init__.py', name=appsDirName)
       view['version']['local'] = module_local_init.__version__
+      view['debug'] = debug_load_info(f'{appsDirName}/__init__.py', info)
 
-    elif module in module_list:
+    elif module in local_modules(runLocalApps):
 
-      module_name   = module_list[module][0]
-      module_script = module_list[module][1]
-      module_call   = module_script.rstrip('.py')
+      module_name, module_run, view['debug'] = import_local_module(getm1, module, runLocalApps)
 
-      if os.path.isfile(f'{getm1}/{appsDirName}/{module_script}'):
-        sys.path.append(f'{getm1}/{appsDirName}/')
-        module_run = importlib.import_module(module_call)
-        importlib.reload(module_run)
+      if module_run:
 
-        received_output = module_run.run_main(getm)
+        received_output = module_run.run_main(getm, config)
 
         # check if received output is send_file_object or jsonify_object
         # if so serve either one appropriately, if not carry on
@@ -171,6 +194,34 @@ def default_modules(module='index'):
   return render_template('acmedash.html', view=view)
 
 
+# router for the json data api of local modules (e.g. pages of table rows): calls run_data(getm, config) of the module
+
+@app.route(f'{app_path}<module>/data', methods=['GET'])
+def module_data(module):
+
+  gqm = get_query('m')
+  lqm = limitpath.rstrip('/') + '/' + gqm.lstrip('/') if limitpath else ''
+
+  getm = (gqm, lqm if lqm else gqm)
+  getm1 = getm[1].rstrip('/')
+
+  if not (getm1 and os.path.isdir(f'{getm1}/logs/')):
+    return jsonify({ 'error' : 'Please specify a valid metrics directory path. ?m=/Path/to/Metrics/' }), 400
+
+  config = workspace_settings(getm1)
+  runLocalApps = config.get('web.runLocalApps')
+
+  if module not in local_modules(runLocalApps):
+    return jsonify({ 'error' : f'Sorry a module named "{module}" could not be found.' }), 404
+
+  module_name, module_run, _ = import_local_module(getm1, module, runLocalApps)
+
+  if not module_run or not hasattr(module_run, 'run_data'):
+    return jsonify({ 'error' : f'Sorry the dashboard {module_name} module does not provide data.' }), 404
+
+  return jsonify(module_run.run_data(getm, config))
+
+
 def main(port=5000):
   sslck = sslcertkey.split(' ')
   if len(sslck) == 2:
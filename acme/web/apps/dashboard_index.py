@@ -11,35 +11,55 @@ import re
 import sys
 import csv
 import html
+import json
 import traceback
+import numpy as np
 import pandas as pd
 
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
+from types import SimpleNamespace
 from urllib.parse import urlparse
-from flask import request
+from flask import request, url_for
 from io import StringIO
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# (added once, the module is reloaded whenever it changes)
+if os.path.dirname(os.path.dirname(os.path.abspath(__file__))) not in sys.path:
+  sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import macros
 
-# date & time definitions
+from acme.web import frames
+from acme.modules import timesheets_rollups
 
-today = datetime.today()
-today_f = (today.strftime('%Y-%m-%d'), today.strftime('%b %-d'), today.strftime('%m/%d')) # %b %-d, %Y
+# data table: rows per page of the data api (run_data) & max rows per request (except limit=all)
 
-yest = today - timedelta(days=1)
-yest_f = (yest.strftime('%Y-%m-%d'), yest.strftime('%b %-d'), yest.strftime('%m/%d'))
+DATA_PAGE_ROWS = 200
+DATA_MAX_ROWS  = 5000
 
-weekstart = today - timedelta(days=(today.weekday() + 1) % 7)
-weekstart_f = (weekstart.strftime('%Y-%m-%d'), weekstart.strftime('%b %-d'), weekstart.strftime('%m/%d'))
+# date & time definitions (resolved per request, see get_dates)
 
-monthstart = today.replace(day=1)
-monthstart_f = (monthstart.strftime('%Y-%m-%d'), monthstart.strftime('%b %-d'), monthstart.strftime('%m/%d'))
+@lru_cache(maxsize=4)
+def dates_for(day):
+  """Today, yesterday, week, month & year start for day (date) as (Y-m-d, b d, m/d), current & last year"""
+  def date_f(d):
+    return (d.strftime('%Y-%m-%d'), d.strftime('%b %-d'), d.strftime('%m/%d')) # %b %-d, %Y
 
-year = today.strftime('%Y')
-yearstart_f = (f'{year}-01-01', 'Jan 1', '01/01')
+  year = day.strftime('%Y')
 
-last_year = str(int(year)-1)
+  return SimpleNamespace(
+    today_f       = date_f(day),
+    yest_f        = date_f(day - timedelta(days=1)),
+    weekstart_f   = date_f(day - timedelta(days=(day.weekday() + 1) % 7)),
+    monthstart_f  = date_f(day.replace(day=1)),
+    yearstart_f   = (f'{year}-01-01', 'Jan 1', '01/01'),
+    year          = year,
+    last_year     = str(int(year)-1),
+  )
+
+
+def get_dates():
+  """Dates for today (computed once per day, long running workers don't keep the day they were started)"""
+  return dates_for(date.today())
 
 
 def get_query(param):
@@ -145,153 +165,232 @@ def parse_filter(qfilter):
   return filter_dicts
 
 
-def df_activity_filter(odf, qf):
-  """Filter rows of data from df (DataFrame) using qf ('query filter' activity name)"""
+def filter_mask(col, f):
+  """
+  Boolean mask (numpy) of a single filter (parse_filter dict) on a column (Series):
+  exact match if the value is quoted, otherwise literal (non-regex) contains. Missing values never match.
+  """
+  if isinstance(col.dtype, pd.CategoricalDtype):
+    # categoricals (C1..C10): match the categories once & compare the integer codes of the rows
+    codes = col.cat.codes.to_numpy()
+    categories = col.cat.categories.astype(str)
+    if f['is_quoted'] == True:
+      code = categories.get_indexer([f['val_nq']])[0]
+      return codes == code if code >= 0 else np.zeros(len(col), dtype=bool)
+    matches = np.append(np.asarray(categories.str.contains(f['val'], regex=False), dtype=bool), False) # code -1: missing
+    return matches[codes]
 
-  df = odf.copy() # copy odf / [o]riginal [df]
+  if f['is_quoted'] == True:
+    return (col == f['val_nq']).to_numpy(dtype=bool, na_value=False)
 
-  fi = parse_filter(qf)
+  if not (col.dtype == object or isinstance(col.dtype, pd.StringDtype)):
+    col = col.astype('string')
+  return col.str.contains(f['val'], regex=False, na=False).to_numpy(dtype=bool, na_value=False)
 
-  if len(fi) > 1: # multiple filters
 
-    ## note: multiple filters method copied exactly from single filter, but put inside a loop for each filter query ##
+def df_activity_filter(df, qf):
+  """
+  Filter rows of data from df (DataFrame) using qf ('query filter' activity name).
+  All filters are combined into a single mask (rows must match every filter).
+  """
+  mask = np.ones(len(df), dtype=bool)
 
-    for f_val in fi:
-      fi_key = f_val['key']
-      fi_val = f_val['val']
+  for f in parse_filter(qf):
+    fi_key = f['key']
 
-      if fi_key == 'QUERY_FILTER_COLUMN':
-        fi_key = df.columns[f_val['col_num']-1]
+    if fi_key == 'QUERY_FILTER_COLUMN':
+      fi_key = df.columns[f['col_num']-1] if 0 < f['col_num'] <= len(df.columns) else ''
 
-      if f_val['is_quoted'] == True: # exact match e.g. "Music" .. check if val_nq (no quote) == column value
-        df = df[df[fi_key] == f_val['val_nq']] if fi_key in df else pd.DataFrame({})
-      else:
-        df = df[df[fi_key].str.contains(fi_val, na=False)] if fi_key in df else pd.DataFrame({})
+    if fi_key not in df:
+      return pd.DataFrame({})
 
-  else: # single filter
+    mask &= filter_mask(df[fi_key], f)
 
-    fi_key = fi[0]['key']
-    fi_val = fi[0]['val']
+  return df[mask]
 
-    if fi_key == 'QUERY_FILTER_COLUMN':
-      fi_key = df.columns[fi[0]['col_num']-1]
 
-    if fi[0]['is_quoted'] == True: # exact match e.g. "Music" .. check if val_nq (no quote) == column value
-      df = df[df[fi_key] == fi[0]['val_nq']] if fi_key in df else pd.DataFrame({})
-    else:
-      df = df[df[fi_key].str.contains(fi_val, na=False)] if fi_key in df else pd.DataFrame({})
+def period_bounds(qp):
+  """Returns the (from, to) dates (Y-m-d) of a ?periods= period or None"""
+  d = get_dates()
+  qp_table = {
+    'today'     : (d.today_f[0], d.today_f[0]),
+    'yesterday' : (d.yest_f[0], d.yest_f[0]),
+    'week'      : (d.weekstart_f[0], d.today_f[0]),
+    'month'     : (d.monthstart_f[0], d.today_f[0]),
+    'year'      : (d.yearstart_f[0], d.today_f[0]),
+  }
+  return qp_table.get(qp)
 
-  return df
+
+def period_slice(df, bounds):
+  """Rows of df from bounds[0] to bounds[1] (Y-m-d, inclusive), by binary search on its sorted date index (frames.dated_frame)"""
+  dates = df.index.to_numpy()
+  lo, hi = np.searchsorted(dates, (np.array(bounds, dtype='datetime64[D]') + [0, 1]).astype(dates.dtype))
+  return df.iloc[lo:hi]
 
 
-def html_table_from_dataframe(df, apply_filters=False):
-  """Create html table view from pandas dataframe of csv data"""
+def filter_dataframe(df):
+  """Apply the ?periods= & ?filter= query filters to df (DataFrame, usually from frames.read_dated_gen_frame)"""
+
+  # ?periods=:period:
+  qp = period_bounds(get_query('periods'))
+  if qp and 'Date' in df:
+    if not isinstance(df.index, pd.DatetimeIndex):
+      df = frames.dated_frame(df)
+    df = period_slice(df, qp)
+
+  # ?filter=:filter:
+  qf = url_modify(get_query('filter'))
+  if qf:
+    df = df_activity_filter(df, qf)
 
-  #### start: filters & periods ###
+  return df
 
-  if apply_filters:
 
-    # ?filter=:filter:
-    qf = url_modify(get_query('filter'))
-    if qf:
-      df = df_activity_filter(df, qf)
+def total_hours(df):
+  """Sum of the Hours column of df without the 'Total Logged Hours' footer"""
+  return df[df['Description'] != 'Total Logged Hours']['Hours'].sum() if 'Description' in df else 0
 
-    # ?periods=:period:
-    qp = get_query('periods')
-    if qp:
-      qp_table = {
-        'today'     : (today_f[0], today_f[0]),
-        'yesterday' : (yest_f[0], yest_f[0]),
-        'week'      : (weekstart_f[0], today_f[0]),
-        'month'     : (monthstart_f[0], today_f[0]),
-        'year'      : (yearstart_f[0], today_f[0]),
-      }
-      if qp in qp_table and 'Date' in df:
-        qp = qp_table[qp]
 
-        # make a copy of original date column before conversion
-        df['OriginalDate'] = df['Date']
-        df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+# rollups (gencsv: {collection}.rollups.csv) for summaries & totals
 
-        # convert start_date and end_date to datetime
-        start_date = pd.to_datetime(qp[0], format='%Y-%m-%d') # from
-        end_date = pd.to_datetime(qp[1], format='%Y-%m-%d') # to
+def read_rollups(gen_csv_file, config=None):
+  """Load the rollups of a gen csv (DataFrame, cached) if they're at least as new as the csv, or None"""
+  rollups_file = timesheets_rollups.rollups_file(gen_csv_file)
+  try:
+    if os.stat(rollups_file).st_mtime_ns < os.stat(gen_csv_file).st_mtime_ns:
+      return None # csv was rewritten later (e.g. garmin merge)
+  except OSError:
+    return None
+
+  return frames.read_csv(rollups_file, copy=False, config=config, keep_default_na=False, dtype={ 'C1' : str, 'C2' : str, 'C3' : str })
+
+
+def rollup_summary(rollups, columns):
+  """
+  Hours & entries per C1 (DataFrame) for the ?filter= & ?periods= queries from the rollups, or None if the
+  filters can't be answered from rollups (filters on columns other than C1, C2, C3 of the gen csv columns).
+  """
+  filters = [f for f in parse_filter(url_modify(get_query('filter'))) if f['key']]
+
+  keys = []
+  for f in filters:
+    key = f['key']
+    if key == 'QUERY_FILTER_COLUMN':
+      key = columns[f['col_num']-1] if 0 < f['col_num'] <= len(columns) else ''
+    if key not in ('C1', 'C2', 'C3') or key not in columns:
+      return None
+    keys.append(key)
+
+  # filters on C2/C3 need the C1/C2(/C3) rollups
+  level = max((int(k[1:]) for k in keys), default=1)
+
+  # day rollups for periods, month rollups (a few hundred rows) for the whole collection
+  bounds = period_bounds(get_query('periods'))
+  if bounds:
+    rows = rollups[(rollups['Period'] == 'day') & (rollups['Start'] >= bounds[0]) & (rollups['Start'] <= bounds[1])]
+  else:
+    rows = rollups[rollups['Period'] == 'month']
+  rows = rows[rows['Level'] == level]
+
+  # same matching as df_activity_filter (empty categories never match)
+  for f, key in zip(filters, keys):
+    rows = rows[rows[key] != '']
+    if f['is_quoted'] == True:
+      rows = rows[rows[key] == f['val_nq']]
+    else:
+      rows = rows[rows[key].str.contains(f['val'], regex=False, na=False)]
 
-        # filter rows between start_date and end_date
-        df = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
+  return rows.groupby('C1')[['Hours', 'Entries']].sum()
 
-        # copy original date back & drop extra column
-        df['Date'] = df['OriginalDate']
-        df = df.drop(columns=['OriginalDate'])
 
-  #### end: filters & periods ####
+def frame_page(df, offset=0, limit=None, reverse=False, total_hrs=None):
+  """
+  Returns a window of rows of df (DataFrame) as a json-ready dict: columns, rows (cell texts, as they read back from a csv),
+  offset, limit, total (rows) & total_hrs (summed from df if not given).
+  The window is taken after reversing the rows if reverse (sort: za).
+  """
+  total = len(df)
+  limit = total if limit is None else max(limit, 0)
+  offset = min(max(offset, 0), total)
 
-  qs = get_query('sort')
+  window = df.iloc[::-1] if reverse else df
+  page = window.iloc[offset:offset + limit]
 
-  csv_str = StringIO()
-  df.to_csv(csv_str, index=False)
-  csv_str.seek(0)  # Go back to the start of the StringIO object
-  csv_content = csv_str.getvalue()
-
-  html_table = '<table class="csv-table">\n'
-  # added {skipinitialspace=True} to fix issue with commas inside quoted cells
-  csv_reader = csv.reader(csv_content.splitlines(), skipinitialspace=True)
-  headers = next(csv_reader)
-
-  html_table += '<tr>'
-  for header in headers:
-    header = html.escape(header)
-    html_table += f'<th>{header}</th>'
-  html_table += '</tr>\n'
-
-  # sorting: za -> Z-A
-  if qs:
-    if qs == 'za':
-      csv_reader = reversed(list(csv_reader))
-
-  for row in csv_reader:
-    html_table += '<tr>'
-    for cell in row:
-      cell = html.escape(cell)
-      html_table += f'<td>{cell}</td>'
-    html_table += '</tr>\n'
-    
-  html_table += '</table>'
+  columns = [cell_texts(page.iloc[:, i]) for i in range(len(page.columns))]
 
   return {
-    'html'       : html_table,
-    'total'      : len(df),
-    'total_hrs'  : df[df['Description'] != 'Total Logged Hours']['Hours'].sum() if 'Description' in df else 0,
+    'columns'   : [str(c) for c in df.columns],
+    'rows'      : [list(row) for row in zip(*columns)],
+    'offset'    : offset,
+    'limit'     : limit,
+    'total'     : total,
+    'total_hrs' : round(float(total_hours(df) if total_hrs is None else total_hrs), 2),
   }
 
 
-def ifxyz(x, y, z, default = ''):
-  """Return z if x == y else default (or empty) string"""
-  return z if x == y else default
+# table cell texts
 
+# cells are shown as they read back from a csv (df.to_csv -> csv.reader with skipinitialspace)
+CSV_QUOTED = re.compile(r'[,"\r\n]')
 
-#### ---- main metrics dashboard process start ---- ####
+# characters that split csv lines (str.splitlines) or can't be read back: converted through an actual csv round trip
+CSV_LINE_BREAKS = re.compile('[\x00\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
 
-def run_main():
 
-  # define metrics & log files
+def csv_cell_texts(col):
+  """
+  Returns the cell texts of a column (Series) as they read back from a csv (list of str).
+  Missing values are empty & unquoted values lose their leading spaces (skipinitialspace).
+  Returns None for dtypes & texts that need an actual csv round trip (see CSV_LINE_BREAKS).
+  """
+  kind = col.dtype.kind if isinstance(col.dtype, np.dtype) else ''
 
-  gen_dir       = f"{get_query('m').rstrip('/')}/gen/"
-  gen_csv_file  = ''
-  output_html   = ''
+  if kind == 'f':
+    values = col.to_numpy()
+    texts = np.where(np.isnan(values), '', values.astype(str)).tolist()
+  elif kind in ('i', 'u', 'b'):
+    texts = col.to_numpy().astype(str).tolist()
+  elif kind == 'O' or isinstance(col.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+    texts = [str(v) for v in col.astype(object).where(col.notna(), '')]
+  else:
+    return None
 
-  # shortcuts for quotes & new lines
+  # checked on the joined column, per cell only if needed
+  if CSV_LINE_BREAKS.search(''.join(texts)):
+    return None
+  if any(t.startswith(' ') for t in texts):
+    texts = [t.lstrip(' ') if t.startswith(' ') and not CSV_QUOTED.search(t) else t for t in texts]
 
-  q = '"'
-  nl = "\n"
-  lnl = "\\n"
+  return texts
 
 
-  # query string parameters
+def cell_texts(col):
+  """Returns the cell texts of a column (Series) as they read back from a csv (through a csv round trip if needed)."""
+  texts = csv_cell_texts(col)
+  if texts is None:
+    csv_reader = csv.reader(StringIO(col.to_csv(index=False)), skipinitialspace=True)
+    next(csv_reader, None)
+    texts = [row[0] if row else '' for row in csv_reader]
+  return texts
+
+
+def script_json(obj):
+  """Json for inline <script> tags"""
+  return json.dumps(obj).replace('</', '<\\/')
+
+
+def ifxyz(x, y, z, default = ''):
+  """Return z if x == y else default (or empty) string"""
+  return z if x == y else default
+
+
+def find_gen_csv_file(gen_dir):
+  """Returns the gen csv file to show for the ?periods= query (or empty string if none exists)"""
 
-  qf = url_modify(get_query('filter'))
   qp = get_query('periods')
-  qs = get_query('sort')
+  d = get_dates()
+  gen_csv_file = ''
 
   # default view & periods filtering views (files: today.csv yesterday.csv year.csv) 
 
@@ -302,37 +401,85 @@ def run_main():
       print(f'the year is correct: {qp}')
       use_year = qp
   except ValueError:
-    use_year = year
+    use_year = d.year
 
   if ( qp == 'year' or 
        qp == 'month' or 
        qp == 'week' ) and os.path.isfile(f'{gen_dir}{use_year}.csv'):
     gen_csv_file  = f'{gen_dir}{use_year}.csv'
 
-  elif (qp == 'today' or not qp) and os.path.isfile(f'{gen_dir}{today.strftime("%Y-%m-%d")}.csv'): # today and Default
-    gen_csv_file  = f'{gen_dir}{today_f[0]}.csv'
+  elif (qp == 'today' or not qp) and os.path.isfile(f'{gen_dir}{d.today_f[0]}.csv'): # today and Default
+    gen_csv_file  = f'{gen_dir}{d.today_f[0]}.csv'
 
-  elif (qp == 'yesterday' or not qp) and os.path.isfile(f'{gen_dir}{yest_f[0]}.csv'):
-    gen_csv_file  = f'{gen_dir}{yest_f[0]}.csv'
+  elif (qp == 'yesterday' or not qp) and os.path.isfile(f'{gen_dir}{d.yest_f[0]}.csv'):
+    gen_csv_file  = f'{gen_dir}{d.yest_f[0]}.csv'
 
   elif os.path.isfile(f'{gen_dir}{use_year}.csv'): # use year.csv for all other cases (if file exists)
     gen_csv_file  = f'{gen_dir}{use_year}.csv'
 
+  return gen_csv_file
+
+
+def query_int(param, default=0):
+  """Get query string param as int or default"""
+  try:
+    return int(get_query(param))
+  except ValueError:
+    return default
+
+
+#### ---- main metrics dashboard process start ---- ####
+
+def run_main(getm=None, config=None):
+  """The index page: getm (query m, limited m), config (settings snapshot of the workspace)"""
+
+  # define metrics & log files
+
+  gen_dir       = f"{get_query('m').rstrip('/')}/gen/"
+  gen_csv_file  = find_gen_csv_file(gen_dir)
+  output_html   = ''
+  dates         = get_dates()
+
+  # shortcuts for quotes & new lines
+
+  q = '"'
+  nl = "\n"
+  lnl = "\\n"
+
+
+  # query string parameters
+
+  qf = url_modify(get_query('filter'))
+  qp = get_query('periods')
+  qs = get_query('sort')
 
   # load & analyze data with pandas
 
   if gen_csv_file:
 
     # Load the csv file as a DataFrame
-    df = pd.read_csv(gen_csv_file) if os.path.isfile(gen_csv_file) else pd.DataFrame({})
-
-    frame_table = html_table_from_dataframe(df, apply_filters=True)
+    # (from the parquet/feather copy if it's up to date, cached until the file changes,
+    #  Date parsed into a sorted index for period slices, filters never modify the cached frame)
+    frame = frames.read_dated_gen_frame(gen_csv_file, copy=False, config=config)
+    df = filter_dataframe(frame)
+
+    # summary & total hours from the rollups (if they're up to date & can answer the filters)
+    rollups = read_rollups(gen_csv_file, config)
+    summary = rollup_summary(rollups, list(frame.columns)) if rollups is not None else None
+
+    # only the first page of rows is sent with the page, the table fetches the others from run_data (virtual scrolling)
+    frame_table = frame_page(
+      df, 0, DATA_PAGE_ROWS, reverse=(qs == 'za'), total_hrs=summary['Hours'].sum() if summary is not None else None
+    )
+    data_url = url_for('module_data', module=request.view_args.get('module', 'index')) + query_link({
+      'filter' : ':current:', 'periods' : ':current:', 'sort' : ':current:'
+    })
 
     scroll_hash = '' # set to: "#activities" to enable scroll hash
 
     output_html = ''.join((
 
-      f'<h3>Metrics {year}</h3>',
+      f'<h3>Metrics {dates.year}</h3>',
 
       '<div class="flex vcenter search-holder">',
          # note: the CSV link below requires/assumes webcsv being installed/used & running on the machine
@@ -365,20 +512,29 @@ def run_main():
       f'<a href="{ query_link({ "filter" : ":current:", "periods" : "week" }) }{ scroll_hash }" class="{ ifxyz(qp,"week","bold") }">This Week</a>, ',
       f'<a href="{ query_link({ "filter" : ":current:", "periods" : "month" }) }{ scroll_hash }" class="{ ifxyz(qp,"month","bold") }">This Month</a>, ',
       f'<a href="{ query_link({ "filter" : ":current:", "periods" : "year" }) }{ scroll_hash }" class="{ ifxyz(qp,"year","bold") }">This Year</a>, ',
-      f'<a href="{ query_link({ "filter" : ":current:", "periods" : last_year }) }{ scroll_hash }" class="{ ifxyz(qp,last_year,"bold") }">{last_year}</a> ',
+      f'<a href="{ query_link({ "filter" : ":current:", "periods" : dates.last_year }) }{ scroll_hash }" class="{ ifxyz(qp,dates.last_year,"bold") }">{dates.last_year}</a> ',
       ' &middot; ',
       ' <span class="dim">Sort:</span> ',
         f'<a href="{ query_link({ "filter" : ":current:", "periods" : ":current:" }) }{ scroll_hash }" class="{ ifxyz(qs,"","bold") }">A-Z</a> ',
         f'<a href="{ query_link({ "filter" : ":current:", "periods" : ":current:", "sort": "za" }) }{ scroll_hash }" class="{ ifxyz(qs,"za","bold") }">Z-A</a> ',
       '</div>',
 
-      f'<div class="table-outer" id="data-scroller">{ frame_table["html"] }</div>',
+      '<div class="table-outer" id="data-scroller">',
+        '<table class="csv-table virtual-table">',
+          '<thead id="data-head"><tr>', *(f'<th>{ html.escape(c) }</th>' for c in frame_table["columns"]), '</tr></thead>',
+          '<tbody id="data-rows"></tbody>',
+        '</table>',
+      '</div>',
 
       '<div class="details">',
         f'Total: <b>{ frame_table["total"] }</b>, <i>{ round(frame_table["total_hrs"], 2) }hrs</i> ',
          '<a href="javascript:;" onclick="downloadCSV();" class="right">Download</a>',
       '</div>',
 
+      '<div class="details summary"><span class="dim">Summary:</span> ' + ', '.join(
+        f'{ html.escape(c1 or "Uncategorized") } <i>{ round(row["Hours"], 2) }hrs</i>' for c1, row in summary.iterrows()
+      ) + '</div>' if summary is not None and len(summary) else '',
+
 
       f'''
 
@@ -404,32 +560,99 @@ def run_main():
         fgo.addEventListener('click', filterGo);
 
 
+        // -- virtual scrolling data table -- //
+        // only the visible rows are rendered, pages of rows are fetched from the data api (run_data) when needed
+
+        var dataScroller = document.getElementById('data-scroller');
+        var dataHead = document.getElementById('data-head');
+        var dataRows = document.getElementById('data-rows');
+
+        var dataUrl = { script_json(data_url) };
+        var dataTotal = { frame_table["total"] };
+        var dataColumns = { len(frame_table["columns"]) };
+        var pageRows = { DATA_PAGE_ROWS };
+        var dataPages = {{ 0: { script_json(frame_table["rows"]) } }};
+        var dataLoading = {{}};
+        var rowHeight = 0;
+        var bufferRows = 20;
+        var renderQueued = false;
+
+        function escapeHTML(str) {{
+          return str.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;').replace(/'/g, '&#x27;');
+        }}
+
+        function fetchPage(page) {{
+          if ( page in dataPages || page in dataLoading ) return;
+          dataLoading[page] = true;
+          fetch(dataUrl + '&offset=' + (page * pageRows) + '&limit=' + pageRows)
+            .then(function(res){{ return res.json(); }})
+            .then(function(data){{ dataPages[page] = data.rows; delete dataLoading[page]; renderRows(); }})
+            .catch(function(){{ delete dataLoading[page]; }});
+        }}
+
+        function spacerRow(height) {{
+          return '<tr class="spacer"><td colspan="' + dataColumns + '" style="height:' + height + 'px"></td></tr>';
+        }}
+
+        function renderRows() {{
+          renderQueued = false;
+          var height = rowHeight || 35;
+          var top = Math.max(0, dataScroller.scrollTop - dataHead.offsetHeight);
+          var first = Math.min(dataTotal, Math.max(0, Math.floor(top / height) - bufferRows));
+          var last = Math.min(dataTotal, Math.ceil((top + dataScroller.clientHeight) / height) + bufferRows);
+
+          var html = spacerRow(first * height);
+          for ( var i = first; i < last; i++ ) {{
+            var page = Math.floor(i / pageRows);
+            var rows = dataPages[page];
+            if ( rows && rows[i % pageRows] ) {{
+              html += '<tr><td>' + rows[i % pageRows].map(escapeHTML).join('</td><td>') + '</td></tr>';
+            }} else {{
+              fetchPage(page);
+              html += '<tr class="loading">' + '<td>&nbsp;</td>'.repeat(dataColumns) + '</tr>';
+            }}
+          }}
+          html += spacerRow((dataTotal - last) * height);
+          dataRows.innerHTML = html;
+
+          // measure the row height once (rows don't wrap), re-render if the estimate was off
+          if ( !rowHeight && last > first ) {{
+            rowHeight = dataRows.rows[1].getBoundingClientRect().height || height;
+            if ( rowHeight !== height ) renderRows();
+          }}
+        }}
+
+        dataScroller.addEventListener('scroll', function(){{
+          if ( !renderQueued ) {{ renderQueued = true; window.requestAnimationFrame(renderRows); }}
+        }});
+
+        renderRows();
+
+
         // -- scroll to bottom of data table on #activities -- //
         
         if ( window.location.hash.includes('activities') ) {{
-          var dataScroller = document.getElementById('data-scroller');
           dataScroller.scrollTop = dataScroller.scrollHeight;
+          renderRows();
         }}
 
 
-        // -- csv downloader for rendered table -- //
+        // -- csv downloader for the data table (fetches all rows) -- //
 
         function downloadCSV() {{
 
-          var table = document.querySelector(".csv-table");
-          var rows = Array.from(table.querySelectorAll("tr"));
-          var csvContent = "";
+          fetch(dataUrl + '&offset=0&limit=all')
+            .then(function(res){{ return res.json(); }})
+            .then(function(data){{ saveCSV(data.columns, data.rows); }});
+        }}
+
+        function saveCSV(columns, rows) {{
 
-          rows.forEach(function(row, rowIndex) {{
-              var columns = Array.from(row.querySelectorAll("td, th"));
+          var csvContent = "";
 
-              columns.forEach(function(column, columnIndex) {{
-                csvContent += '"' + column.innerText.replace(/"/g, '""') + '"';
-                if ( columnIndex < columns.length - 1 ) {{
-                  csvContent += ',';
-                }}
-              }});
-              csvContent += "\\n";
+          [columns].concat(rows).forEach(function(row) {{
+            csvContent += row.map(function(cell) {{ return '"' + cell.replace(/"/g, '""') + '"'; }}).join(',');
+            csvContent += "\\n";
           }});
 
           csvContent += "{',' + macros.hours_to_human(round(frame_table["total_hrs"], 2)) + 
@@ -456,4 +679,24 @@ def run_main():
   return output_html
 
 
+def run_data(getm=None, config=None):
+  """Json data api for the data table (acmedash: /<module>/data): rows ?offset= to ?offset= + ?limit= (or limit=all) of the filtered & sorted table"""
+
+  gen_dir       = f"{get_query('m').rstrip('/')}/gen/"
+  gen_csv_file  = find_gen_csv_file(gen_dir)
+
+  frame = frames.read_dated_gen_frame(gen_csv_file, copy=False, config=config) if gen_csv_file else pd.DataFrame({})
+  df = filter_dataframe(frame)
+
+  rollups = read_rollups(gen_csv_file, config) if gen_csv_file else None
+  summary = rollup_summary(rollups, list(frame.columns)) if rollups is not None else None
+
+  limit = None if get_query('limit') == 'all' else min(max(query_int('limit', DATA_PAGE_ROWS), 0), DATA_MAX_ROWS)
+
+  return frame_page(
+    df, query_int('offset'), limit, reverse=(get_query('sort') == 'za'),
+    total_hrs=summary['Hours'].sum() if summary is not None else None
+  )
+
+
 
@@ -0,0 +1,134 @@
+"""
+Dashboard Frame Cache
+---------------------
+Process-level cache of loaded DataFrames, shared by all dashboard modules.
+
+Frames are cached by path and reused as long as the (mtime, size) of their files don't change,
+so repeated page loads don't read or parse anything until gencsv rewrites a file.
+The least recently used frames are evicted once the cache has more than web.frameCacheEntries
+frames or web.frameCacheBytes of memory.
+
+Usage (in dashboard modules):
+  from acme.web import frames
+  df = frames.read_gen_frame(f'{gen_dir}2024.csv')       # gencsv output (prefers parquet/feather copies)
+  df = frames.read_dated_gen_frame(path)                  # same, with Date parsed into a sorted DatetimeIndex
+  df = frames.read_csv(path, sep=';')                     # any csv (read options are part of the key)
+  df = frames.get(path, loader)                           # custom loader(path) -> DataFrame
+
+Returned frames are copies, unless copy=False is passed (the frame must then be treated as read only).
+The cache budgets are read from config (the settings snapshot of the request's workspace) if it's passed.
+"""
+
+import os
+import threading
+
+from collections import OrderedDict
+
+from acme.core.settings import Settings
+from acme.modules import timesheets_columnar
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES   = 512 * 1024 * 1024
+
+cache = OrderedDict() # { (key...) : (signature, frame, bytes) }
+lock  = threading.Lock()
+
+
+def signature(paths):
+  """(mtime, size) of each path (None if it doesn't exist)."""
+  sig = []
+  for path in paths:
+    try:
+      stat = os.stat(path)
+      sig.append((stat.st_mtime_ns, stat.st_size))
+    except OSError:
+      sig.append(None)
+  return tuple(sig)
+
+
+def get(path, loader, key=(), paths=None, copy=True, config=None):
+  """
+  Returns loader(path) from the cache if the files (paths, default: path) didn't change since it was loaded.
+  key: additional values that identify the frame (e.g. read options).
+  config: settings snapshot for the cache budgets (default: the current settings).
+  """
+  cache_key = (os.path.abspath(path), getattr(loader, '__qualname__', repr(loader)), *key)
+  sig = signature(paths or (path,))
+
+  with lock:
+    cached = cache.get(cache_key)
+    if cached and cached[0] == sig:
+      cache.move_to_end(cache_key)
+      return cached[1].copy() if copy else cached[1]
+
+  frame = loader(path)
+  size  = int(frame.memory_usage(index=True, deep=True).sum())
+
+  with lock:
+    cache[cache_key] = (sig, frame, size)
+    cache.move_to_end(cache_key)
+    evict(config)
+
+  return frame.copy() if copy else frame
+
+
+def evict(config=None):
+  """Removes the least recently used frames until the cache is within its budgets (the newest frame is always kept)."""
+  settings    = config.get if config else Settings.settings
+  max_entries = settings('web.frameCacheEntries') or DEFAULT_MAX_ENTRIES
+  max_bytes   = settings('web.frameCacheBytes') or DEFAULT_MAX_BYTES
+
+  total = sum(size for _, _, size in cache.values())
+  while len(cache) > 1 and (len(cache) > max_entries or total > max_bytes):
+    _, (_, _, size) = cache.popitem(last=False)
+    total -= size
+
+
+def clear():
+  with lock:
+    cache.clear()
+
+
+def stats():
+  """Returns the number of cached frames & their memory usage (bytes)."""
+  with lock:
+    return len(cache), sum(size for _, _, size in cache.values())
+
+
+# -- loaders -- #
+
+def read_csv(path, copy=True, config=None, **kwargs):
+  """pd.read_csv(path, **kwargs) through the cache."""
+  import pandas as pd
+
+  return get(path, lambda p: pd.read_csv(p, **kwargs), key=('read_csv', repr(sorted(kwargs.items()))), copy=copy, config=config)
+
+
+def read_gen_frame(path, copy=True, config=None):
+  """timesheets_columnar.read_gen_frame(path) through the cache (the frame is reloaded if the csv or its copies change)."""
+  paths = (path, *(timesheets_columnar.columnar_file(path, fmt) for fmt in timesheets_columnar.FORMATS))
+  return get(path, timesheets_columnar.read_gen_frame, paths=paths, copy=copy, config=config)
+
+
+def read_dated_gen_frame(path, copy=True, config=None):
+  """read_gen_frame(path) with its Date parsed into a sorted DatetimeIndex (see dated_frame), through the cache."""
+  paths = (path, *(timesheets_columnar.columnar_file(path, fmt) for fmt in timesheets_columnar.FORMATS))
+  return get(path, load_dated_gen_frame, paths=paths, copy=copy, config=config)
+
+
+def load_dated_gen_frame(path):
+  return dated_frame(timesheets_columnar.read_gen_frame(path))
+
+
+def dated_frame(df):
+  """
+  Returns df with its Date column (m/d/Y) parsed into a DatetimeIndex, sorted (stable) by date.
+  Rows without a valid date (e.g. the 'Total Logged Hours' footer) get NaT & are sorted last.
+  """
+  import pandas as pd
+
+  if 'Date' not in df:
+    return df
+
+  dates = pd.DatetimeIndex(pd.to_datetime(df['Date'], format='%m/%d/%Y', errors='coerce'))
+  return df.set_axis(dates, axis=0).sort_index(kind='stable', na_position='last')
@@ -0,0 +1,93 @@
+"""
+Local App Module Registry
+-------------------------
+Process-level registry of the local app modules of workspaces ({workspace}/apps/*.py) used by acmedash.
+
+Each module is loaded once and reloaded only when its source file changes (mtime & size), instead of
+being imported & reloaded on every request. Modules are loaded from their file path, their directory
+is added to sys.path once (for imports between local apps), so sys.path doesn't grow with each request.
+
+Usage:
+  from acme.web import registry
+  module, info = registry.load(f'{workspace}/apps/dashboard_index.py')
+  info.reloaded, info.load_ms  # True & the load time if the module was (re)loaded by this call
+"""
+
+import os
+import sys
+import time
+import threading
+import importlib.util
+
+from types import SimpleNamespace
+
+modules = {} # { path : (signature, module, load_ms) }
+lock    = threading.RLock()
+
+
+def signature(path):
+  stat = os.stat(path)
+  return (stat.st_mtime_ns, stat.st_size)
+
+
+def add_path(path):
+  """Adds path to sys.path (once)."""
+  if path not in sys.path:
+    sys.path.append(path)
+
+
+def load(path, name=None):
+  """
+  Returns (module, info) for the module at path (raises FileNotFoundError if it doesn't exist).
+  The module is (re)loaded only if it wasn't loaded yet or its file changed since it was loaded.
+  name: module name (default: file name), a package if path is an __init__.py file.
+  info: reloaded (bool), load_ms (time of the last load)
+  """
+  path = os.path.abspath(path)
+  sig  = signature(path)
+
+  with lock:
+    cached = modules.get(path)
+    if cached and cached[0] == sig:
+      return cached[1], SimpleNamespace(reloaded=False, load_ms=cached[2])
+
+    start   = time.perf_counter()
+    module  = exec_module(path, name)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    modules[path] = (sig, module, load_ms)
+
+  return module, SimpleNamespace(reloaded=True, load_ms=load_ms)
+
+
+def exec_module(path, name=None):
+  """Loads a module from its source file (compiled from source, so edits within the same second are never missed)."""
+  directory, file_name = os.path.split(path)
+  package = file_name == '__init__.py'
+  name = name or (os.path.basename(directory) if package else os.path.splitext(file_name)[0])
+
+  add_path(os.path.dirname(directory) if package else directory)
+
+  spec = importlib.util.spec_from_file_location(name, path, submodule_search_locations=[directory] if package else None)
+  module = importlib.util.module_from_spec(spec)
+
+  with open(path, 'rb') as f:
+    code = compile(f.read(), path, 'exec')
+
+  previous = sys.modules.get(name)
+  sys.modules[name] = module
+  try:
+    exec(code, module.__dict__)
+  except BaseException:
+    if previous is not None:
+      sys.modules[name] = previous
+    else:
+      sys.modules.pop(name, None)
+    raise
+
+  return module
+
+
+def clear():
+  with lock:
+    modules.clear()
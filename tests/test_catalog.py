@@ -0,0 +1,65 @@
+"""
+Tests: Log Catalog
+------------------
+The catalog must list the same files as a walk of the logs directory after files are added, renamed & removed.
+"""
+
+import os
+
+from datetime import date
+
+from acme.core import catalog
+
+
+def write_log(logs_dir, path, data='-1h meeting\n-30m email\n'):
+  path = os.path.join(logs_dir, path)
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'w') as f:
+    f.write(data)
+
+
+def walk_files(logs_dir):
+  """Files of the logs directory as listed by os.walk (dot files excluded)."""
+  return sorted(
+    os.path.relpath(os.path.join(root, name), logs_dir).replace(os.sep, '/')
+      for root, _, names in os.walk(logs_dir) for name in names if not name.startswith('.')
+  )
+
+
+def test_refresh_follows_changes(tmp_path):
+  logs_dir = str(tmp_path / 'logs')
+  for path in ('2024/01/01.txt', '2024/01/01abc.txt', '2024/01/notes.md', '2024/2024-02-01.txt', '2023/12/31.txt'):
+    write_log(logs_dir, path)
+
+  log_catalog = catalog.Catalog(logs_dir, str(tmp_path / 'gen')).refresh()
+  assert [f['path'] for f in log_catalog.files()] == walk_files(logs_dir)
+  log_catalog.close()
+
+  # reopened from gen/.cache: a new day, a renamed & a removed log
+  write_log(logs_dir, '2024/01/02.txt', '-1h meeting\n')
+  os.rename(os.path.join(logs_dir, '2024/01/01abc.txt'), os.path.join(logs_dir, '2024/01/01xyz.txt'))
+  os.remove(os.path.join(logs_dir, '2023/12/31.txt'))
+
+  log_catalog = catalog.Catalog(logs_dir, str(tmp_path / 'gen')).refresh()
+  files = { f['path'] : f for f in log_catalog.files() }
+  assert sorted(files) == walk_files(logs_dir)
+  assert not files['2024/01/notes.md']['valid']
+  assert files['2024/01/02.txt']['entries'] == 1
+
+  days = log_catalog.find_logs(date(2024, 1, 1), date(2024, 1, 31))
+  assert { day : [f.path for f in day_files] for day, day_files in days.items() } == {
+    date(2024, 1, 1): ['2024/01/01.txt', '2024/01/01xyz.txt'],
+    date(2024, 1, 2): ['2024/01/02.txt'],
+  }
+  log_catalog.close()
+
+
+def test_symlinked_directories_are_not_followed(tmp_path):
+  logs_dir = str(tmp_path / 'logs')
+  write_log(logs_dir, '2024/01/01.txt')
+  # a loop back to the logs directory
+  os.symlink(logs_dir, os.path.join(logs_dir, '2024', '02'))
+
+  log_catalog = catalog.Catalog(logs_dir).refresh()
+  assert [f['path'] for f in log_catalog.files()] == ['2024/01/01.txt']
+  log_catalog.close()
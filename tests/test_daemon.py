@@ -0,0 +1,52 @@
+"""
+Tests: Acme Daemon
+------------------
+The daemon runs forwarded commands in-process & stops itself (stale) when the acme source or config files change.
+"""
+
+import os
+
+from types import SimpleNamespace
+
+import pytest
+
+from __init__ import __version__
+from acme.cli import daemon
+from acme.core.settings import Settings
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+  os.makedirs(tmp_path / 'logs' / '2024' / '01')
+  os.makedirs(tmp_path / 'gen')
+  (tmp_path / 'logs' / '2024' / '01' / '01.txt').write_text('-1h meeting (Work, Meeting)\n')
+
+  monkeypatch.setattr(daemon, 'serving', True)
+  monkeypatch.setattr(daemon, 'state', SimpleNamespace(started=0, requests=0, stopping=False, workspace_dir=f'{tmp_path}/', sources={}))
+  monkeypatch.setattr(Settings, 'merged_settings', Settings.merged_settings) # restored after the commands
+  monkeypatch.setattr(Settings, 'current', Settings.snapshot(str(tmp_path)))
+  return tmp_path
+
+
+def run_request(workspace, *argv):
+  return daemon.respond({ 'action' : 'run', 'version' : __version__, 'argv' : [f'{workspace}/', *argv], 'cwd' : str(workspace) })
+
+
+def test_run_command(workspace):
+  response = run_request(workspace, '2024-01-01')
+  assert response['code'] == 0
+  assert 'Timesheet logs for 2024-01-01' in response['stdout']
+  assert daemon.state.requests == 1
+
+
+def test_config_change_stops_the_daemon(workspace):
+  daemon.state.sources = daemon.source_signatures()
+  assert f'{workspace}/workspace_config.yaml' in daemon.state.sources
+  assert not daemon.sources_changed()
+
+  # the workspace config is created (e.g. with another glossaryFile)
+  (workspace / 'workspace_config.yaml').write_text('web:\n  devPort: "5001"\n')
+  assert daemon.sources_changed()
+
+  assert run_request(workspace, '2024-01-01') == { 'stale' : True }
+  assert daemon.state.stopping
@@ -0,0 +1,157 @@
+"""
+Tests: Dashboard
+----------------
+The index module's json data api (/index/data) must return the rows of the gen csv as they read back from it,
+in pages of ?offset= & ?limit= rows, filtered by ?filter= & ?periods=.
+"""
+
+import io
+import os
+import csv
+import shutil
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('pandas')
+
+from acme.core import process
+from acme.web import frames
+from acme.web import registry
+from acme.core.settings import Settings
+
+acme_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKSPACE_CONFIG = """
+modules:
+  timesheets_categorize:
+    glossaryFile: 'tests.workspace.apps.example_glossary'
+web:
+  runLocalApps:
+    - [index, dashboard_index.py, index]
+"""
+
+LOGS = {
+  '2024/01/01.txt': '-1h meeting (Work, Meeting)\n-30m scales (Music, Practice, Piano)\n',
+  '2024/01/02.txt': '-2h report, "draft" (Work, Reports)\n-15m email\n',
+  '2024/02/10.txt': '-45m etudes (Music, Practice, Piano)\n-1:30h reading (Study, Books)\n',
+  '2024/03/05.txt': '-3h refactoring (Projects, Acme)\n',
+}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+  """A workspace with a gen/2024.csv (gencsv 2024 cat) & the index app."""
+  for path, data in LOGS.items():
+    os.makedirs(os.path.dirname(tmp_path / 'logs' / path), exist_ok=True)
+    (tmp_path / 'logs' / path).write_text(data)
+  (tmp_path / 'workspace_config.yaml').write_text(WORKSPACE_CONFIG)
+  os.makedirs(tmp_path / 'gen')
+  os.makedirs(tmp_path / 'apps')
+  shutil.copy(f'{acme_dir}/acme/web/apps/dashboard_index.py', tmp_path / 'apps')
+
+  # dashboard modules import macros from acme/core
+  monkeypatch.syspath_prepend(f'{acme_dir}/acme/core')
+
+  meta = SimpleNamespace(logs_dir=f'{tmp_path}/logs/', gen_dir=f'{tmp_path}/gen/')
+  process.handle_timesheets(['gencsv', '2024', 'cat'], 'gencsv', meta)
+  return tmp_path
+
+
+@pytest.fixture
+def client():
+  from acme.web import acmedash
+  return acmedash.app.test_client()
+
+
+def csv_rows(file):
+  """Header & rows of a csv as they read back from it (the table cells)."""
+  rows = list(csv.reader(io.StringIO(open(file).read()), skipinitialspace=True))
+  return rows[0], rows[1:]
+
+
+def get_data(client, workspace, **query):
+  response = client.get('/index/data', query_string={ 'm' : str(workspace), 'periods' : '2024', **query })
+  assert response.status_code == 200
+  return response.get_json()
+
+
+def test_data_api_returns_csv_cells(client, workspace):
+  columns, rows = csv_rows(workspace / 'gen' / '2024.csv')
+  data = get_data(client, workspace, limit='all')
+  assert data['columns'] == columns
+  assert data['rows'] == rows
+  assert data['total'] == len(rows)
+  assert data['total_hrs'] == 9.0
+
+
+def test_pages_cover_all_rows(client, workspace):
+  _, rows = csv_rows(workspace / 'gen' / '2024.csv')
+  pages = [get_data(client, workspace, offset=offset, limit=3) for offset in range(0, len(rows) + 3, 3)]
+  assert [row for page in pages for row in page['rows']] == rows
+  assert pages[-1]['rows'] == [] and pages[-1]['offset'] == len(rows)
+
+  # sort: za pages through the rows in reverse
+  assert get_data(client, workspace, sort='za', offset=0, limit=2)['rows'] == rows[::-1][:2]
+
+
+def test_page_shows_first_rows(client, workspace):
+  _, rows = csv_rows(workspace / 'gen' / '2024.csv')
+  response = client.get('/', query_string={ 'm' : str(workspace), 'periods' : '2024' })
+  assert response.status_code == 200
+  assert 'var dataTotal = %d;' % len(rows) in response.get_data(as_text=True)
+
+
+def test_data_api_errors(client, workspace):
+  assert client.get('/index/data', query_string={ 'm' : f'{workspace}/nope' }).status_code == 400
+  assert client.get('/nope/data', query_string={ 'm' : str(workspace) }).status_code == 404
+
+
+@pytest.mark.parametrize('qfilter, match', [
+  ('C1:Music',                  lambda r: 'Music' in r['C1']),
+  ('C1:"Work"',                 lambda r: r['C1'] == 'Work'),
+  ('C1:"Wor"',                  lambda r: False),
+  ('C1:o,C2:Re',                lambda r: 'o' in r['C1'] and 'Re' in r['C2']),
+  ('report',                    lambda r: 'report' in r['Description']),
+  ('col3:Music',                lambda r: 'Music' in r['C1']),
+  ('Hours:1.5',                 lambda r: '1.5' in r['Hours']),
+  ('C9:x',                      lambda r: False),
+])
+def test_filter(client, workspace, qfilter, match):
+  columns, rows = csv_rows(workspace / 'gen' / '2024.csv')
+  expected = [row for row in rows if match(dict(zip(columns, row))) and row[columns.index('Date')]]
+  data = get_data(client, workspace, filter=qfilter, limit='all')
+  assert data['rows'] == expected
+
+
+@pytest.mark.parametrize('today, period, dates', [
+  (date(2024, 1, 2),  'today',      ['01/02/2024']),
+  (date(2024, 1, 2),  'yesterday',  ['01/01/2024']),
+  # weeks start on sunday (2023-12-31)
+  (date(2024, 1, 2),  'week',       ['01/01/2024', '01/02/2024']),
+  (date(2024, 2, 29), 'month',      ['02/10/2024']),
+  (date(2024, 3, 4),  'year',       ['01/01/2024', '01/02/2024', '02/10/2024']),
+])
+def test_periods(client, workspace, monkeypatch, today, period, dates):
+  module, _ = registry.load(f'{workspace}/apps/dashboard_index.py')
+  monkeypatch.setattr(module, 'get_dates', lambda: module.dates_for(today))
+
+  columns, rows = csv_rows(workspace / 'gen' / '2024.csv')
+  expected = [row for row in rows if row[columns.index('Date')] in dates]
+  data = get_data(client, workspace, periods=period, limit='all')
+  assert data['rows'] == expected
+  assert data['total_hrs'] == round(sum(float(row[columns.index('Hours')]) for row in expected), 2)
+
+
+def test_workspace_settings_are_passed_to_the_module(client, workspace):
+  # the frame cache budget of the workspace applies, the current settings of the process don't change
+  with open(workspace / 'workspace_config.yaml', 'a') as f:
+    f.write('  frameCacheEntries: 1\n')
+
+  current = Settings.current
+  get_data(client, workspace, limit=1)
+  assert frames.stats()[0] == 1
+  assert Settings.current is current
@@ -0,0 +1,38 @@
+"""
+Tests: Log File Discovery
+-------------------------
+Log file names are classified by discover.classify & files of the same day are ordered by discover.sort_key.
+"""
+
+from datetime import date
+
+import pytest
+
+from acme.core import discover
+
+
+@pytest.mark.parametrize('path, expected', [
+  ('2024/01/01.txt',                ('2024/01/01.txt', date(2024, 1, 1), '', False)),
+  ('2024/01/01abc.txt',             ('2024/01/01abc.txt', date(2024, 1, 1), 'abc', False)),
+  ('2024/01/2024-01-01abc.txt',     ('2024/01/2024-01-01abc.txt', date(2024, 1, 1), 'abc', True)),
+  ('2024/2024-01-01.txt',           ('2024/2024-01-01.txt', date(2024, 1, 1), '', True)),
+  ('2024/02/29 notes.txt',          ('2024/02/29 notes.txt', date(2024, 2, 29), ' notes', False)),
+  # invalid: impossible dates, custom text starting with a digit, mismatched directories, other extensions
+  ('2024/02/31.txt',                None),
+  ('2023/02/29.txt',                None),
+  ('2024/01/011.txt',               None),
+  ('2024/02/2024-01-01.txt',        None),
+  ('2023/2024-01-01.txt',           None),
+  ('2024/01/01.md',                 None),
+  ('2024/01/sub/01.txt',            None),
+])
+def test_classify(path, expected):
+  assert discover.classify(path) == (discover.LogFile(*expected) if expected else None)
+
+
+def test_same_day_files_start_with_the_day_file():
+  paths = ['2024/01/2024-01-01.txt', '2024/01/01b.txt', '2024/01/01.txt', '2024/01/01a.txt', '2023/12/31z.txt']
+  log_files = sorted(map(discover.classify, paths), key=discover.sort_key)
+  assert [f.path for f in log_files] == [
+    '2023/12/31z.txt', '2024/01/01.txt', '2024/01/01a.txt', '2024/01/01b.txt', '2024/01/2024-01-01.txt',
+  ]
@@ -0,0 +1,48 @@
+"""
+Tests: Macros
+-------------
+Date input bounds & gencsv intervals ({from},{to},{separator}).
+"""
+
+from datetime import date
+
+import pytest
+
+from acme.core import macros
+
+
+@pytest.mark.parametrize('inp, bounds', [
+  ('2024-03-05',  (date(2024, 3, 5), date(2024, 3, 5))),
+  ('2024-02',     (date(2024, 2, 1), date(2024, 2, 29))),
+  ('2023/2',      (date(2023, 2, 1), date(2023, 2, 28))),
+  ('2024',        (date(2024, 1, 1), date(2024, 12, 31))),
+])
+def test_date_input_bounds(inp, bounds):
+  assert macros.date_input_bounds(macros.parse_date_input(inp)) == bounds
+
+
+@pytest.mark.parametrize('inp, date_from, date_to, separator', [
+  ('2024-01-15,2024-01-30',     date(2024, 1, 15), date(2024, 1, 30), '_'),
+  ('2024-01-15,01-30,-to-',     date(2024, 1, 15), date(2024, 1, 30), '-to-'),
+  # months & years include all of their days
+  ('2024-01,2024-02',           date(2024, 1, 1), date(2024, 2, 29), '_'),
+  ('2023,2024-01-10',           date(2023, 1, 1), date(2024, 1, 10), '_'),
+  # a {to} without a year that would end before {from} is in the next year
+  ('2024-12-20,01-05',          date(2024, 12, 20), date(2025, 1, 5), '_'),
+  # invalid characters are removed from the separator
+  ('2024-01-01,2024-01-07,a/b', date(2024, 1, 1), date(2024, 1, 7), 'ab'),
+])
+def test_interval(inp, date_from, date_to, separator):
+  interval = macros.check_is_valid_interval(inp)
+  assert (interval.date_from, interval.date_to, interval.interval_seperator) == (date_from, date_to, separator)
+
+
+def test_not_an_interval():
+  assert macros.check_is_valid_interval('2024-01-15') is False
+
+
+@pytest.mark.parametrize('inp', ['2024-01-30,2024-01-15', '2024-02-31,2024-03-01', 'abc,2024-01-01', '1,2,3,4'])
+def test_invalid_interval_exits(inp, capsys):
+  with pytest.raises(SystemExit):
+    macros.check_is_valid_interval(inp)
+  assert 'interval' in capsys.readouterr().out
@@ -0,0 +1,61 @@
+"""
+Tests: Timesheets
+-----------------
+The single-pass tokenizer (timesheets.iter_entries) must find the same entries as the line by line parser it replaced.
+"""
+
+import re
+
+import pytest
+
+from acme.modules import timesheets
+
+LOG = (
+  '# notes for the day\n'
+  '\n'
+  '. 3.21s wrote code w/ tests\n'
+  '  some freeform text\n'
+  '-2.5h 15m read "the book" chapter 3 ($exm)\n'
+  '-20m 10m 5m https://example.com check\n'
+  '-30m multi line entry..\n'
+  'continued here ($examstud, extra)\n'
+  '.30m worked on inventory report (Music, Practice, Piano)\n'
+  '- 45m,15m read "the book" chapter 3\n'
+  '-30m practice piano, scales; arpeggios\n'
+  '-1h; 2h reviewed notes ($inv)\n'
+  '- not an entry\n'
+  'x -1h not at the start of a line\n'
+)
+
+
+def line_entries(text):
+  """Entries of the line by line parser (before the single-pass tokenizer)."""
+  pattern = r'^[-\.](\s*(?:[\d\:\.]+(?:m|h|s)[\s\,]*[\s\;]*)+)(.*)$'
+  entries = []
+  for line in text.replace('..\n', '.. ').splitlines():
+    match = re.search(pattern, line)
+    if match:
+      entries.append((match.group(1), match.group(2)))
+  return entries
+
+
+@pytest.mark.parametrize('text', [
+  LOG,
+  '',
+  '-1h',
+  '-1h no line break at the end',
+  # continuations: joined with the next line, also when it looks like an entry
+  '-1h a..\n-30m b\n',
+  '.15m c..\nd..\ne\n-5m f',
+  '-1h ends with dots..',
+  '-1h trailing dots..\n\n-1h after an empty line\n',
+  # other line breaks (str.splitlines) end entries too
+  '-1h a\x0b-2h b\x0c-3h c -4h d\x85-5h e',
+])
+def test_tokenizer_matches_line_parser(text):
+  assert list(timesheets.iter_entries(text)) == line_entries(text)
+
+
+def test_continuation_joins_lines():
+  entries = list(timesheets.iter_entries('-30m multi line entry..\ncontinued here ($zoom)\n-1h next\n'))
+  assert entries == [('30m ', 'multi line entry.. continued here ($zoom)'), ('1h ', 'next')]
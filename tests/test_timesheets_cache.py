@@ -0,0 +1,175 @@
+"""
+Tests: Parse Cache
+------------------
+Logs parsed from their resume offset (timesheets_cache.parse_log_file with previous) must have the same entries
+as a full parse. ParseCache must reject cached logs whose content or options changed & keep the records of each
+options key.
+"""
+
+import os
+
+import pytest
+
+from datetime import date
+
+from acme.modules import timesheets
+from acme.modules import timesheets_cache
+from acme.modules import timesheets_categorize
+
+YMD = '2024-03-05'
+
+LOG = (
+  '# notes for the day\n'
+  '\n'
+  '. 3.21s wrote code w/ tests\n'
+  '  some freeform text\n'
+  '-2.5h 15m read "the book" chapter 3 ($exm)\n'
+  '-30m multi line entry..\n'
+  'continued here ($examstud, extra)\n'
+  '.30m worked on inventory report (Music, Practice, Piano)\n'
+)
+
+
+def customize():
+  return timesheets.Customize(apply_to_each_entry=('categorize', 'capitalize'), add_header=False, add_footer=False)
+
+
+def write_log(path, data):
+  with open(path, 'wb') as f:
+    f.write(data.encode('utf-8'))
+
+
+def reparse(path, before, after):
+  """Returns (entries parsed from the resume offset of before, entries of a full parse) of the log after it changed."""
+  write_log(path, before)
+  size, mtime_ns, digest, records, resume = timesheets_cache.parse_log_file(str(path), YMD, customize())
+
+  write_log(path, after)
+  resumed = timesheets_cache.parse_log_file(str(path), YMD, customize(), previous=(resume, records))
+  full    = timesheets_cache.parse_log_file(str(path), YMD, customize())
+  return resumed, full
+
+
+@pytest.mark.parametrize('before, after', [
+  # appended lines
+  (LOG, LOG + '-1h meeting ($zoom)\n'),
+  (LOG, LOG + '-1h meeting ($zoom)\n  notes\n-15m email\n'),
+  # an unfinished last line (no line break) that's completed later
+  (LOG + '-1h meet', LOG + '-1h meeting ($zoom)\n'),
+  # appended to the text of the last entry
+  (LOG + '  notes', LOG + '  notes & more notes\n'),
+  # .. continuations across the previous end of the log
+  (LOG + '-1h meeting..', LOG + '-1h meeting..\nabout the budget ($zoom)\n'),
+  (LOG + '-1h meeting..\n', LOG + '-1h meeting..\nabout the budget ($zoom)\n'),
+  (LOG + '-1h meeting..\nabout', LOG + '-1h meeting..\nabout the budget..\nand the plan ($zoom)\n'),
+  # crlf line breaks, also split between the two parses
+  (LOG.replace('\n', '\r\n'), (LOG + '-1h meeting ($zoom)\n').replace('\n', '\r\n')),
+  (LOG.replace('\n', '\r\n') + '-1h meeting..\r', LOG.replace('\n', '\r\n') + '-1h meeting..\r\nabout the budget\r\n'),
+  (LOG.replace('\n', '\r\n') + '-1h meeting\r', LOG.replace('\n', '\r\n') + '-1h meeting\r\n-15m email\r\n'),
+  # edits before the resume offset (the whole log is parsed again)
+  (LOG, LOG.replace('3.21s', '4.21s') + '-1h meeting ($zoom)\n'),
+  (LOG, LOG.replace('multi line entry..\n', 'multi line entry\n')),
+  # truncated
+  (LOG + '-1h meeting ($zoom)\n', LOG),
+  (LOG, ''),
+])
+def test_resumed_parse_matches_full_parse(tmp_path, before, after):
+  resumed, full = reparse(tmp_path / 'log.txt', before, after)
+  assert resumed[2:] == full[2:] # content hash, entries & resume
+  assert resumed[3] == timesheets_cache.parse_bytes(after.encode('utf-8'), YMD, customize())
+
+
+def test_resume_offset_skips_unfinished_lines(tmp_path):
+  path = tmp_path / 'log.txt'
+  write_log(path, LOG + '-1h meeting..\n')
+  offset = timesheets_cache.parse_log_file(str(path), YMD, customize())[4][0]
+
+  # the .. continuation could still continue: it's parsed again with the next lines
+  assert offset == len(LOG.encode('utf-8'))
+
+
+def test_cache_rejects_same_size_edit(tmp_path):
+  gen_dir = str(tmp_path / 'gen')
+  path = str(tmp_path / 'log.txt')
+  write_log(path, LOG)
+
+  cache = timesheets_cache.ParseCache(gen_dir)
+  entries = cache.parse(path, YMD, customize())
+  assert cache.get(cache.key(path, YMD, customize())) is not None
+
+  # same size, different content & mtime
+  stat = os.stat(path)
+  write_log(path, LOG.replace('3.21s', '4.21s'))
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+  assert os.stat(path).st_size == stat.st_size
+  assert cache.get(cache.key(path, YMD, customize())) is None
+
+  edited = cache.parse(path, YMD, customize())
+  assert [e.hours for e in edited] != [e.hours for e in entries]
+
+
+def test_cache_reuses_touched_log(tmp_path):
+  gen_dir = str(tmp_path / 'gen')
+  path = str(tmp_path / 'log.txt')
+  write_log(path, LOG)
+
+  cache = timesheets_cache.ParseCache(gen_dir)
+  entries = cache.parse(path, YMD, customize())
+  cache.save()
+
+  # touched (mtime changed) but not modified
+  stat = os.stat(path)
+  os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+  cache = timesheets_cache.ParseCache(gen_dir)
+  cached = cache.get(cache.key(path, YMD, customize()))
+  assert cached is not None
+  assert [repr(e) for e in cached] == [repr(e) for e in entries]
+
+
+def test_cache_rejects_other_options(tmp_path):
+  path = str(tmp_path / 'log.txt')
+  write_log(path, LOG)
+
+  cache = timesheets_cache.ParseCache(str(tmp_path / 'gen'))
+  cache.parse(path, YMD, customize())
+  assert cache.get(cache.key(path, YMD, timesheets.Customize(apply_to_each_entry=('capitalize',)))) is None
+  assert cache.get(cache.key(path, '2024-03-06', customize())) is None
+
+
+def test_cache_keeps_each_options_key(tmp_path):
+  path = str(tmp_path / 'log.txt')
+  write_log(path, LOG)
+  plain = timesheets.Customize()
+
+  # e.g. a single day csv (plain) & the sqlite store of the same day (categorized) don't evict each other
+  cache = timesheets_cache.ParseCache(str(tmp_path / 'gen'))
+  cache.parse(path, YMD, plain)
+  cache.parse(path, YMD, customize())
+  cache.parse(path, YMD, plain)
+  cache.parse(path, YMD, customize())
+  assert (cache.misses, cache.hits) == (2, 2)
+
+
+def test_glossary_loaded_once_per_parse(tmp_path, monkeypatch):
+  loads = []
+  load_glossary = timesheets_categorize.load_glossary
+  monkeypatch.setattr(timesheets_categorize, 'load_glossary', lambda *args: loads.append(args) or load_glossary(*args))
+
+  entries = timesheets.parse_entries(LOG, YMD, customize())
+  assert len(entries) == 4
+  assert len(loads) == 1
+
+
+def test_prune_drops_missing_logs_of_the_span(tmp_path):
+  paths = { ymd : str(tmp_path / f'{ymd}.txt') for ymd in ('2024-03-04', '2024-03-05', '2024-04-01') }
+  for path in paths.values():
+    write_log(path, LOG)
+
+  cache = timesheets_cache.ParseCache(str(tmp_path / 'gen'))
+  cache.parse_days([(path, ymd) for ymd, path in paths.items()], customize())
+
+  # 2024-03-04 was deleted: it's dropped, the log outside of the span is kept
+  days = [(paths['2024-03-05'], '2024-03-05')]
+  cache.parse_days(days, customize(), span=(date(2024, 3, 1), date(2024, 3, 31)))
+  assert { filename for filename, _ in cache.days } == { paths['2024-03-05'], paths['2024-04-01'] }
@@ -0,0 +1,48 @@
+"""
+Tests: Timesheets Categorize
+----------------------------
+The compiled $shortcut glossary and its mtime checked cache.
+"""
+
+import os
+
+from acme.modules import timesheets_categorize as categorize
+from acme.modules.timesheets_categorize import Glossary
+
+
+def test_longest_shortcut_first():
+  glossary = Glossary([('$ex', 'exercise'), ('$exm', 'exam'), (('$zm', '$zoom'), 'work, meeting, zoom')])
+  assert glossary.substitute('$exm, $ex') == 'exam, exercise'
+  assert glossary.substitute('$zoom; $zm') == 'work, meeting, zoom; work, meeting, zoom'
+  assert Glossary([]).substitute('$ex') == '$ex'
+
+
+def test_collisions_are_reported():
+  glossary = Glossary([('$a', 'one'), ('$a', 'two'), ('$b', 'has $a')])
+  assert glossary.subs == {'$a': 'two', '$b': 'has $a'}
+  assert len(glossary.collisions) == 2
+
+
+def test_replace_shortcuts_keeps_raw_parenblock():
+  glossary = Glossary([('$fit24', 'fitness, 2024')])
+  assert categorize.replace_shortcuts('ran 5k ($fit24)', glossary) == 'ran 5k ($fit24)(fitness, 2024)'
+  assert categorize.replace_shortcuts('ran ($fit24) ', glossary) == 'ran ($fit24) '
+
+
+def test_glossary_recompiled_when_modified(tmp_path, monkeypatch):
+  module = tmp_path / 'glossary_under_test.py'
+  module.write_text("shortcut_glossary = [('$a', 'one')]\n")
+  monkeypatch.syspath_prepend(str(tmp_path))
+  monkeypatch.setattr(categorize, 'glossary_cache', {})
+
+  glossary = categorize.load_glossary('glossary_under_test')
+  assert categorize.load_glossary('glossary_under_test') is glossary
+
+  module.write_text("shortcut_glossary = [('$a', 'two')]\n")
+  stat = module.stat()
+  os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+  reloaded = categorize.load_glossary('glossary_under_test')
+  assert reloaded is not glossary
+  assert reloaded.substitute('$a') == 'two'
+  assert reloaded.version != glossary.version
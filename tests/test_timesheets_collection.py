@@ -0,0 +1,114 @@
+"""
+Tests: Collection Files
+-----------------------
+Collection csv files patched by day (timesheets_collection.write_collection) must be byte-identical to a full rebuild.
+"""
+
+import os
+
+import pytest
+
+from acme.core import utils
+from acme.modules import timesheets
+from acme.modules import timesheets_collection
+
+LOGS = {
+  '2024-03-01' : '-1h worked on inventory report ($inv)\n-30m read "the book" chapter 3\n',
+  '2024-03-02' : '. 20m 10m 5m reviewed notes ($examstud, extra)\n-30m multi line entry..\ncontinued here ($zoom)\n',
+  '2024-03-04' : '-2.5h 15m practice (Music, Practice)\n  some freeform text\n-45m,15m email\n',
+  '2024-03-05' : '-1h meeting ($zoom)\n',
+}
+
+
+def final_customize():
+  """Customize of 'acme gencsv {collection} cat'."""
+  return timesheets.Customize(apply_to_each_entry=('categorize', 'capitalize'), apply_to_final_csv=('add_columns',))
+
+
+def collection_days(logs):
+  """Parses logs ({ Y-m-d : text }) into the days of write_collection (the day key is the text of the log)."""
+  customize = timesheets.Customize(apply_to_each_entry=('categorize', 'capitalize'), add_header=False, add_footer=False)
+  return [
+    (timesheets.date_ordinal(ymd), text, timesheets.parse_entries(text, ymd, customize=customize))
+      for ymd, text in sorted(logs.items())
+  ]
+
+
+def write(gen_dir, logs):
+  """Writes the collection of logs in gen_dir. Returns (csv bytes, formatted days, patched)."""
+  os.makedirs(gen_dir, exist_ok=True)
+  genfile = os.path.join(gen_dir, '2024-03.csv')
+  formatted, patched = timesheets_collection.write_collection(gen_dir, genfile, collection_days(logs), final_customize(), 'options')
+  with open(genfile, 'rb') as f:
+    return f.read(), formatted, patched
+
+
+def rebuilt(gen_dir, logs):
+  """The csv of logs written in full: by write_collection without an index & by the csv writer of gencsv."""
+  full, _, patched = write(gen_dir, logs)
+  assert not patched
+
+  genfile = os.path.join(gen_dir, 'rows.csv')
+  entries = [e for _, _, day_entries in collection_days(logs) for e in day_entries]
+  utils.write_csv(genfile, timesheets.iter_csv_rows(entries, customize=final_customize()))
+  with open(genfile, 'rb') as f:
+    assert f.read() == full
+
+  return full
+
+
+@pytest.mark.parametrize('change, formatted', [
+  ('append',      1),
+  ('earlier',     1),
+  ('deleted',     0),
+  ('new_day',     1),
+])
+def test_patched_collection_matches_full_rebuild(tmp_path, change, formatted):
+  logs = dict(LOGS)
+  write(str(tmp_path / 'gen'), logs)
+
+  if change == 'append':
+    logs['2024-03-05'] += '-15m stand-up ($zoom)\n'
+  elif change == 'earlier':
+    logs['2024-03-01'] = logs['2024-03-01'].replace('inventory report', 'inventory')
+  elif change == 'deleted':
+    del logs['2024-03-04']
+  elif change == 'new_day':
+    logs['2024-03-03'] = '-1h practice (Music, Practice)\n'
+
+  patched, count, was_patched = write(str(tmp_path / 'gen'), logs)
+
+  assert was_patched
+  assert count == formatted
+  assert patched == rebuilt(str(tmp_path / 'full'), logs)
+
+
+def test_category_width_change_rewrites_collection(tmp_path):
+  logs = dict(LOGS)
+  write(str(tmp_path / 'gen'), logs)
+
+  # more category columns than any other day: every row changes
+  logs['2024-03-05'] = '-1h practice (Music, Practice, Piano, Scales, Major, Warm-up)\n'
+  wider, count, was_patched = write(str(tmp_path / 'gen'), logs)
+
+  assert not was_patched
+  assert count == len(logs)
+  assert wider == rebuilt(str(tmp_path / 'full'), logs)
+
+  # and back to fewer columns
+  logs['2024-03-05'] = LOGS['2024-03-05']
+  narrower, _, _ = write(str(tmp_path / 'gen'), logs)
+  assert narrower == rebuilt(str(tmp_path / 'full2'), logs)
+
+
+def test_modified_collection_file_is_rewritten(tmp_path):
+  gen_dir = str(tmp_path / 'gen')
+  write(gen_dir, LOGS)
+
+  with open(os.path.join(gen_dir, '2024-03.csv'), 'a') as f:
+    f.write('edited by hand\n')
+
+  data, count, was_patched = write(gen_dir, LOGS)
+  assert not was_patched
+  assert count == len(LOGS)
+  assert data == rebuilt(str(tmp_path / 'full'), LOGS)
@@ -0,0 +1,73 @@
+"""
+Tests: Entry Store
+------------------
+gen/acme.sqlite must have the entries of all log files of each stored day & acme sql queries must be read only.
+"""
+
+import os
+import sqlite3
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from acme.core import process
+from acme.modules import timesheets
+from acme.modules import timesheets_store
+
+
+def write_log(logs_dir, path, data):
+  path = os.path.join(logs_dir, path)
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'w') as f:
+    f.write(data)
+
+
+def workspace(tmp_path):
+  meta = SimpleNamespace(logs_dir=f'{tmp_path}/logs/', gen_dir=f'{tmp_path}/gen/')
+  os.makedirs(meta.gen_dir)
+  write_log(meta.logs_dir, '2024/01/01.txt', '-1h meeting (Work, Meeting)\n')
+  write_log(meta.logs_dir, '2024/01/01abc.txt', '-30m piano (Music, Piano)\n')
+  write_log(meta.logs_dir, '2024/01/02.txt', '-2h report (Work)\n')
+  return meta
+
+
+def stored_entries(meta):
+  return timesheets_store.query(meta.gen_dir, 'SELECT date, hours, C1, C2 FROM entries ORDER BY date, position')[1]
+
+
+def test_update_skips_unchanged_days(tmp_path):
+  entries = timesheets.parse_entries('-1h meeting (Work)\n-30m email\n', '2024-01-01')
+  store = timesheets_store.EntryStore(str(tmp_path))
+  try:
+    assert store.update(date(2024, 1, 1), date(2024, 1, 31), entries) == (1, 0)
+    assert store.update(date(2024, 1, 1), date(2024, 1, 31), entries) == (0, 1)
+    # the day has no entries anymore
+    assert store.update(date(2024, 1, 1), date(2024, 1, 31), []) == (1, 0)
+  finally:
+    store.close()
+
+
+def test_single_day_keeps_all_logs_of_the_day(tmp_path):
+  meta = workspace(tmp_path)
+  process.handle_timesheets(['gencsv', '2024', '-f', 'sqlite'], 'gencsv', meta)
+  year = stored_entries(meta)
+  assert year == [
+    ('2024-01-01', 1.0, 'Work', 'Meeting'),
+    ('2024-01-01', 0.5, 'Music', 'Piano'),
+    ('2024-01-02', 2.0, 'Work', None),
+  ]
+
+  # a single day: the custom named log of the day (01abc.txt) stays in the store
+  process.handle_timesheets(['gencsv', '2024-01-01', '-f', 'sqlite'], 'gencsv', meta)
+  assert stored_entries(meta) == year
+
+
+def test_query_is_read_only(tmp_path):
+  meta = workspace(tmp_path)
+  process.handle_timesheets(['gencsv', '2024', '-f', 'sqlite'], 'gencsv', meta)
+
+  with pytest.raises(sqlite3.OperationalError):
+    timesheets_store.query(meta.gen_dir, "DELETE FROM entries")
+  assert len(stored_entries(meta)) == 3
@@ -0,0 +1,48 @@
+"""
+Tests: Utils
+------------
+The atomic csv writer must write the same csv cells as the escaped rows it replaced & never leave a partial file.
+"""
+
+import io
+import os
+import csv
+
+import pytest
+
+from acme.core import utils
+from acme.modules import timesheets
+
+LOG = (
+  '-2.5h 15m read "the book" chapter 3 (Study, Books)\n'
+  '-30m practice piano, scales; arpeggios\n'
+  '.30m worked on inventory report (Music, Practice, Piano)\n'
+  '-1h; 2h reviewed bob\'s notes\n'
+)
+
+
+@pytest.mark.parametrize('apply_to_final_csv', [(), ('add_columns',)])
+def test_write_csv_matches_escaped_rows(tmp_path, apply_to_final_csv):
+  customize = timesheets.Customize(apply_to_final_csv=apply_to_final_csv)
+  file = tmp_path / 'day.csv'
+
+  utils.write_csv(file, timesheets.iter_csv_rows(timesheets.parse_entries(LOG, '2024-03-05'), customize))
+
+  escaped = timesheets.entries_to_csv(timesheets.parse_entries(LOG, '2024-03-05'), customize)
+  escaped = ''.join(','.join(row) + '\n' for row in escaped)
+  assert list(csv.reader(io.StringIO(file.read_text()))) == list(csv.reader(io.StringIO(escaped)))
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+  file = tmp_path / 'day.csv'
+  file.write_text('previous\n')
+
+  def rows():
+    yield ['a', 'b']
+    raise RuntimeError('parse error')
+
+  with pytest.raises(RuntimeError):
+    utils.write_csv(file, rows())
+
+  assert file.read_text() == 'previous\n'
+  assert os.listdir(tmp_path) == ['day.csv']
@@ -0,0 +1,42 @@
+"""
+Tests: Log Watcher
+------------------
+Changed log files must only regenerate the day, month & year outputs that were generated before.
+"""
+
+import os
+import shutil
+
+from types import SimpleNamespace
+
+from acme.core import watch
+
+
+def workspace(tmp_path, logs, gen):
+  meta = SimpleNamespace(logs_dir=f'{tmp_path}/logs/', gen_dir=f'{tmp_path}/gen/')
+  for path in logs:
+    os.makedirs(os.path.dirname(f'{meta.logs_dir}{path}'), exist_ok=True)
+    open(f'{meta.logs_dir}{path}', 'w').close()
+  os.makedirs(meta.gen_dir)
+  for name in gen:
+    open(f'{meta.gen_dir}{name}', 'w').close()
+  return meta
+
+
+def test_only_generated_outputs(tmp_path):
+  meta = workspace(
+    tmp_path,
+    logs=('2024/03/05.txt', '2024/03/06.txt', '2024/03/05abc.txt', '2023/12/31.txt'),
+    gen=('2024-03-05.csv', '2024-03.csv', '2024.csv'),
+  )
+  changed = {'2024/03/05.txt', '2024/03/06.txt', '2024/03/05abc.txt', '2023/12/31.txt', '2024/03/notes.md'}
+  assert watch.affected_outputs(changed, meta) == ['2024-03-05', '2024-03', '2024']
+
+  # a removed or renamed directory regenerates its year
+  assert watch.affected_outputs({'2024/02/'}, meta) == ['2024']
+
+
+def test_missing_logs_directory(tmp_path):
+  meta = workspace(tmp_path, logs=('2024/03/05.txt',), gen=('2024-03-05.csv', '2024.csv'))
+  shutil.rmtree(meta.logs_dir)
+  assert watch.affected_outputs({'2024/03/05.txt', '2024/'}, meta) == []